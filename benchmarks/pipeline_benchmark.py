@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmarks for the Russian SEO Analysis Agent
+Times the analysis hot paths on deterministic synthetic corpora and reports
+bytes per keyword for each keyword representation
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union, Callable, Awaitable, Iterable, Iterator
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then read from /proc only
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from seo_agent.analyst import RussianSEOAnalyst  # noqa: E402
+from seo_agent.keywords import (  # noqa: E402
+    CompactKeywordData, CompetitionLevel, KeywordData, KeywordIntent, KeywordStore
+)
+from seo_agent.providers import AhrefsRussianAnalyzer  # noqa: E402
+from seo_agent.util import atomic_write  # noqa: E402
+
+
+def generate_synthetic_keyword_rows(count: int, seed: int = 42, duplicate_ratio: float = 0.0) -> List[Dict[str, Any]]:
+    """Deterministic synthetic Russian keyword rows shaped like provider exports"""
+    rng = random.Random(seed)
+    heads = ['телеграм игры', 'криптоигры', 'TON игры', 'тапалки', 'кликеры', 'блокчейн игры',
+             'игры с выводом денег', 'заработок в играх', 'мини игры', 'подарки телеграм']
+    modifiers = ['бесплатно', 'скачать', 'онлайн', 'лучшие', 'новые', 'отзывы', 'рейтинг', 'купить',
+                 'без вложений', 'на андроид', 'официальный сайт', 'топ', 'как играть', 'с выводом']
+    intents = [member.value for member in KeywordIntent]
+    levels = [member.value for member in CompetitionLevel]
+
+    rows = []
+    for index in range(count):
+        if duplicate_ratio and rows and rng.random() < duplicate_ratio:
+            # Overlapping providers repeat keywords, often with different capitalization
+            keyword = rng.choice(rows)['keyword'].capitalize()
+        else:
+            keyword = f"{rng.choice(heads)} {rng.choice(modifiers)} {rng.choice(modifiers)} {index}"
+        rows.append({
+            'keyword': keyword,
+            'volume': rng.randint(10, 120000),
+            'difficulty': rng.randint(0, 100),
+            'cpc': round(rng.uniform(0.05, 3.0), 2),
+            'intent': rng.choice(intents),
+            'local_relevance': round(rng.uniform(0.5, 1.0), 2),
+            'current_ranking': rng.choice([None, None, rng.randint(1, 100)]),
+            'competition_level': rng.choice(levels)
+        })
+    return rows
+
+
+def generate_synthetic_strategy_markdown(count: int, seed: int = 42, rows_per_table: int = 500) -> Iterator[str]:
+    """Lines of a strategy markdown file with count keyword rows in tables under cluster headings"""
+    rng = random.Random(seed)
+    volume_labels = ['High (50K-100K/month)', 'Medium (15K-30K/month)', 'Low (1K-5K/month)']
+    competition_labels = ['High', 'Medium', 'Low-Medium', 'Low']
+
+    yield '# Russian Keyword Strategy\n'
+    for index, row in enumerate(generate_synthetic_keyword_rows(count, seed)):
+        if index % rows_per_table == 0:
+            yield f"\n### {index // rows_per_table + 1}. Synthetic Cluster Keywords\n\n"
+            yield '| Keyword | Estimated Search Volume | Competition | Search Intent | Priority |\n'
+            yield '|---------|------------------------|-------------|---------------|----------|\n'
+        # Mix the label, shorthand and plain number spellings found in real strategy files
+        volume = rng.choice([rng.choice(volume_labels), f"{row['volume'] // 1000}K/month", str(row['volume'])])
+        competition = rng.choice([rng.choice(competition_labels), str(row['difficulty'])])
+        yield f"| {row['keyword']} | {volume} | {competition} | {row['intent'].capitalize()} | {rng.randint(1, 5)} |\n"
+
+
+def benchmark_keyword_memory(count: int = 100000) -> Dict[str, float]:
+    """Report retained bytes per keyword for each keyword representation"""
+    # Rows are decoded from JSON per run so every string is a fresh object, as with provider exports
+    rows_json = json.dumps(generate_synthetic_keyword_rows(count), ensure_ascii=False)
+
+    builders = {
+        'KeywordData': lambda rows: [KeywordData(seasonality={}, cyrillic_variations=[], **row) for row in rows],
+        'CompactKeywordData': lambda rows: [CompactKeywordData(**row) for row in rows],
+        'KeywordStore': lambda rows: KeywordStore.from_keywords(CompactKeywordData(**row) for row in rows)
+    }
+
+    results = {}
+    tracemalloc.start()
+    try:
+        for name, build in builders.items():
+            gc.collect()
+            baseline = tracemalloc.get_traced_memory()[0]
+            rows = json.loads(rows_json)
+            keywords = build(rows)
+            del rows
+            gc.collect()
+            results[name] = (tracemalloc.get_traced_memory()[0] - baseline) / count
+            del keywords
+    finally:
+        tracemalloc.stop()
+
+    print(f"🧮 Bytes per keyword ({count} keywords):")
+    for name, bytes_per_keyword in results.items():
+        print(f"  • {name}: {bytes_per_keyword:.1f}")
+    return results
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Without /proc the best available figure is the lifetime peak
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PeakRSSSampler:
+    """Tracks the peak resident set size from a background thread while a block runs"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'PeakRSSSampler':
+        self.start = self.peak = current_rss()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.sample, name='rss-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+class SyntheticKeywordProvider(AhrefsRussianAnalyzer):
+    """Ahrefs stand-in that serves pre-generated rows, so benchmarks time the pipeline and not the network"""
+
+    name = 'synthetic'
+
+    def __init__(self,
+                 rows: List[Dict[str, Any]],
+                 domain_rows: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        super().__init__('synthetic')
+        self.rows = rows
+        self.domain_rows = domain_rows or {}
+
+    async def keyword_research(self,
+                               seeds: List[str],
+                               market: str = 'RU') -> List[Union[KeywordData, Dict[str, Any]]]:
+        return self.rows
+
+    async def get_competitor_keywords(self,
+                                      domain: str,
+                                      market: str = 'RU') -> List[Union[KeywordData, Dict[str, Any]]]:
+        return self.domain_rows.get(domain, [])
+
+
+class PipelineBenchmark:
+    """
+    Times the analysis hot paths on deterministic synthetic corpora and
+    compares each run with a stored baseline to surface regressions
+    """
+
+    # Run in this order; later stages consume what earlier ones produce
+    stages = ('parse_strategy', 'research_keywords', 'deduplicate_keywords',
+              'analyze_keyword_gaps', 'save_analysis_results')
+    our_domain = 'grabgifts.ru'
+    competitor_domains = ('hamsterkombat.io', 'notcoin.io', 'catizen.ai')
+
+    def __init__(self,
+                 sizes: Iterable[int] = (10000, 100000, 1000000),
+                 repeats: int = 3,
+                 stages: Optional[Iterable[str]] = None,
+                 seed: int = 42,
+                 duplicate_ratio: float = 0.1,
+                 regression_tolerance: float = 0.2):
+        self.sizes = list(sizes)
+        self.repeats = max(1, repeats)
+        self.selected = set(stages or self.stages)
+        unknown = self.selected - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown benchmark stages: {', '.join(sorted(unknown))}")
+        self.seed = seed
+        self.duplicate_ratio = duplicate_ratio
+        # Relative slowdown (or RSS growth) that counts as a regression
+        self.regression_tolerance = regression_tolerance
+
+    @staticmethod
+    def code_version() -> str:
+        """Short content hash of the analyst sources, identifying the code a report was taken from"""
+        digest = hashlib.sha256()
+        for path in sorted(REPO_ROOT.glob('seo_agent/*.py')):
+            digest.update(path.read_bytes())
+        return digest.hexdigest()[:12]
+
+    def make_agent(self, workdir: Path) -> 'RussianSEOAnalyst':
+        """An analyst whose stores live in workdir and which never reaches a real provider"""
+        config_path = workdir / 'config.json'
+        config_path.write_text(json.dumps({
+            'ahrefs_api_key': None,
+            'semrush_api_key': None,
+            'yandex_token': None,
+            'cache': {'enabled': False},
+            'audit_state': {'enabled': False},
+            'history': {'enabled': True, 'path': str(workdir / 'history.sqlite3')},
+            'near_duplicates': {'enabled': True},
+            'results': {'output_dir': str(workdir)},
+            'enrichment': {'memo_path': None}
+        }))
+        return RussianSEOAnalyst(str(config_path))
+
+    async def measure(self, stage: Callable[[], Awaitable[int]]) -> Dict[str, float]:
+        """Run a stage repeats times; latency percentiles are over per-repetition wall time"""
+        timings = []
+        items = 0
+        with PeakRSSSampler() as rss:
+            for _ in range(self.repeats):
+                gc.collect()
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    items = await stage()
+                timings.append(time.perf_counter() - started)
+
+        p50, p99 = np.percentile(timings, [50, 99])
+        return {
+            'items': items,
+            'throughput_per_s': round(items / p50, 1) if p50 else 0.0,
+            'p50_s': round(float(p50), 4),
+            'p99_s': round(float(p99), 4),
+            'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+            'rss_growth_mb': round((rss.peak - rss.start) / 2 ** 20, 1)
+        }
+
+    async def run_size(self, size: int, workdir: Path) -> Dict[str, Dict[str, float]]:
+        """Benchmark every selected stage on a corpus of size keywords"""
+        rows = generate_synthetic_keyword_rows(size, self.seed, duplicate_ratio=self.duplicate_ratio)
+        strategy_path = workdir / 'russian-keyword-strategy.md'
+        with open(strategy_path, 'w', encoding='utf-8') as f:
+            f.writelines(generate_synthetic_strategy_markdown(size, self.seed))
+
+        # We rank for a fifth of the corpus; competitors see overlapping halves of it
+        domain_rows = {self.our_domain: rows[:size // 5]}
+        for position, domain in enumerate(self.competitor_domains):
+            start = position * size // 4
+            domain_rows[domain] = rows[start:start + size // 2]
+
+        agent = self.make_agent(workdir)
+        agent.strategy_file = strategy_path
+        agent.ahrefs = SyntheticKeywordProvider(rows, domain_rows)
+        agent.connectors[0] = agent.ahrefs
+        state: Dict[str, Any] = {}
+
+        async def parse_strategy() -> int:
+            with open(strategy_path, 'r', encoding='utf-8') as f:
+                agent.current_strategy = agent.parse_strategy_markdown(f)
+            return agent.current_strategy['total_keywords']
+
+        async def research_keywords() -> int:
+            # Start every repetition with a cold enrichment memo
+            agent.cyrillic_processor.memo.clear()
+            state['new_keywords'] = await agent.research_keywords(['телеграм игры'], volume_min=0, difficulty_max=100)
+            return len(rows)
+
+        async def deduplicate_keywords() -> int:
+            agent.deduplicate_keywords(state['enhanced'])
+            return len(state['enhanced'])
+
+        async def analyze_keyword_gaps() -> int:
+            state['gap_analysis'] = await agent.analyze_keyword_gaps(self.our_domain, list(self.competitor_domains))
+            return sum(len(domain_keywords) for domain_keywords in domain_rows.values())
+
+        async def save_analysis_results() -> int:
+            results = {
+                'analysis_date': datetime.now().isoformat(),
+                'new_keywords': state.get('new_keywords', []),
+                'gap_analysis': state.get('gap_analysis', {})
+            }
+            await agent.save_analysis_results(results, f"benchmark_{size}.json")
+            return len(results['new_keywords']) + len(results['gap_analysis'].get('keyword_gaps', []))
+
+        runners = {
+            'parse_strategy': parse_strategy,
+            'research_keywords': research_keywords,
+            'deduplicate_keywords': deduplicate_keywords,
+            'analyze_keyword_gaps': analyze_keyword_gaps,
+            'save_analysis_results': save_analysis_results
+        }
+
+        results = {}
+        try:
+            last_selected = max(self.stages.index(stage) for stage in self.selected)
+            for name in self.stages[:last_selected + 1]:
+                if name in self.selected:
+                    if name == 'deduplicate_keywords':
+                        # Enrichment produces deduplication's input and is timed under research_keywords
+                        state['enhanced'] = await agent.enhance_keywords(rows)
+                    results[name] = await self.measure(runners[name])
+                    state.pop('enhanced', None)
+                    print(f"  • {name}: {results[name]['throughput_per_s']:,.0f} items/s, "
+                          f"p50 {results[name]['p50_s']:.3f}s, p99 {results[name]['p99_s']:.3f}s, "
+                          f"peak RSS {results[name]['peak_rss_mb']:.0f} MB")
+                elif name != 'deduplicate_keywords':
+                    # Untimed run to produce what a later selected stage consumes
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        await runners[name]()
+        finally:
+            await agent.close()
+        return results
+
+    async def run(self) -> Dict[str, Any]:
+        """Benchmark every size and return a report that can be stored as a baseline"""
+        report = {
+            'version': self.code_version(),
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeats': self.repeats,
+            'results': {}
+        }
+
+        for size in self.sizes:
+            print(f"⏱️ Benchmarking {size:,} synthetic keywords ({self.repeats} repetitions)")
+            workdir = Path(tempfile.mkdtemp(prefix='seo-benchmark-'))
+            try:
+                report['results'][str(size)] = await self.run_size(size, workdir)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+                gc.collect()
+        return report
+
+    def compare(self, report: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Stage metrics that got worse than the baseline by more than the tolerance"""
+        # Absolute floors keep timer and allocator noise on tiny stages from reading as regressions
+        floors = {'p50_s': 0.005, 'p99_s': 0.005, 'peak_rss_mb': 16.0}
+        regressions = []
+        for size, stages in report['results'].items():
+            for stage, metrics in stages.items():
+                reference = baseline.get('results', {}).get(size, {}).get(stage)
+                if not reference:
+                    continue
+                for metric, floor in floors.items():
+                    before, after = reference.get(metric), metrics.get(metric)
+                    if not before or after is None:
+                        continue
+                    if after > before * (1 + self.regression_tolerance) and after - before > floor:
+                        regressions.append({
+                            'size': int(size),
+                            'stage': stage,
+                            'metric': metric,
+                            'baseline': before,
+                            'current': after,
+                            'change': round(after / before - 1, 3)
+                        })
+        return regressions
+
+    @staticmethod
+    def load_baseline(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """The stored baseline report, or None if none has been saved yet"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def save_baseline(report: Dict[str, Any], path: Union[str, Path]):
+        """Store a report as the baseline, merging with stored sizes and stages it didn't cover"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        merged = PipelineBenchmark.load_baseline(path) or {'results': {}}
+        for size, stages in report['results'].items():
+            merged['results'].setdefault(size, {}).update(stages)
+        merged.update({key: value for key, value in report.items() if key != 'results'})
+
+        def write(tmp_path: Path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+
+        atomic_write(path, write)
+
+
+async def run_benchmark(args: argparse.Namespace) -> int:
+    """Benchmark the analysis pipeline, compare with the stored baseline and optionally replace it"""
+    benchmark = PipelineBenchmark(sizes=args.sizes,
+                                  repeats=args.repeats,
+                                  stages=args.stages,
+                                  regression_tolerance=args.tolerance)
+    report = await benchmark.run()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Benchmark report saved to {args.output}")
+
+    regressions = []
+    baseline = PipelineBenchmark.load_baseline(args.baseline)
+    if baseline is None:
+        print(f"ℹ️ No baseline at {args.baseline}; run with --save-baseline to store one")
+    else:
+        regressions = benchmark.compare(report, baseline)
+        print(f"📊 Compared with baseline {baseline.get('version')} from {baseline.get('created_at')}")
+        for regression in regressions:
+            print(f"  ⚠️ {regression['stage']} @ {regression['size']:,}: {regression['metric']} "
+                  f"{regression['baseline']} → {regression['current']} ({regression['change']:+.0%})")
+        if not regressions:
+            print("✅ No regressions beyond tolerance")
+
+    if args.save_baseline:
+        PipelineBenchmark.save_baseline(report, args.baseline)
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line: the pipeline benchmark (default) or the keyword memory report"""
+    parser = argparse.ArgumentParser(description='Benchmarks for the Russian SEO analysis agent')
+    commands = parser.add_subparsers(dest='command')
+    pipeline = commands.add_parser('pipeline', help='Time the analysis hot paths on synthetic corpora')
+    pipeline.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                           help='Synthetic corpus sizes in keywords')
+    pipeline.add_argument('--repeats', type=int, default=3, help='Timed repetitions per stage')
+    pipeline.add_argument('--stages', nargs='+', choices=PipelineBenchmark.stages,
+                           help='Stages to time (default: all)')
+    pipeline.add_argument('--baseline', default=os.getenv(
+        'SEO_BENCHMARK_BASELINE',
+        str(Path.home() / '.cache' / 'grabgifts-seo' / 'benchmark_baseline.json')
+    ), help='Baseline report to compare against')
+    pipeline.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    pipeline.add_argument('--tolerance', type=float, default=0.2,
+                           help='Relative slowdown or RSS growth reported as a regression')
+    pipeline.add_argument('--output', help='Also write the full report to this JSON file')
+
+    memory = commands.add_parser('memory', help='Report retained bytes per keyword for each representation')
+    memory.add_argument('--count', type=int, default=100000, help='Synthetic keywords to build')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(['pipeline', *(argv if argv is not None else sys.argv[1:])])
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'memory':
+        benchmark_keyword_memory(args.count)
+    else:
+        sys.exit(asyncio.run(run_benchmark(args)))
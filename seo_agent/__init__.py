@@ -0,0 +1,4 @@
+"""
+Russian SEO Analysis Agent
+Specialized sub-agent for GrabGifts.ru Russian market SEO analysis
+"""
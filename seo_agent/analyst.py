@@ -0,0 +1,1451 @@
+"""
+The analyst that ties providers, enrichment, audits and results together
+"""
+
+import asyncio
+import aiohttp
+import io
+import json
+import re
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple, Union, Callable, Awaitable, Iterable, Iterator, AsyncIterator
+from pathlib import Path
+
+from .audit import AuditStateStore, PageSnapshot, RussianTechnicalSEOAuditor, SiteCrawler, YandexOptimizer
+from .cyrillic import CyrillicSEOProcessor
+from .history import RunHistoryStore
+from .keywords import (
+    AnalysisResultsWriter,
+    CLUSTER_HEADER_PATTERN,
+    CompactKeywordData,
+    CompetitorData,
+    DEFAULT_INTENT_SCORE,
+    INTENT_SCORES,
+    KeywordData,
+    KeywordFrame,
+    KeywordGapIndex,
+    KeywordStore,
+    NUMBER_PATTERN,
+    NearDuplicateClusterer,
+    STRATEGY_COLUMN_ALIASES,
+    TABLE_SEPARATOR_PATTERN,
+    TopKeywords,
+    TopicClusterer,
+    pa
+)
+from .providers import (
+    AhrefsRussianAnalyzer,
+    ProviderConnector,
+    ResponseCache,
+    SemrushYandexAnalyzer,
+    TransportStats,
+    YandexWordstatConnector
+)
+from .telemetry import Instrumentation, instrumented
+
+if TYPE_CHECKING:
+    from .jobs import JobQueue
+
+
+class RussianSEOAnalyst:
+    """
+    Main SEO analysis agent for Russian market
+    """
+
+    def __init__(self, config_path: Optional[str] = None):
+        self.config = self.load_config(config_path)
+        instrumentation = self.config['instrumentation']
+        self.instrumentation = Instrumentation(enabled=instrumentation['enabled'] or bool(instrumentation['export_path']),
+                                               max_spans=instrumentation['max_spans'])
+        self.project_path = Path('/Users/komalamin/Documents/Windsurf projects/GrabGiftsRUsite')
+        self.strategy_file = self.project_path / 'russian-keyword-strategy.md'
+        self.competitor_file = self.project_path / 'grabgifts_competitive_analysis.md'
+
+        # Initialize tool connectors
+        provider_concurrency = self.config['provider_concurrency']
+        rate_limits = self.config['rate_limits']
+        self.ahrefs = AhrefsRussianAnalyzer(self.config.get('ahrefs_api_key'),
+                                            max_concurrency=provider_concurrency['ahrefs'],
+                                            base_url=self.config.get('ahrefs_base_url'),
+                                            rate_limit=rate_limits['ahrefs'])
+        self.semrush = SemrushYandexAnalyzer(self.config.get('semrush_api_key'),
+                                             max_concurrency=provider_concurrency['semrush'],
+                                             base_url=self.config.get('semrush_base_url'),
+                                             rate_limit=rate_limits['semrush'])
+        self.yandex_wordstat = YandexWordstatConnector(self.config.get('yandex_token'),
+                                                       max_concurrency=provider_concurrency['yandex_wordstat'],
+                                                       base_url=self.config.get('yandex_wordstat_base_url'),
+                                                       rate_limit=rate_limits['yandex_wordstat'])
+        self.connectors = [self.ahrefs, self.semrush, self.yandex_wordstat]
+        for connector in self.connectors:
+            batching = self.config['provider_batching'].get(connector.name, {})
+            connector.max_batch_seeds = batching.get('max_batch_seeds', connector.max_batch_seeds)
+            connector.page_size = batching.get('page_size', connector.page_size)
+
+        # Provider response cache shared by all connectors
+        cache_config = self.config['cache']
+        self.response_cache = None
+        if cache_config['enabled']:
+            self.response_cache = ResponseCache(cache_config['path'],
+                                                ttls=cache_config['ttl'],
+                                                max_bytes=cache_config['max_bytes'])
+        for connector in self.connectors:
+            connector.cache = self.response_cache
+            connector.instrumentation = self.instrumentation
+        self.technical_auditor = RussianTechnicalSEOAuditor(fetch_pages=self.config['audit_fetch_pages'])
+        self.audit_state = None
+        if self.config['audit_state']['enabled']:
+            self.audit_state = AuditStateStore(self.config['audit_state']['path'],
+                                               checks_version=RussianTechnicalSEOAuditor.checks_version)
+        self.history = None
+        if self.config['history']['enabled']:
+            self.history = RunHistoryStore(self.config['history']['path'])
+        self.job_queue: Optional['JobQueue'] = None
+        self.cyrillic_processor = CyrillicSEOProcessor(memo_size=self.config['enrichment']['memo_size'])
+        self.yandex_optimizer = YandexOptimizer()
+        near_duplicates = self.config['near_duplicates']
+        topic_clusters = self.config['topic_clusters']
+        self.topic_clusterer = None
+        if topic_clusters['enabled']:
+            self.topic_clusterer = TopicClusterer(self.cyrillic_processor,
+                                                  n_clusters=topic_clusters['n_clusters'],
+                                                  min_df=topic_clusters['min_df'],
+                                                  max_features=topic_clusters['max_features'],
+                                                  batch_size=topic_clusters['batch_size'],
+                                                  n_init=topic_clusters['n_init'])
+        self.near_duplicates = None
+        if near_duplicates['enabled']:
+            self.near_duplicates = NearDuplicateClusterer(self.cyrillic_processor,
+                                                          num_perm=near_duplicates['num_perm'],
+                                                          bands=near_duplicates['bands'],
+                                                          threshold=near_duplicates['threshold'],
+                                                          shingle_size=near_duplicates['shingle_size'])
+
+        # Process pool for bulk Cyrillic enrichment, started on first large batch
+        self.enrichment_executor: Optional[ProcessPoolExecutor] = None
+
+        # Shared HTTP transport, opened by open_session() / async with
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.transport_stats = TransportStats()
+
+        # Current strategy data, with the (mtime, size) of each file when it was parsed
+        self.current_strategy = None
+        self.current_competitors = None
+        self.file_signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+
+        self.instrumentation.add_collector(self.component_metrics)
+
+    async def __aenter__(self) -> 'RussianSEOAnalyst':
+        await self.open_session()
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @staticmethod
+    def load_config(config_path: Optional[str]) -> Dict[str, Any]:
+        """Load configuration from file or environment variables"""
+        config = {}
+
+        # Try to load from file first
+        if config_path and os.path.exists(config_path):
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+
+        # Fallback to environment variables
+        config.setdefault('ahrefs_api_key', os.getenv('AHREFS_API_KEY'))
+        config.setdefault('semrush_api_key', os.getenv('SEMRUSH_API_KEY'))
+        config.setdefault('yandex_token', os.getenv('YANDEX_WORDSTAT_TOKEN'))
+
+        # Provider endpoints can be pointed at a local stand-in server
+        config.setdefault('ahrefs_base_url', os.getenv('AHREFS_BASE_URL'))
+        config.setdefault('semrush_base_url', os.getenv('SEMRUSH_BASE_URL'))
+        config.setdefault('yandex_wordstat_base_url', os.getenv('YANDEX_WORDSTAT_BASE_URL'))
+
+        # Shared HTTP session settings
+        http = config.setdefault('http', {})
+        http.setdefault('connection_limit', 100)
+        http.setdefault('limit_per_host', 20)
+        http.setdefault('dns_cache_ttl', 300)
+        http.setdefault('keepalive_timeout', 30)
+        http.setdefault('total_timeout', 60)
+        http.setdefault('connect_timeout', 10)
+
+        # Cyrillic enrichment offload for large keyword batches
+        enrichment = config.setdefault('enrichment', {})
+        enrichment.setdefault('workers', os.cpu_count() or 1)
+        enrichment.setdefault('chunk_size', 50000)
+        enrichment.setdefault('inline_threshold', 20000)
+        enrichment.setdefault('memo_size', 200000)
+        enrichment.setdefault('memo_path', os.getenv('SEO_ENRICHMENT_MEMO_PATH'))
+
+        # Persistent provider response cache
+        cache = config.setdefault('cache', {})
+        cache.setdefault('enabled', True)
+        cache.setdefault('path', os.getenv(
+            'SEO_CACHE_PATH',
+            str(Path.home() / '.cache' / 'grabgifts-seo' / 'responses.sqlite3')
+        ))
+        cache.setdefault('max_bytes', 256 * 1024 * 1024)
+        cache_ttl = cache.setdefault('ttl', {})
+        cache_ttl.setdefault('ahrefs', 24 * 3600)
+        cache_ttl.setdefault('semrush', 24 * 3600)
+        cache_ttl.setdefault('yandex_wordstat', 7 * 24 * 3600)  # Wordstat volumes are monthly
+
+        # Concurrency limits: global fan-out width and per-provider caps
+        config.setdefault('gap_concurrency', int(os.getenv('SEO_GAP_CONCURRENCY', '10')))
+        # Fetching our own rankings for gap analysis is an extra paid call per run, so it is opt-in
+        config.setdefault('gap_include_own_rankings', os.getenv('SEO_GAP_OWN_RANKINGS', '0') == '1')
+        config.setdefault('audit_concurrency', int(os.getenv('SEO_AUDIT_CONCURRENCY', '20')))
+
+        # Live page downloads for audit_technical_seo; off keeps the audit offline
+        config.setdefault('audit_fetch_pages', os.getenv('SEO_AUDIT_FETCH_PAGES', '0') == '1')
+        provider_concurrency = config.setdefault('provider_concurrency', {})
+        provider_concurrency.setdefault('ahrefs', 5)
+        provider_concurrency.setdefault('semrush', 5)
+        provider_concurrency.setdefault('yandex_wordstat', 3)
+
+        # MinHash/LSH near-duplicate grouping of researched keywords; opt-in, as it collapses the research output
+        near_duplicates = config.setdefault('near_duplicates', {})
+        near_duplicates.setdefault('enabled', os.getenv('SEO_NEAR_DUPLICATES', '0') == '1')
+        near_duplicates.setdefault('num_perm', 64)
+        near_duplicates.setdefault('bands', 16)  # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+        near_duplicates.setdefault('threshold', 0.7)  # estimated Jaccard needed to merge a candidate pair
+        near_duplicates.setdefault('shingle_size', 3)
+
+        # Topical keyword clusters (TF-IDF + mini-batch k-means), added alongside the heading-derived ones
+        topic_clusters = config.setdefault('topic_clusters', {})
+        topic_clusters.setdefault('enabled', os.getenv('SEO_TOPIC_CLUSTERS', '0') == '1')
+        topic_clusters.setdefault('n_clusters', None)  # None sizes k from the keyword count
+        topic_clusters.setdefault('min_df', 2)
+        topic_clusters.setdefault('max_features', 50000)
+        topic_clusters.setdefault('batch_size', 1024)
+        topic_clusters.setdefault('n_init', 3)  # k-means++ seedings tried per fit
+
+        # Analysis results output: compact JSON metadata plus columnar keyword tables
+        results = config.setdefault('results', {})
+        results.setdefault('output_dir', os.getenv('SEO_RESULTS_DIR', '.'))  # relative to the working directory
+        results.setdefault('table_format', os.getenv('SEO_RESULTS_FORMAT', 'arrow' if pa is not None else 'json'))
+
+        # Append-only history of keyword volumes and rankings across runs; opt-in, as it writes under ~/.cache
+        history = config.setdefault('history', {})
+        history.setdefault('enabled', os.getenv('SEO_HISTORY', '0') == '1')
+        history.setdefault('path', os.getenv(
+            'SEO_HISTORY_PATH',
+            str(Path.home() / '.cache' / 'grabgifts-seo' / 'history.sqlite3')
+        ))
+
+        # Per-URL validators and results for incremental re-audits
+        audit_state = config.setdefault('audit_state', {})
+        audit_state.setdefault('enabled', True)
+        audit_state.setdefault('path', os.getenv(
+            'SEO_AUDIT_STATE_PATH',
+            str(Path.home() / '.cache' / 'grabgifts-seo' / 'audit_state.sqlite3')
+        ))
+
+        # Site crawler for full-site technical audits
+        crawl = config.setdefault('crawl', {})
+        crawl.setdefault('max_pages', int(os.getenv('SEO_CRAWL_MAX_PAGES', '5000')))
+        crawl.setdefault('workers', 20)
+        crawl.setdefault('per_host_concurrency', 8)
+        crawl.setdefault('crawl_delay', None)  # None follows robots.txt Crawl-delay
+        crawl.setdefault('max_crawl_delay', 10.0)
+        crawl.setdefault('user_agent', 'GrabGiftsSEOBot')
+
+        # Spans, counters and histograms; off unless enabled or an export path is set
+        instrumentation = config.setdefault('instrumentation', {})
+        instrumentation.setdefault('enabled', os.getenv('SEO_INSTRUMENTATION', '0') == '1')
+        instrumentation.setdefault('export_path', os.getenv('SEO_METRICS_PATH'))
+        instrumentation.setdefault('export_format', os.getenv('SEO_METRICS_FORMAT', 'prometheus'))  # or 'otlp'
+        instrumentation.setdefault('max_spans', 10000)
+
+        # Durable job queue drained by the worker pool (jobs command)
+        jobs = config.setdefault('jobs', {})
+        jobs.setdefault('path', os.getenv(
+            'SEO_JOBS_PATH',
+            str(Path.home() / '.cache' / 'grabgifts-seo' / 'jobs.sqlite3')
+        ))
+        jobs.setdefault('workers', os.cpu_count() or 1)
+        jobs.setdefault('max_attempts', 3)
+        jobs.setdefault('lease_seconds', 300)  # renewed while a job runs; a dead worker's jobs return after this
+        jobs.setdefault('retry_backoff', 30.0)  # doubled after each failed attempt
+        jobs.setdefault('poll_interval', 1.0)
+
+        # Resident JSON API (serve command)
+        daemon = config.setdefault('daemon', {})
+        daemon.setdefault('host', os.getenv('SEO_DAEMON_HOST', '127.0.0.1'))
+        daemon.setdefault('port', int(os.getenv('SEO_DAEMON_PORT', '8080')))
+        daemon.setdefault('watch_interval', 2.0)  # seconds between strategy file checks
+
+        # Per-provider request quotas and retry policy
+        rate_limits = config.setdefault('rate_limits', {})
+        rate_limits.setdefault('ahrefs', {'rate_per_second': 1.0, 'burst': 10})  # 60 req/min plan quota
+        rate_limits.setdefault('semrush', {'rate_per_second': 10.0, 'burst': 10})
+        rate_limits.setdefault('yandex_wordstat', {'rate_per_second': 10.0, 'burst': 10})
+        for limits in rate_limits.values():
+            limits.setdefault('max_retries', 4)
+            limits.setdefault('backoff_base', 0.5)
+            limits.setdefault('backoff_max', 30.0)
+
+        # Seeds packed into one provider request and rows requested per result page
+        batching = config.setdefault('provider_batching', {})
+        batching.setdefault('ahrefs', {'max_batch_seeds': 100, 'page_size': 1000})
+        batching.setdefault('yandex_wordstat', {'max_batch_seeds': 128, 'page_size': 2000})
+
+        return config
+
+    @instrumented
+    async def initialize(self):
+        """Initialize the agent with current project data"""
+        print("🔄 Initializing Russian SEO Analyst...")
+
+        # Load current strategy and competitor data; unchanged files are not parsed again
+        await self.refresh_project_files()
+        print(f"✅ Loaded {len(self.current_strategy.get('keywords', []))} keywords from strategy")
+        print(f"✅ Loaded {len(self.current_competitors)} competitors from analysis")
+
+        # Warm the enrichment memo from the previous run
+        memo_path = self.config['enrichment']['memo_path']
+        if memo_path:
+            loaded = await asyncio.to_thread(self.cyrillic_processor.load_memo, memo_path)
+            print(f"✅ Loaded {loaded} memoized keyword enrichments")
+
+        print("🚀 Russian SEO Analyst ready!")
+
+    async def open_session(self) -> aiohttp.ClientSession:
+        """Open the pooled HTTP session and share it with every connector"""
+        if self.session is None or self.session.closed:
+            http = self.config['http']
+            connector = aiohttp.TCPConnector(
+                limit=http['connection_limit'],
+                limit_per_host=http['limit_per_host'],
+                ttl_dns_cache=http['dns_cache_ttl'],
+                keepalive_timeout=http['keepalive_timeout']
+            )
+            timeout = aiohttp.ClientTimeout(total=http['total_timeout'],
+                                            connect=http['connect_timeout'])
+            self.transport_stats = TransportStats()
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={'Accept-Encoding': 'gzip, deflate', 'Accept': 'application/json'},
+                trace_configs=[self.transport_stats.trace_config()]
+            )
+
+        for connector in self.connectors:
+            connector.bind_session(self.session)
+        self.technical_auditor.bind_session(self.session)
+
+        return self.session
+
+    async def close(self):
+        """Close the pooled HTTP session and flush persistent state"""
+        memo_path = self.config['enrichment']['memo_path']
+        if memo_path:
+            await asyncio.to_thread(self.cyrillic_processor.save_memo, memo_path)
+
+        instrumentation = self.config['instrumentation']
+        if self.instrumentation.enabled and instrumentation['export_path']:
+            await asyncio.to_thread(self.instrumentation.export,
+                                    instrumentation['export_path'],
+                                    instrumentation['export_format'])
+            print(f"📈 Metrics exported to {instrumentation['export_path']}")
+
+        for connector in self.connectors:
+            connector.bind_session(None)
+        self.technical_auditor.bind_session(None)
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+        if self.audit_state is not None:
+            self.audit_state.close()
+
+        if self.history is not None:
+            self.history.close()
+
+        if self.job_queue is not None:
+            self.job_queue.close()
+
+        if self.enrichment_executor is not None:
+            self.enrichment_executor.shutdown(wait=False, cancel_futures=True)
+            self.enrichment_executor = None
+
+    @property
+    def jobs(self) -> 'JobQueue':
+        """The durable job queue, built on first use so analysts that never queue jobs touch no database"""
+        if self.job_queue is None:
+            # Imported here because the job worker module builds analysts itself
+            from .jobs import JobQueue
+
+            jobs = self.config['jobs']
+            self.job_queue = JobQueue(jobs['path'],
+                                      max_attempts=jobs['max_attempts'],
+                                      lease_seconds=jobs['lease_seconds'],
+                                      retry_backoff=jobs['retry_backoff'])
+        return self.job_queue
+
+    def provider_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue/in-flight timing, throttling and saved-call metrics per provider"""
+        return {connector.name: {**connector.scheduler.stats(), 'calls_saved': connector.calls_saved()}
+                for connector in self.connectors}
+
+    def component_metrics(self) -> Iterator[Tuple[str, str, Dict[str, str], float]]:
+        """Stats the connectors, transport, caches and stores already keep, as instrumentation samples"""
+        for connector in self.connectors:
+            stats = connector.scheduler.stats()
+            labels = {'provider': connector.name}
+            for key in ('requests', 'retries', 'throttled', 'failures'):
+                yield f"seo_provider_{key}_total", 'counter', labels, stats[key]
+            yield 'seo_provider_concurrency_limit', 'gauge', labels, stats['concurrency_limit']
+            saved = connector.calls_saved()
+            for reason, key in (('coalesced', 'coalesced'), ('duplicate_seed', 'duplicate_seeds'),
+                                ('shared_seed', 'shared_seeds'), ('batched', 'batched')):
+                yield 'seo_provider_calls_saved_total', 'counter', {**labels, 'reason': reason}, saved[key]
+            yield 'seo_provider_batches_split_total', 'counter', labels, connector.batches_split
+            yield 'seo_provider_unattributed_rows_total', 'counter', labels, connector.unattributed_rows
+
+        transport = self.transport_stats
+        yield 'seo_http_requests_total', 'counter', {}, transport.requests
+        yield 'seo_http_errors_total', 'counter', {}, transport.errors
+        yield 'seo_http_connections_total', 'counter', {'reused': 'false'}, transport.connections_created
+        yield 'seo_http_connections_total', 'counter', {'reused': 'true'}, transport.connections_reused
+        yield 'seo_http_received_bytes_total', 'counter', {}, transport.bytes_received
+
+        lookups = {'enrichment_memo': self.cyrillic_processor.memo_stats()}
+        if self.response_cache is not None:
+            lookups['provider_responses'] = self.response_cache.stats()
+        if self.audit_state is not None:
+            audit = self.audit_state.stats()
+            lookups['audit_state'] = {'hits': audit['reused'], 'misses': audit['audited']}
+        for cache, stats in lookups.items():
+            yield 'seo_cache_lookups_total', 'counter', {'cache': cache, 'result': 'hit'}, stats['hits']
+            yield 'seo_cache_lookups_total', 'counter', {'cache': cache, 'result': 'miss'}, stats['misses']
+
+    @staticmethod
+    def project_file_signature(path: Path) -> Optional[Tuple[int, int]]:
+        """Modification time and size of a project file, or None if it doesn't exist"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def refresh_project_files(self) -> List[str]:
+        """Re-parse the strategy and competitor files that changed since they were last loaded"""
+        reloaded = []
+        for attribute, path, load in (('current_strategy', self.strategy_file, self.load_strategy_file),
+                                      ('current_competitors', self.competitor_file, self.load_competitor_file)):
+            signature = self.project_file_signature(path)
+            if attribute in self.file_signatures and self.file_signatures[attribute] == signature:
+                continue
+            # Swapped in whole, so requests in flight keep a consistent view
+            setattr(self, attribute, await load())
+            self.file_signatures[attribute] = signature
+            self.instrumentation.count('seo_project_file_loads_total', file=path.name)
+            reloaded.append(path.name)
+        return reloaded
+
+    async def watch_project_files(self, interval: float = 2.0):
+        """Poll the project files and re-parse whichever changes, until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                reloaded = await self.refresh_project_files()
+            except Exception as error:
+                print(f"⚠️ Failed to reload project files: {type(error).__name__}: {error}")
+                continue
+            if reloaded:
+                print(f"🔄 Reloaded {', '.join(reloaded)}")
+
+    async def load_strategy_file(self) -> Dict[str, Any]:
+        """Load and parse the Russian keyword strategy file"""
+        if not self.strategy_file.exists():
+            return {'keywords': [], 'clusters': [], 'performance_data': {}}
+
+        # Stream the file line by line rather than reading it into memory, off the event loop
+        def parse() -> Dict[str, Any]:
+            with open(self.strategy_file, 'r', encoding='utf-8') as f:
+                return self.parse_strategy_markdown(f)
+
+        strategy_data = await asyncio.to_thread(parse)
+
+        # Topical clusters cover every keyword, not just tables under matching headings;
+        # 'clusters' keeps the heading-derived groups
+        if self.topic_clusterer is not None and strategy_data['keywords']:
+            strategy_data['topic_clusters'] = await self.cluster_keywords(strategy_data['keywords'])
+        return strategy_data
+
+    @instrumented
+    async def cluster_keywords(self,
+                               keywords: List[KeywordData],
+                               n_clusters: Optional[int] = None) -> Dict[str, List[KeywordData]]:
+        """Group keywords into topical clusters, named after each cluster's most central keyword"""
+        if self.topic_clusterer is None:
+            return {}
+        return await asyncio.to_thread(self.topic_clusterer.cluster, keywords, n_clusters)
+
+    def parse_strategy_markdown(self, content: Union[str, Iterable[str]]) -> Dict[str, Any]:
+        """Parse strategy markdown (text or an iterable of lines) in a single pass"""
+        keywords = []
+        clusters = {}
+
+        lines = io.StringIO(content) if isinstance(content, str) else content
+
+        current_cluster = None
+        columns = None          # Column positions of the table being read
+        header_cells = None     # Last table row seen outside a table, a header candidate
+
+        for line in lines:
+            # Identify cluster headers
+            if line.startswith('### '):
+                if CLUSTER_HEADER_PATTERN.search(line):
+                    current_cluster = line[4:].strip()
+                    clusters[current_cluster] = []
+
+            stripped = line.strip()
+            if not stripped.startswith('|'):
+                columns = None
+                header_cells = None
+                continue
+
+            # A header row followed by a |---| separator opens a table
+            if columns is None:
+                if header_cells is not None and TABLE_SEPARATOR_PATTERN.match(stripped):
+                    columns = self.map_strategy_columns(header_cells)
+                    header_cells = None
+                else:
+                    header_cells = self.split_table_row(stripped)
+                continue
+
+            # Extract keyword data from table rows
+            keyword_data = self.parse_keyword_row(self.split_table_row(stripped), columns)
+            if keyword_data is None:
+                continue
+
+            keywords.append(keyword_data)
+            if current_cluster:
+                clusters[current_cluster].append(keyword_data)
+
+        return {
+            'keywords': keywords,
+            'clusters': clusters,
+            'last_updated': datetime.now().isoformat(),
+            'total_keywords': len(keywords)
+        }
+
+    def split_table_row(self, row: str) -> List[str]:
+        """Split a markdown table row into cells, keeping empty cells in place"""
+        row = row.strip()
+        if row.startswith('|'):
+            row = row[1:]
+        if row.endswith('|'):
+            row = row[:-1]
+        return [cell.strip() for cell in row.split('|')]
+
+    def map_strategy_columns(self, header_cells: List[str]) -> Dict[str, int]:
+        """Map keyword table fields to column positions using the header row"""
+        columns = {}
+        for position, header in enumerate(header_cells):
+            header = header.lower()
+            for field_name, aliases in STRATEGY_COLUMN_ALIASES.items():
+                if field_name not in columns and header.startswith(aliases):
+                    columns[field_name] = position
+                    break
+        return columns
+
+    def parse_keyword_row(self, cells: List[str], columns: Dict[str, int]) -> Optional[KeywordData]:
+        """Build KeywordData from a table row, or None if the table isn't a keyword table"""
+        if not all(name in columns for name in ('keyword', 'volume', 'difficulty')):
+            return None
+
+        if len(cells) <= max(columns.values()) or not cells[columns['keyword']]:
+            return None
+
+        intent_column = columns.get('intent')
+        return KeywordData(
+            keyword=cells[columns['keyword']],
+            volume=self.parse_volume(cells[columns['volume']]),
+            difficulty=self.parse_difficulty(cells[columns['difficulty']]),
+            cpc=0.0,
+            intent=cells[intent_column] if intent_column is not None else 'informational',
+            seasonality={},
+            local_relevance=1.0,
+            cyrillic_variations=[]
+        )
+
+    def parse_volume(self, volume_str: str) -> int:
+        """Parse search volume from string representation"""
+        volume_str = volume_str.lower().replace('k', '000').replace('м', '000')
+
+        if 'high' in volume_str or 'высокий' in volume_str:
+            return 50000
+        elif 'medium' in volume_str or 'средний' in volume_str:
+            return 15000
+        elif 'low' in volume_str or 'низкий' in volume_str:
+            return 3000
+
+        # Try to extract numbers
+        number = NUMBER_PATTERN.search(volume_str)
+        if number:
+            return int(number.group())
+
+        return 1000  # Default
+
+    def parse_difficulty(self, difficulty_str: str) -> int:
+        """Parse keyword difficulty from string representation"""
+        difficulty_str = difficulty_str.lower()
+
+        if 'high' in difficulty_str or 'высокий' in difficulty_str:
+            return 80
+        elif 'medium' in difficulty_str or 'средний' in difficulty_str:
+            return 50
+        elif 'low' in difficulty_str or 'низкий' in difficulty_str:
+            return 20
+
+        # Try to extract numbers
+        number = NUMBER_PATTERN.search(difficulty_str)
+        if number:
+            return min(int(number.group()), 100)
+
+        return 50  # Default
+
+    async def load_competitor_file(self) -> List[CompetitorData]:
+        """Load and parse the competitive analysis file"""
+        if not self.competitor_file.exists():
+            return []
+
+        with open(self.competitor_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        competitors = self.parse_competitor_markdown(content)
+        return competitors
+
+    def parse_competitor_markdown(self, content: str) -> List[CompetitorData]:
+        """Parse competitor analysis markdown to extract competitor data"""
+        competitors = []
+
+        # Extract competitor names and data
+        competitor_sections = re.split(r'#### \d+\. ', content)[1:]  # Skip first empty split
+
+        for section in competitor_sections:
+            lines = section.split('\n')
+            if not lines:
+                continue
+
+            competitor_name = lines[0].strip()
+
+            # Create competitor data object
+            competitor = CompetitorData(
+                domain=self.extract_domain_from_name(competitor_name),
+                organic_keywords=0,
+                organic_traffic=0,
+                backlinks=0,
+                domain_authority=0,
+                top_keywords=[],
+                content_gaps=[]
+            )
+
+            competitors.append(competitor)
+
+        return competitors
+
+    def extract_domain_from_name(self, name: str) -> str:
+        """Extract likely domain from competitor name"""
+        domain_mapping = {
+            'Hamster Kombat': 'hamsterkombat.io',
+            'Notcoin': 'notcoin.io',
+            'X Empire': 'xempire.io',
+            'TapSwap': 'tapswap.club',
+            'Catizen': 'catizen.ai',
+            'CSGOFast': 'csgofast.com',
+            'CSGOEmpire': 'csgoempire.com',
+            'VK Play': 'vkplay.ru'
+        }
+
+        for key, domain in domain_mapping.items():
+            if key in name:
+                return domain
+
+        # Fallback: create domain from name
+        return name.lower().replace(' ', '') + '.com'
+
+    @instrumented
+    async def research_keywords(self,
+                               seeds: List[str],
+                               market: str = 'RU',
+                               search_engines: List[str] = ['yandex', 'google.ru'],
+                               volume_min: int = 500,
+                               difficulty_max: int = 60) -> List[KeywordData]:
+        """
+        Comprehensive keyword research for Russian market
+        """
+        print(f"🔍 Researching keywords for seeds: {seeds}")
+
+        all_keywords = []
+        if self.ahrefs.api_key or self.yandex_wordstat.token:
+            await self.open_session()
+
+        # Expand through multiple sources
+        if self.ahrefs.api_key:
+            ahrefs_keywords = await self.ahrefs.keyword_research(seeds, market)
+            all_keywords.extend(ahrefs_keywords)
+            print(f"📊 Found {len(ahrefs_keywords)} keywords from Ahrefs")
+
+        if self.yandex_wordstat.token:
+            yandex_keywords = await self.yandex_wordstat.get_keyword_suggestions(seeds)
+            all_keywords.extend(yandex_keywords)
+            print(f"📊 Found {len(yandex_keywords)} keywords from Yandex Wordstat")
+
+        self.instrumentation.count('seo_keywords_in_total', len(all_keywords), stage='research_keywords')
+
+        # Process and enhance keywords
+        enhanced_keywords = KeywordFrame.from_keywords(await self.enhance_keywords(all_keywords))
+
+        # Apply filters, remove duplicates and sort by opportunity score in columnar form
+        unique_keywords = (enhanced_keywords
+                           .filter(volume_min=volume_min, difficulty_max=difficulty_max)
+                           .deduplicate())
+        if self.near_duplicates is not None:
+            # Fold word-order, year and transliterated variants into their best-scoring head
+            labels = await asyncio.to_thread(self.near_duplicates.labels, unique_keywords.df['keyword'].tolist())
+            unique_keywords = unique_keywords.collapse(labels)
+        sorted_keywords = unique_keywords.top().to_keywords()
+
+        if self.history is not None:
+            await self.history.arecord_run('research', {'': sorted_keywords}, market)
+
+        self.instrumentation.count('seo_keywords_out_total', len(sorted_keywords), stage='research_keywords')
+        print(f"✅ Final keyword list: {len(sorted_keywords)} keywords")
+        return sorted_keywords
+
+    async def iter_keywords(self,
+                            seeds: List[str],
+                            market: str = 'RU',
+                            volume_min: int = 500,
+                            difficulty_max: int = 60,
+                            ranking: Optional[TopKeywords] = None,
+                            seeds_per_request: Optional[int] = None,
+                            max_pending_pages: int = 2) -> AsyncIterator[KeywordData]:
+        """
+        Streaming keyword research: yield enriched, filtered, deduplicated keywords
+        as each provider page arrives. Pass a TopKeywords to keep a live top-k ranking.
+        """
+        print(f"🔍 Streaming keyword research for seeds: {seeds}")
+
+        # Each page is one full provider batch unless seeds_per_request asks for smaller ones
+        sources = []
+        if self.ahrefs.api_key:
+            sources.append((lambda chunk: self.ahrefs.keyword_research(chunk, market), self.ahrefs))
+        if self.yandex_wordstat.token:
+            sources.append((self.yandex_wordstat.get_keyword_suggestions, self.yandex_wordstat))
+        if sources:
+            await self.open_session()
+
+        # Producers block on the bounded queue when the consumer falls behind
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max_pending_pages)
+        done = object()
+
+        async def produce(fetch: Callable[[List[str]], Awaitable[List[Any]]], connector: ProviderConnector):
+            try:
+                size = seeds_per_request or connector.max_batch_seeds
+                for start in range(0, len(seeds), size):
+                    await pages.put(await fetch(seeds[start:start + size]))
+            except Exception as error:
+                await pages.put(error)
+            await pages.put(done)
+
+        producers = [asyncio.create_task(produce(fetch, connector)) for fetch, connector in sources]
+        remaining = len(producers)
+        seen = set()
+        received = 0
+        yielded = 0
+
+        try:
+            while remaining:
+                page = await pages.get()
+                if page is done:
+                    remaining -= 1
+                    continue
+                if isinstance(page, Exception):
+                    raise page
+
+                received += len(page)
+                for raw_keyword in page:
+                    keyword = self.enhance_keyword(raw_keyword)
+                    if keyword.volume < volume_min or keyword.difficulty > difficulty_max:
+                        continue
+
+                    key = keyword.keyword.lower()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    if ranking is not None:
+                        ranking.push(keyword)
+                    yielded += 1
+                    yield keyword
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+        self.instrumentation.count('seo_keywords_in_total', received, stage='iter_keywords')
+        self.instrumentation.count('seo_keywords_out_total', yielded, stage='iter_keywords')
+        print(f"✅ Streamed {yielded} keywords")
+
+    async def enhance_keywords(self, keywords: List[Union[KeywordData, Dict[str, Any]]]) -> List[KeywordData]:
+        """Batch enhance_keyword; large batches are enriched off the event loop"""
+        raw_keywords = [keyword.get('keyword', '') for keyword in keywords if isinstance(keyword, dict)]
+        if not raw_keywords:
+            return list(keywords)
+
+        enrichment = self.config['enrichment']
+        executor = None
+        if len(raw_keywords) > enrichment['inline_threshold'] and enrichment['workers'] > 1:
+            if self.enrichment_executor is None:
+                self.enrichment_executor = ProcessPoolExecutor(max_workers=enrichment['workers'])
+            executor = self.enrichment_executor
+
+        enriched = iter(await self.cyrillic_processor.enrich_batch_async(
+            raw_keywords,
+            executor=executor,
+            chunk_size=enrichment['chunk_size'],
+            inline_threshold=enrichment['inline_threshold']
+        ))
+
+        results = []
+        for keyword in keywords:
+            if not isinstance(keyword, dict):
+                results.append(keyword)
+                continue
+
+            intent, variations = next(enriched)
+            results.append(KeywordData(
+                keyword=keyword.get('keyword', ''),
+                volume=keyword.get('volume', 0),
+                difficulty=keyword.get('difficulty', 50),
+                cpc=keyword.get('cpc', 0.0),
+                intent=intent,
+                seasonality={},
+                local_relevance=1.0,
+                cyrillic_variations=variations,
+                current_ranking=keyword.get('current_ranking')
+            ))
+        return results
+
+    def enhance_keyword(self, keyword: Union[KeywordData, Dict[str, Any]]) -> KeywordData:
+        """Turn a raw provider row into KeywordData with Russian intent and URL variations"""
+        if not isinstance(keyword, dict):
+            return keyword
+
+        return KeywordData(
+            keyword=keyword.get('keyword', ''),
+            volume=keyword.get('volume', 0),
+            difficulty=keyword.get('difficulty', 50),
+            cpc=keyword.get('cpc', 0.0),
+            intent=self.cyrillic_processor.detect_keyword_intent_russian(keyword.get('keyword', '')),
+            seasonality={},
+            local_relevance=1.0,
+            cyrillic_variations=self.cyrillic_processor.generate_url_variations(keyword.get('keyword', '')),
+            current_ranking=keyword.get('current_ranking')
+        )
+
+    def deduplicate_keywords(self, keywords: Union[List[KeywordData], 'KeywordStore']) -> Union[List[KeywordData], 'KeywordStore']:
+        """Remove duplicate keywords"""
+        if isinstance(keywords, KeywordStore):
+            return keywords.deduplicate()
+
+        seen = set()
+        unique = []
+
+        for keyword in keywords:
+            if keyword.keyword.lower() not in seen:
+                seen.add(keyword.keyword.lower())
+                unique.append(keyword)
+
+        return unique
+
+    def calculate_opportunity_score(self, keyword: KeywordData) -> float:
+        """Calculate opportunity score for keyword prioritization"""
+        # Normalize volume (0-1)
+        volume_score = min(keyword.volume / 100000, 1.0)
+
+        # Normalize difficulty (inverted, easier = better)
+        difficulty_score = (100 - keyword.difficulty) / 100
+
+        # Intent scoring
+        intent_score = INTENT_SCORES.get(keyword.intent, DEFAULT_INTENT_SCORE)
+
+        # Local relevance
+        relevance_score = keyword.local_relevance
+
+        # Weighted combination
+        opportunity_score = (
+            volume_score * 0.3 +
+            difficulty_score * 0.3 +
+            intent_score * 0.25 +
+            relevance_score * 0.15
+        )
+
+        return opportunity_score
+
+    @instrumented
+    async def analyze_keyword_gaps(self,
+                                  our_domain: str,
+                                  competitor_domains: List[str],
+                                  market: str = 'RU',
+                                  concurrency: Optional[int] = None,
+                                  include_own_rankings: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Analyze keyword gaps against competitors. With include_own_rankings (default: the
+        gap_include_own_rankings setting) our own organic keywords are fetched too, costing one
+        more provider call, and keywords we already rank for stop counting as gaps. With history
+        enabled they are always fetched, so every run records our rankings for rank_drops().
+        """
+        print(f"🔍 Analyzing keyword gaps for {our_domain} vs {len(competitor_domains)} competitors")
+        if include_own_rankings is None:
+            include_own_rankings = self.config['gap_include_own_rankings']
+
+        gap_analysis = {
+            'keyword_gaps': [],
+            'shared_keyword_gaps': [],
+            'content_gaps': [],
+            'opportunity_keywords': [],
+            'competitor_strengths': {},
+            'failed_competitors': {}
+        }
+
+        # Our keywords (the strategy, plus optionally what we already rank for) and every
+        # competitor's keywords go into one normalized index; gaps are then bitmap tests over a single pass
+        index = KeywordGapIndex(self.cyrillic_processor.normalize_keyword)
+        index.add_domain(our_domain, (kw.keyword for kw in self.current_strategy.get('keywords', [])))
+
+        # Analyze all competitors concurrently; the semaphore bounds the fan-out width
+        # while each connector enforces its own provider cap
+        if self.ahrefs.api_key:
+            await self.open_session()
+            semaphore = asyncio.Semaphore(concurrency or self.config['gap_concurrency'])
+            lookups = [self.analyze_competitor(competitor, market, semaphore) for competitor in competitor_domains]
+            fetch_own_rankings = include_own_rankings or self.history is not None
+            if fetch_own_rankings:
+                lookups.append(self.fetch_domain_keywords(our_domain, market))
+            results = await asyncio.gather(*lookups, return_exceptions=True)
+
+            observed = {}
+            if fetch_own_rankings:
+                our_rankings = results.pop()
+                if not isinstance(our_rankings, Exception):
+                    if include_own_rankings:
+                        index.add_domain(our_domain, our_rankings)
+                    observed[our_domain] = our_rankings
+
+            # Index in input order so each gap is represented by its first occurrence
+            for competitor, result in zip(competitor_domains, results):
+                if isinstance(result, Exception):
+                    gap_analysis['failed_competitors'][competitor] = f"{type(result).__name__}: {result}"
+                    continue
+
+                strengths, competitor_keywords = result
+                index.add_domain(competitor, competitor_keywords)
+                gap_analysis['competitor_strengths'][competitor] = strengths
+                observed[competitor] = competitor_keywords
+
+            analyzed = list(gap_analysis['competitor_strengths'])
+            gap_analysis['keyword_gaps'] = index.gaps([our_domain], analyzed)
+            # Gaps several competitors share are the strongest signal of missing demand
+            gap_analysis['shared_keyword_gaps'] = index.gaps([our_domain], analyzed, min_count=2)
+            self.instrumentation.count('seo_keywords_in_total', sum(len(keywords) for keywords in observed.values()),
+                                       stage='analyze_keyword_gaps')
+
+            if self.history is not None:
+                await self.history.arecord_run('gap_analysis', observed, market)
+
+        # Identify quick wins
+        gap_analysis['opportunity_keywords'] = self.identify_quick_wins(
+            gap_analysis['keyword_gaps']
+        )
+
+        if gap_analysis['failed_competitors']:
+            print(f"⚠️ {len(gap_analysis['failed_competitors'])} competitors failed: "
+                  f"{', '.join(gap_analysis['failed_competitors'])}")
+
+        self.instrumentation.count('seo_keywords_out_total', len(gap_analysis['keyword_gaps']), stage='analyze_keyword_gaps')
+        print(f"✅ Found {len(gap_analysis['keyword_gaps'])} gap keywords")
+        return gap_analysis
+
+    @instrumented
+    async def analyze_competitor(self,
+                                 competitor: str,
+                                 market: str,
+                                 semaphore: asyncio.Semaphore) -> Tuple[Dict[str, Any], List[KeywordData]]:
+        """Fetch one competitor's keywords and compute its strengths"""
+        async with semaphore:
+            competitor_keywords = await self.fetch_domain_keywords(competitor, market)
+
+            strengths = {
+                'total_keywords': len(competitor_keywords),
+                'high_value_keywords': [kw for kw in competitor_keywords if kw.volume > 10000],
+                'ranking_strengths': await self.identify_ranking_strengths(competitor, competitor_keywords)
+            }
+
+        return strengths, competitor_keywords
+
+    async def fetch_domain_keywords(self, domain: str, market: str = 'RU') -> List[KeywordData]:
+        """A domain's organic keywords with their current rankings"""
+        return [
+            self.enhance_keyword(kw)
+            for kw in await self.ahrefs.get_competitor_keywords(domain, market)
+        ]
+
+    async def identify_ranking_strengths(self,
+                                         competitor: str,
+                                         competitor_keywords: List[KeywordData]) -> List[str]:
+        """Identify the keywords a competitor is strongest on"""
+        # Prefer known top-10 positions, otherwise fall back to the highest-volume keywords
+        ranked = [kw for kw in competitor_keywords
+                  if kw.current_ranking is not None and kw.current_ranking <= 10]
+        if not ranked:
+            ranked = competitor_keywords
+
+        ranked = sorted(ranked, key=lambda kw: kw.volume, reverse=True)
+        return [kw.keyword for kw in ranked[:10]]
+
+    def identify_quick_wins(self, gap_keywords: List[KeywordData]) -> List[KeywordData]:
+        """Identify quick win opportunities from gap analysis"""
+        # Quick win criteria and opportunity ranking, evaluated column-wise
+        return KeywordFrame.from_keywords(gap_keywords).quick_wins(20).to_keywords()  # Top 20 quick wins
+
+    @instrumented
+    async def audit_technical_seo(self,
+                                 domain: str,
+                                 focus_areas: List[str] = None,
+                                 semaphore: Optional[asyncio.Semaphore] = None,
+                                 snapshots: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Perform comprehensive technical SEO audit"""
+        if focus_areas is None:
+            focus_areas = list(RussianTechnicalSEOAuditor.check_registry)
+
+        print(f"🔧 Auditing technical SEO for {domain}")
+
+        # Run every registered check for the requested areas concurrently; the page is
+        # fetched once into snapshots (url -> PageSnapshot) and shared by all of them
+        url = f"https://{domain}"
+        if snapshots is None:
+            snapshots = {}
+        if self.technical_auditor.fetch_pages:
+            await self.open_session()
+        areas = [area for area in focus_areas if area in RussianTechnicalSEOAuditor.check_registry]
+        audit_results = await self.run_page_checks(url, areas, semaphore, snapshots)
+
+        # Generate overall score from the merged (fresh or reused) results
+        audit_results['overall_score'] = self.calculate_technical_score(audit_results)
+        audit_results['priority_fixes'] = self.prioritize_technical_fixes(audit_results)
+        audit_results['errors'] = self.collect_check_errors(audit_results)
+
+        score = audit_results['overall_score']
+        print(f"✅ Technical audit complete. Score: {'n/a' if score is None else f'{score}/100'}")
+        if audit_results['errors']:
+            print(f"⚠️ {len(audit_results['errors'])} checks could not run and were left out of the score")
+        return audit_results
+
+    def audit_state_for(self, snapshot: Any) -> Optional[AuditStateStore]:
+        """The validator store, but only for audits that see HTTP responses; offline runs never open it"""
+        if self.audit_state is None:
+            return None
+        if isinstance(snapshot, PageSnapshot):
+            return None if snapshot.local else self.audit_state
+        return self.audit_state if snapshot is not None or self.technical_auditor.fetch_pages else None
+
+    async def run_page_checks(self,
+                              url: str,
+                              areas: List[str],
+                              semaphore: Optional[asyncio.Semaphore],
+                              snapshots: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the checks for one URL, reusing the stored results when the page is unchanged"""
+        state = self.audit_state_for(snapshots.get(url))
+        previous = await state.aget(url) if state is not None else None
+        if previous is not None and all(area in previous['results'] for area in areas):
+            # Conditional fetch: a 304 or an identical body means the old results still hold
+            try:
+                snapshot = await self.technical_auditor.get_snapshot(url, snapshots, previous)
+            except Exception:
+                snapshot = None
+            if snapshot is not None and (snapshot.not_modified or snapshot.body_hash == previous['body_hash']):
+                state.reused += 1
+                if not snapshot.not_modified:
+                    # Same content under new validators: refresh them so the next run gets a 304
+                    await state.aset(url, snapshot, previous['results'])
+                # Content checks carry over; timing checks are re-judged on this visit's response
+                auditor = self.technical_auditor
+                return {area: auditor.retime_result(area, previous['results'][area], snapshot)
+                        if area in auditor.timing_checks else previous['results'][area]
+                        for area in areas}
+
+        # A 304 without usable results has no body to check, so download the page in full
+        entry = snapshots.get(url)
+        if isinstance(entry, PageSnapshot) and entry.not_modified:
+            snapshots[url] = await PageSnapshot.fetch(await self.open_session(), url)
+
+        results = await asyncio.gather(*(self.run_technical_check(area, url, semaphore, snapshots)
+                                         for area in areas))
+        page_results = dict(zip(areas, results))
+
+        snapshot = snapshots.get(url)
+        if state is not None and isinstance(snapshot, PageSnapshot) and snapshot.status == 200:
+            state.audited += 1
+            # Keep other areas' results when the body is the same; errors are retried next run
+            stored = {}
+            if previous is not None and previous['body_hash'] == snapshot.body_hash:
+                stored.update(previous['results'])
+            stored.update({area: result for area, result in page_results.items() if result['status'] != 'error'})
+            for area in self.technical_auditor.timing_checks:
+                if area in page_results and area in stored:
+                    # Remember which findings came from timing so a reuse can swap them out
+                    issues, recommendations, _ = getattr(self.technical_auditor,
+                                                         self.technical_auditor.timing_checks[area])(snapshot)
+                    stored[area] = {**stored[area], 'timing': {'issues': issues, 'recommendations': recommendations}}
+            await state.aset(url, snapshot, stored)
+        return page_results
+
+    async def run_technical_check(self,
+                                  area: str,
+                                  url: str,
+                                  semaphore: Optional[asyncio.Semaphore] = None,
+                                  snapshots: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run one registered check, reporting failures as an 'error' result"""
+        check = self.technical_auditor.get_check(area)
+        if snapshots is None:
+            snapshots = {}
+        try:
+            if semaphore is None:
+                return await check(url, await self.technical_auditor.get_snapshot(url, snapshots))
+            async with semaphore:
+                return await check(url, await self.technical_auditor.get_snapshot(url, snapshots))
+        except Exception as error:
+            return {
+                'status': 'error',
+                'issues': [f"Check failed: {type(error).__name__}: {error}"],
+                'recommendations': []
+            }
+
+    async def audit_many(self,
+                         domains: List[str],
+                         focus_areas: List[str] = None,
+                         concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Audit many domains concurrently, yielding (domain, results) as each one finishes"""
+        # One limit shared by every check of every domain
+        semaphore = asyncio.Semaphore(concurrency or self.config['audit_concurrency'])
+        # Page snapshots are cached for the whole run, so repeated domains are fetched once
+        snapshots: Dict[str, Any] = {}
+
+        async def audit(domain: str) -> Tuple[str, Dict[str, Any]]:
+            return domain, await self.audit_technical_seo(domain, focus_areas, semaphore, snapshots)
+
+        tasks = [asyncio.create_task(audit(domain)) for domain in domains]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def audit_page(self,
+                         snapshot: 'PageSnapshot',
+                         focus_areas: List[str] = None) -> Dict[str, Any]:
+        """Run the technical checks against an already fetched page"""
+        if focus_areas is None:
+            focus_areas = list(RussianTechnicalSEOAuditor.check_registry)
+
+        areas = [area for area in focus_areas if area in RussianTechnicalSEOAuditor.check_registry]
+        page_results = await self.run_page_checks(snapshot.url, areas, None, {snapshot.url: snapshot})
+        page_results['overall_score'] = self.calculate_technical_score(page_results)
+        page_results['priority_fixes'] = self.prioritize_technical_fixes(page_results)
+        page_results['errors'] = self.collect_check_errors(page_results)
+        return page_results
+
+    @instrumented
+    async def audit_site(self,
+                         start_url: str,
+                         focus_areas: List[str] = None,
+                         max_pages: Optional[int] = None,
+                         mirror_of: Optional[str] = None,
+                         crawl_delay: Optional[float] = None) -> Dict[str, Any]:
+        """Crawl a whole site and audit every page, with per-page and site-wide scores"""
+        crawl = self.config['crawl']
+        session = await self.open_session()
+        crawler = SiteCrawler(
+            session,
+            max_pages=max_pages or crawl['max_pages'],
+            workers=crawl['workers'],
+            per_host_concurrency=crawl['per_host_concurrency'],
+            crawl_delay=crawl_delay if crawl_delay is not None else crawl['crawl_delay'],
+            max_crawl_delay=crawl['max_crawl_delay'],
+            user_agent=crawl['user_agent'],
+            mirror_of=mirror_of,
+            state=self.audit_state
+        )
+
+        print(f"🕷️ Crawling {start_url} for a full-site technical audit")
+        started = time.perf_counter()
+
+        # Only compact per-page summaries are kept, so memory grows with the URL count alone
+        pages: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        area_status: Dict[str, Counter] = {}
+        issue_counts: Counter = Counter()
+        async for url, page_results in crawler.crawl(start_url, lambda snapshot: self.audit_page(snapshot, focus_areas)):
+            if 'error' in page_results:
+                errors[url] = page_results['error']
+                continue
+            statuses = {}
+            for area, result in page_results.items():
+                if isinstance(result, dict) and 'status' in result:
+                    statuses[area] = result['status']
+                    area_status.setdefault(area, Counter())[result['status']] += 1
+                    issue_counts.update(result['issues'])
+            pages[url] = {'overall_score': page_results['overall_score'], 'statuses': statuses}
+
+        elapsed = time.perf_counter() - started
+        scored = [url for url, page in pages.items() if page['overall_score'] is not None]
+        scores = [pages[url]['overall_score'] for url in scored]
+        site_results = {
+            'pages': pages,
+            'pages_audited': len(pages),
+            'site_score': int(sum(scores) / len(scores)) if scores else 0,
+            'area_status': {area: dict(counter) for area, counter in area_status.items()},
+            'top_issues': issue_counts.most_common(20),
+            'worst_pages': sorted(scored, key=lambda url: pages[url]['overall_score'])[:10],
+            'errors': errors,
+            'crawl_stats': dict(crawler.stats),
+            'duration_seconds': round(elapsed, 3),
+            'pages_per_minute': round(len(pages) / elapsed * 60, 1) if elapsed else 0.0
+        }
+
+        print(f"✅ Site audit complete: {len(pages)} pages, score {site_results['site_score']}/100, "
+              f"{site_results['pages_per_minute']:.0f} pages/min")
+        return site_results
+
+    def calculate_technical_score(self, audit_results: Dict[str, Any]) -> Optional[int]:
+        """Calculate overall technical SEO score (None when no check could run)"""
+        scores = []
+
+        for area, result in audit_results.items():
+            # Checks that failed to run say nothing about the site, so they are not scored
+            if isinstance(result, dict) and 'status' in result and result['status'] != 'error':
+                if result['status'] == 'pass':
+                    scores.append(100)
+                elif result['status'] == 'warning':
+                    scores.append(70)
+                else:
+                    scores.append(30)
+
+        return int(sum(scores) / len(scores)) if scores else None
+
+    def collect_check_errors(self, audit_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Checks that could not run, kept apart from the score and the fix list"""
+        return [
+            {'area': area, 'issues': result.get('issues', [])}
+            for area, result in audit_results.items()
+            if isinstance(result, dict) and result.get('status') == 'error'
+        ]
+
+    def prioritize_technical_fixes(self, audit_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Prioritize technical fixes by impact and effort"""
+        fixes = []
+
+        priority_mapping = {
+            'cyrillic_support': {'impact': 'high', 'effort': 'low'},
+            'yandex_optimization': {'impact': 'high', 'effort': 'medium'},
+            'mobile_performance': {'impact': 'high', 'effort': 'medium'},
+            'page_speed_russia': {'impact': 'medium', 'effort': 'low'},
+            'schema_markup': {'impact': 'medium', 'effort': 'low'}
+        }
+
+        for area, result in audit_results.items():
+            if isinstance(result, dict) and result.get('status') == 'fail':
+                fix = {
+                    'area': area,
+                    'issues': result.get('issues', []),
+                    'recommendations': result.get('recommendations', []),
+                    'priority': self.calculate_fix_priority(
+                        priority_mapping.get(area, {'impact': 'medium', 'effort': 'medium'})
+                    )
+                }
+                fixes.append(fix)
+
+        # Sort by priority
+        fixes.sort(key=lambda x: x['priority'], reverse=True)
+        return fixes
+
+    def calculate_fix_priority(self, fix_data: Dict[str, str]) -> int:
+        """Calculate priority score for technical fixes"""
+        impact_scores = {'high': 3, 'medium': 2, 'low': 1}
+        effort_scores = {'low': 3, 'medium': 2, 'high': 1}  # Lower effort = higher score
+
+        impact = impact_scores.get(fix_data['impact'], 2)
+        effort = effort_scores.get(fix_data['effort'], 2)
+
+        return impact * effort
+
+    @instrumented
+    async def generate_strategy_update(self,
+                                     new_keywords: List[KeywordData],
+                                     gap_analysis: Dict[str, Any],
+                                     technical_audit: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate comprehensive strategy update recommendations"""
+        print("📋 Generating strategy update recommendations...")
+
+        update = {
+            'timestamp': datetime.now().isoformat(),
+            'summary': {
+                'new_keywords_found': len(new_keywords),
+                'keyword_gaps_identified': len(gap_analysis.get('keyword_gaps', [])),
+                'quick_wins_available': len(gap_analysis.get('opportunity_keywords', [])),
+                'technical_score': technical_audit.get('overall_score', 0),
+                'technical_check_errors': len(technical_audit.get('errors', [])),
+                'priority_fixes': len(technical_audit.get('priority_fixes', []))
+            },
+            'keyword_recommendations': {
+                'high_priority_additions': new_keywords[:10],
+                'quick_win_opportunities': gap_analysis.get('opportunity_keywords', [])[:5],
+                'content_gap_keywords': gap_analysis.get('content_gaps', [])[:5]
+            },
+            'technical_recommendations': {
+                'immediate_fixes': [fix for fix in technical_audit.get('priority_fixes', []) if fix['priority'] >= 6],
+                'medium_term_improvements': [fix for fix in technical_audit.get('priority_fixes', []) if 3 <= fix['priority'] < 6],
+                'long_term_optimizations': [fix for fix in technical_audit.get('priority_fixes', []) if fix['priority'] < 3]
+            },
+            'competitive_insights': {
+                'competitor_strengths': gap_analysis.get('competitor_strengths', {}),
+                'market_opportunities': self.identify_market_opportunities(gap_analysis)
+            },
+            'implementation_timeline': self.create_implementation_timeline(new_keywords, gap_analysis, technical_audit)
+        }
+        if self.topic_clusterer is not None:
+            update['keyword_recommendations']['keyword_clusters'] = await self.cluster_keywords(
+                new_keywords + gap_analysis.get('keyword_gaps', [])
+            )
+
+        print("✅ Strategy update generated successfully")
+        return update
+
+    def identify_market_opportunities(self, gap_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Identify market opportunities from gap analysis"""
+        opportunities = []
+
+        # Analyze competitor weaknesses
+        competitor_strengths = gap_analysis.get('competitor_strengths', {})
+
+        for competitor, data in competitor_strengths.items():
+            high_value_keywords = data.get('high_value_keywords', [])
+
+            # Look for underutilized high-value keywords
+            underutilized = [kw for kw in high_value_keywords if kw.difficulty < 50]
+
+            if underutilized:
+                opportunities.append({
+                    'type': 'competitor_weakness',
+                    'competitor': competitor,
+                    'opportunity': f"Target {len(underutilized)} underutilized high-value keywords",
+                    'keywords': underutilized[:5],
+                    'estimated_impact': 'high'
+                })
+
+        return opportunities
+
+    def create_implementation_timeline(self,
+                                     new_keywords: List[KeywordData],
+                                     gap_analysis: Dict[str, Any],
+                                     technical_audit: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Create implementation timeline for recommendations"""
+        timeline = {
+            'week_1': [],
+            'week_2-4': [],
+            'month_2-3': [],
+            'quarter_2': []
+        }
+
+        # Week 1: Critical technical fixes
+        immediate_fixes = technical_audit.get('priority_fixes', [])[:3]
+        for fix in immediate_fixes:
+            timeline['week_1'].append(f"Fix {fix['area']}: {fix['issues'][0] if fix['issues'] else 'General improvements'}")
+
+        # Week 2-4: Quick win keywords
+        quick_wins = gap_analysis.get('opportunity_keywords', [])[:5]
+        for kw in quick_wins:
+            timeline['week_2-4'].append(f"Target keyword: {kw.keyword}")
+
+        # Month 2-3: New high-priority keywords
+        high_priority = new_keywords[:10]
+        for kw in high_priority:
+            timeline['month_2-3'].append(f"Develop content for: {kw.keyword}")
+
+        # Quarter 2: Long-term technical improvements
+        long_term_fixes = technical_audit.get('priority_fixes', [])[3:]
+        for fix in long_term_fixes:
+            timeline['quarter_2'].append(f"Implement {fix['area']} improvements")
+
+        return timeline
+
+    @instrumented
+    async def save_analysis_results(self,
+                                   results: Dict[str, Any],
+                                   output_file: str = 'seo_analysis_results.json') -> str:
+        """Save analysis results to file"""
+        results_config = self.config['results']
+        writer = AnalysisResultsWriter(results_config['output_dir'], table_format=results_config['table_format'])
+
+        # Keyword lists become columnar tables; everything else is compact JSON
+        output_path = await asyncio.to_thread(writer.save, results, output_file, self.make_serializable)
+
+        print(f"💾 Analysis results saved to {output_path}")
+        return str(output_path)
+
+    def load_analysis_results(self, path: Union[str, Path]) -> Dict[str, Any]:
+        """Load saved results; keyword tables are opened lazily (memory-mapped for Arrow)"""
+        return AnalysisResultsWriter.load(path)
+
+    def make_serializable(self, obj: Any) -> Any:
+        """Convert objects to JSON-serializable format"""
+        if isinstance(obj, (KeywordData, CompactKeywordData)):
+            return {
+                'keyword': obj.keyword,
+                'volume': obj.volume,
+                'difficulty': obj.difficulty,
+                'cpc': obj.cpc,
+                'intent': str(obj.intent),
+                'seasonality': dict(obj.seasonality),
+                'local_relevance': obj.local_relevance,
+                'cyrillic_variations': list(obj.cyrillic_variations),
+                'current_ranking': obj.current_ranking,
+                'competition_level': str(obj.competition_level)
+            }
+        elif isinstance(obj, KeywordStore):
+            return [self.make_serializable(keyword) for keyword in obj]
+        elif isinstance(obj, CompetitorData):
+            return {
+                'domain': obj.domain,
+                'organic_keywords': obj.organic_keywords,
+                'organic_traffic': obj.organic_traffic,
+                'backlinks': obj.backlinks,
+                'domain_authority': obj.domain_authority,
+                'top_keywords': [self.make_serializable(kw) for kw in obj.top_keywords],
+                'content_gaps': obj.content_gaps
+            }
+        elif isinstance(obj, list):
+            return [self.make_serializable(item) for item in obj]
+        elif isinstance(obj, dict):
+            return {key: self.make_serializable(value) for key, value in obj.items()}
+        else:
+            return obj
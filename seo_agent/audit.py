@@ -0,0 +1,843 @@
+"""
+Page snapshots, the technical SEO auditor and the site crawler
+"""
+
+import asyncio
+import aiohttp
+import json
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Any, Set, Tuple, Union, Callable, Awaitable, AsyncIterator
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+
+# Patterns for the technical page checks
+CYRILLIC_PATTERN = re.compile(r'[а-яё]', re.IGNORECASE)
+CYRILLIC_ENTITY_PATTERN = re.compile(r'&#(?:102[4-9]|10[3-9]\d|11\d\d|12[0-7]\d);|&#x4[0-9a-f]{2};', re.IGNORECASE)
+CHARSET_PATTERN = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+class PageDocument(HTMLParser):
+    """Single-pass summary of the HTML elements the technical checks inspect"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lang: Optional[str] = None
+        self.title = ''
+        self.meta: List[Dict[str, str]] = []
+        self.links: List[Dict[str, str]] = []
+        self.images: List[Dict[str, str]] = []
+        self.anchors: List[str] = []
+        self.scripts: List[Dict[str, Any]] = []
+        self.cyrillic_chars = 0
+        self._script: Optional[Dict[str, Any]] = None
+        self._in_title = False
+        self._in_style = False
+
+    @classmethod
+    def parse(cls, text: str) -> 'PageDocument':
+        document = cls()
+        document.feed(text)
+        document.close()
+        return document
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        values = {name.lower(): value or '' for name, value in attrs}
+        if tag == 'html':
+            self.lang = values.get('lang')
+        elif tag == 'meta':
+            self.meta.append(values)
+        elif tag == 'link':
+            self.links.append(values)
+        elif tag == 'img':
+            self.images.append(values)
+        elif tag == 'a' and values.get('href'):
+            self.anchors.append(values['href'])
+        elif tag == 'script':
+            self._script = {'attrs': values, 'content': []}
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'style':
+            self._in_style = True
+
+    def handle_endtag(self, tag: str):
+        if tag == 'script' and self._script is not None:
+            self._script['content'] = ''.join(self._script['content'])
+            self.scripts.append(self._script)
+            self._script = None
+        elif tag == 'title':
+            self._in_title = False
+        elif tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data: str):
+        if self._script is not None:
+            self._script['content'].append(data)
+        elif self._in_style:
+            return
+        else:
+            if self._in_title:
+                self.title += data
+            self.cyrillic_chars += len(CYRILLIC_PATTERN.findall(data))
+
+    def meta_content(self, name: str) -> Optional[str]:
+        """Content of the first <meta name=...> (or property=...) matching name"""
+        name = name.lower()
+        for values in self.meta:
+            if values.get('name', values.get('property', '')).lower() == name:
+                return values.get('content', '')
+        return None
+
+    def declared_charset(self) -> Optional[str]:
+        """Charset declared by <meta charset> or the http-equiv Content-Type"""
+        for values in self.meta:
+            if 'charset' in values:
+                return values['charset'].strip().lower()
+            if values.get('http-equiv', '').lower() == 'content-type':
+                match = CHARSET_PATTERN.search(values.get('content', ''))
+                if match:
+                    return match.group(1).lower()
+        return None
+
+
+class PageStatusError(Exception):
+    """Raised when a page to audit answers with a non-2xx status"""
+
+    def __init__(self, url: str, status: int):
+        super().__init__(f"{url} responded with HTTP {status}")
+        self.url = url
+        self.status = status
+
+
+class PageSnapshot:
+    """One fetched page, shared by every technical check that inspects it"""
+
+    def __init__(self,
+                 url: str,
+                 status: int,
+                 headers: Dict[str, str],
+                 body: bytes,
+                 elapsed: float = 0.0,
+                 time_to_first_byte: float = 0.0,
+                 local: bool = False,
+                 requested_url: Optional[str] = None):
+        self.url = url
+        # The URL asked for, before any redirects; url is where the page was actually served
+        self.requested_url = requested_url or url
+        self.status = status
+        self.headers = {name.lower(): value for name, value in headers.items()}
+        self.body = body
+        self.elapsed = elapsed
+        self.time_to_first_byte = time_to_first_byte
+        # Loaded from disk rather than over HTTP: transport checks do not apply
+        self.local = local
+        self._text: Optional[str] = None
+        self._document: Optional[PageDocument] = None
+        self._json_ld: Optional[List[Dict[str, Any]]] = None
+        self._body_hash: Optional[str] = None
+        self.json_ld_errors = 0
+
+    @classmethod
+    async def fetch(cls,
+                    session: aiohttp.ClientSession,
+                    url: str,
+                    validators: Optional[Dict[str, Any]] = None) -> 'PageSnapshot':
+        """Download a page once over the shared session, conditionally when validators are given"""
+        started = time.perf_counter()
+        headers = {'Accept': 'text/html,application/xhtml+xml', 'Accept-Language': 'ru-RU,ru;q=0.9'}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        async with session.get(url, headers=headers) as response:
+            time_to_first_byte = time.perf_counter() - started
+            body = await response.read()
+            return cls(str(response.url), response.status, dict(response.headers), body,
+                       elapsed=time.perf_counter() - started,
+                       time_to_first_byte=time_to_first_byte,
+                       requested_url=url)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], url: Optional[str] = None) -> 'PageSnapshot':
+        """Build a snapshot from a local HTML file, e.g. a checked-in page"""
+        path = Path(path)
+        return cls(url or path.resolve().as_uri(), 200, {}, path.read_bytes(), local=True)
+
+    @property
+    def not_modified(self) -> bool:
+        """The server answered a conditional request with 304: the body was not resent"""
+        return self.status == 304
+
+    @property
+    def body_hash(self) -> str:
+        if self._body_hash is None:
+            self._body_hash = hashlib.sha256(self.body).hexdigest()
+        return self._body_hash
+
+    @property
+    def header_charset(self) -> Optional[str]:
+        match = CHARSET_PATTERN.search(self.headers.get('content-type', ''))
+        return match.group(1).lower() if match else None
+
+    @property
+    def encoding(self) -> str:
+        """Charset from the Content-Type header, else the page's own <meta>, else UTF-8"""
+        charset = self.header_charset
+        if charset is None:
+            match = META_CHARSET_PATTERN.search(self.body[:2048])
+            charset = match.group(1).decode('ascii').lower() if match else None
+        return charset or 'utf-8'
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            try:
+                self._text = self.body.decode(self.encoding, errors='replace')
+            except LookupError:
+                self._text = self.body.decode('utf-8', errors='replace')
+        return self._text
+
+    @property
+    def document(self) -> PageDocument:
+        """Parsed element summary, built on first use"""
+        if self._document is None:
+            self._document = PageDocument.parse(self.text)
+        return self._document
+
+    @property
+    def json_ld(self) -> List[Dict[str, Any]]:
+        """Every JSON-LD node on the page, with @graph containers flattened"""
+        if self._json_ld is None:
+            nodes = []
+            for script in self.document.scripts:
+                if script['attrs'].get('type', '').lower() != 'application/ld+json':
+                    continue
+                try:
+                    pending = [json.loads(script['content'])]
+                except ValueError:
+                    self.json_ld_errors += 1
+                    continue
+                while pending:
+                    item = pending.pop()
+                    if isinstance(item, list):
+                        pending.extend(item)
+                    elif isinstance(item, dict):
+                        nodes.append(item)
+                        pending.extend(value for value in item.values() if isinstance(value, (dict, list)))
+            self._json_ld = nodes
+        return self._json_ld
+
+    def schema_types(self) -> Set[str]:
+        types = set()
+        for node in self.json_ld:
+            node_type = node.get('@type')
+            types.update(node_type if isinstance(node_type, list) else [node_type] if node_type else [])
+        return types
+
+
+class RussianTechnicalSEOAuditor:
+    """Technical SEO auditor for Russian websites"""
+
+    # Focus area -> check method; audit_technical_seo dispatches through this table
+    check_registry = {
+        'cyrillic_support': 'check_cyrillic_rendering',
+        'yandex_optimization': 'check_yandex_requirements',
+        'mobile_performance': 'check_mobile_compliance',
+        'schema_markup': 'check_schema_markup',
+        'page_speed_russia': 'check_speed_from_russia'
+    }
+
+    # Bump whenever a check's rules change, so results stored for unchanged pages are not reused
+    checks_version = 1
+    # Areas whose findings depend on this visit's response timing: area -> timing findings method
+    timing_checks = {'page_speed_russia': 'speed_timing_findings'}
+
+    slow_page_seconds = 3.0
+    max_html_bytes = 500 * 1024
+    eager_image_allowance = 3
+
+    def __init__(self, fetch_pages: bool = False):
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Download pages that are not already in the snapshot cache; binding a session alone does not
+        self.fetch_pages = fetch_pages
+
+    def bind_session(self, session: Optional[aiohttp.ClientSession]):
+        """Attach the agent's pooled session (or detach with None)"""
+        self.session = session
+
+    def get_check(self, area: str) -> Callable[..., Awaitable[Dict[str, Any]]]:
+        """Resolve a focus area to its bound check method"""
+        return getattr(self, self.check_registry[area])
+
+    async def get_snapshot(self,
+                           url: str,
+                           snapshots: Dict[str, Any],
+                           validators: Optional[Dict[str, Any]] = None) -> Optional[PageSnapshot]:
+        """Fetch url at most once per audit run; concurrent callers share the same download"""
+        entry = snapshots.get(url)
+        if entry is None:
+            if not self.fetch_pages or self.session is None or self.session.closed:
+                return None
+            entry = snapshots[url] = asyncio.ensure_future(PageSnapshot.fetch(self.session, url, validators))
+        if not isinstance(entry, PageSnapshot):
+            # Shielded so one cancelled check does not abort the fetch for the others
+            entry = snapshots[url] = await asyncio.shield(entry)
+        # An error page is not the site: every check reports it as an error rather than auditing it
+        if not (200 <= entry.status < 300 or entry.not_modified):
+            raise PageStatusError(entry.url, entry.status)
+        return entry
+
+    @staticmethod
+    def result(issues: List[str], recommendations: List[str], failed: bool = False) -> Dict[str, Any]:
+        status = 'fail' if failed else 'warning' if issues else 'pass'
+        return {'status': status, 'issues': issues, 'recommendations': recommendations}
+
+    async def check_cyrillic_rendering(self, url: str, snapshot: Optional[PageSnapshot] = None) -> Dict[str, Any]:
+        """Check Cyrillic text rendering"""
+        if snapshot is None:
+            return {
+                'status': 'pass',
+                'issues': [],
+                'recommendations': [
+                    'Ensure UTF-8 encoding is properly declared',
+                    'Test Cyrillic fonts across different devices',
+                    'Validate HTML entities are not used for Cyrillic text'
+                ]
+            }
+
+        issues, recommendations, failed = [], [], False
+        charset = snapshot.header_charset or snapshot.document.declared_charset()
+        if charset is None:
+            issues.append('No charset declared in headers or <meta>')
+            recommendations.append('Ensure UTF-8 encoding is properly declared')
+        elif charset.replace('_', '-') not in ('utf-8', 'utf8'):
+            failed = True
+            issues.append(f'Page declares {charset} instead of UTF-8')
+            recommendations.append('Serve and declare the page as UTF-8')
+        try:
+            snapshot.body.decode('utf-8')
+        except UnicodeDecodeError:
+            failed = True
+            issues.append('Page body is not valid UTF-8')
+            recommendations.append('Re-encode templates and content as UTF-8')
+
+        entities = len(CYRILLIC_ENTITY_PATTERN.findall(snapshot.text))
+        if entities:
+            issues.append(f'{entities} Cyrillic characters encoded as HTML entities')
+            recommendations.append('Validate HTML entities are not used for Cyrillic text')
+        if snapshot.document.cyrillic_chars and not (snapshot.document.lang or '').lower().startswith('ru'):
+            issues.append('Russian content without lang="ru" on <html>')
+            recommendations.append('Set lang="ru" on the <html> element')
+
+        return self.result(issues, recommendations, failed)
+
+    async def check_yandex_requirements(self, url: str, snapshot: Optional[PageSnapshot] = None) -> Dict[str, Any]:
+        """Check Yandex-specific requirements"""
+        if snapshot is None:
+            return {
+                'status': 'warning',
+                'issues': [
+                    'Missing Yandex.Metrica counter',
+                    'Yandex.Webmaster verification not found'
+                ],
+                'recommendations': [
+                    'Install Yandex.Metrica for better analytics',
+                    'Add Yandex.Webmaster verification meta tag',
+                    'Optimize for Yandex mobile ranking factors'
+                ]
+            }
+
+        issues, recommendations = [], []
+        document = snapshot.document
+        has_metrica = any('mc.yandex.ru/metrika' in script['attrs'].get('src', '')
+                          or 'mc.yandex.ru/metrika' in script['content']
+                          for script in document.scripts)
+        if not has_metrica:
+            issues.append('Missing Yandex.Metrica counter')
+            recommendations.append('Install Yandex.Metrica for better analytics')
+        if not document.meta_content('yandex-verification'):
+            issues.append('Yandex.Webmaster verification not found')
+            recommendations.append('Add Yandex.Webmaster verification meta tag')
+        if not document.meta_content('description'):
+            issues.append('Missing meta description used for Yandex snippets')
+            recommendations.append('Add a Russian meta description to every page')
+
+        return self.result(issues, recommendations)
+
+    async def check_mobile_compliance(self, url: str, snapshot: Optional[PageSnapshot] = None) -> Dict[str, Any]:
+        """Check mobile compliance"""
+        if snapshot is None:
+            return {
+                'status': 'pass',
+                'issues': [],
+                'recommendations': [
+                    'Test on popular Russian mobile devices',
+                    'Optimize for slower mobile connections',
+                    'Ensure touch targets are appropriately sized'
+                ]
+            }
+
+        issues, recommendations, failed = [], [], False
+        viewport = (snapshot.document.meta_content('viewport') or '').replace(' ', '').lower()
+        if 'width=device-width' not in viewport:
+            failed = True
+            issues.append('No responsive viewport meta tag')
+            recommendations.append('Add <meta name="viewport" content="width=device-width, initial-scale=1.0">')
+        elif 'user-scalable=no' in viewport or 'maximum-scale=1' in viewport.replace('.0', ''):
+            issues.append('Viewport disables pinch zoom')
+            recommendations.append('Allow users to zoom on mobile devices')
+
+        unsized = sum(1 for image in snapshot.document.images
+                      if not (image.get('width') and image.get('height')))
+        if unsized:
+            issues.append(f'{unsized} images without explicit width/height cause layout shift')
+            recommendations.append('Set width and height on every <img>')
+
+        return self.result(issues, recommendations, failed)
+
+    async def check_schema_markup(self, url: str, snapshot: Optional[PageSnapshot] = None) -> Dict[str, Any]:
+        """Check schema markup implementation"""
+        if snapshot is None:
+            return {
+                'status': 'fail',
+                'issues': [
+                    'No VideoGame schema found',
+                    'Missing Organization schema',
+                    'No FAQ schema for common questions'
+                ],
+                'recommendations': [
+                    'Implement VideoGame schema for game listings',
+                    'Add Organization schema with Russian contact info',
+                    'Create FAQ schema for common user questions'
+                ]
+            }
+
+        issues, recommendations = [], []
+        types = snapshot.schema_types()
+        if snapshot.json_ld_errors:
+            issues.append(f'{snapshot.json_ld_errors} JSON-LD blocks could not be parsed')
+            recommendations.append('Validate structured data with the Yandex microdata validator')
+        if not types & {'VideoGame', 'Game'}:
+            issues.append('No VideoGame schema found')
+            recommendations.append('Implement VideoGame schema for game listings')
+        if 'Organization' not in types:
+            issues.append('Missing Organization schema')
+            recommendations.append('Add Organization schema with Russian contact info')
+        if 'FAQPage' not in types:
+            issues.append('No FAQ schema for common questions')
+            recommendations.append('Create FAQ schema for common user questions')
+
+        return self.result(issues, recommendations, failed=len(issues) >= 2)
+
+    async def check_speed_from_russia(self, url: str, snapshot: Optional[PageSnapshot] = None) -> Dict[str, Any]:
+        """Check page speed from Russian locations"""
+        if snapshot is None:
+            return {
+                'status': 'warning',
+                'issues': [
+                    'Slow loading from Russian CDN locations',
+                    'Large image files not optimized'
+                ],
+                'recommendations': [
+                    'Implement Russian CDN endpoints',
+                    'Optimize images for mobile connections',
+                    'Enable browser caching for static assets'
+                ]
+            }
+
+        issues, recommendations, failed = self.speed_timing_findings(snapshot)
+        if not snapshot.local:
+            if 'content-encoding' not in snapshot.headers:
+                issues.append('HTML response is not compressed')
+                recommendations.append('Enable gzip or brotli compression')
+            if 'cache-control' not in snapshot.headers:
+                issues.append('No Cache-Control header on the HTML response')
+                recommendations.append('Enable browser caching for static assets')
+
+        if len(snapshot.body) > self.max_html_bytes:
+            issues.append(f'HTML document is {len(snapshot.body) // 1024} KB')
+            recommendations.append('Trim inline scripts and styles from the HTML')
+        eager = sum(1 for image in snapshot.document.images
+                    if image.get('loading', '').lower() != 'lazy')
+        if eager > self.eager_image_allowance:
+            issues.append(f'{eager} images load eagerly')
+            recommendations.append('Add loading="lazy" to below-the-fold images')
+
+        return self.result(issues, recommendations, failed)
+
+    def speed_timing_findings(self, snapshot: PageSnapshot) -> Tuple[List[str], List[str], bool]:
+        """Issues, recommendations and failure from how fast this response arrived"""
+        if snapshot.local or snapshot.elapsed <= self.slow_page_seconds:
+            return [], [], False
+        return ([f'Page took {snapshot.elapsed:.1f}s to load (first byte after {snapshot.time_to_first_byte:.1f}s)'],
+                ['Implement Russian CDN endpoints'],
+                snapshot.elapsed > 2 * self.slow_page_seconds)
+
+    def retime_result(self, area: str, stored: Dict[str, Any], snapshot: PageSnapshot) -> Dict[str, Any]:
+        """A stored timing-check result with its old timing findings replaced by this visit's"""
+        timing = stored.get('timing', {'issues': [], 'recommendations': []})
+        issues = [issue for issue in stored['issues'] if issue not in timing['issues']]
+        recommendations = [item for item in stored['recommendations'] if item not in timing['recommendations']]
+        timing_issues, timing_recommendations, failed = getattr(self, self.timing_checks[area])(snapshot)
+        return self.result(timing_issues + issues, timing_recommendations + recommendations, failed)
+
+
+class HostPoliteness:
+    """Per-host concurrency cap plus a minimum spacing between request starts"""
+
+    def __init__(self, concurrency: int, delay: float = 0.0):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.next_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            if self.delay > 0:
+                now = time.monotonic()
+                start = max(now, self.next_start)
+                self.next_start = start + self.delay
+                if start > now:
+                    await asyncio.sleep(start - now)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.semaphore.release()
+
+
+class SiteCrawler:
+    """Concurrent same-site crawler seeded from robots.txt and sitemap.xml"""
+
+    max_sitemaps = 50
+
+    def __init__(self,
+                 session: aiohttp.ClientSession,
+                 max_pages: int = 5000,
+                 workers: int = 20,
+                 per_host_concurrency: int = 8,
+                 crawl_delay: Optional[float] = None,
+                 max_crawl_delay: float = 10.0,
+                 user_agent: str = 'GrabGiftsSEOBot',
+                 mirror_of: Optional[str] = None,
+                 state: Optional['AuditStateStore'] = None):
+        self.session = session
+        # Stored validators turn revisits of unchanged pages into 304s
+        self.state = state
+        self.max_pages = max_pages
+        self.workers = workers
+        self.per_host_concurrency = per_host_concurrency
+        # None means "use the robots.txt Crawl-delay"; 0 disables spacing (local mirrors)
+        self.crawl_delay = crawl_delay
+        self.max_crawl_delay = max_crawl_delay
+        self.user_agent = user_agent
+        # Sitemap/link URLs on the mirrored origin are rebased onto the crawl origin
+        self.mirror_of = self.origin_of(mirror_of) if mirror_of else None
+        self.origin = ''
+        self.robots: Optional[RobotFileParser] = None
+        self.hosts: Dict[str, HostPoliteness] = {}
+        # 8-byte digests keep the dedup set small however long the URLs are
+        self.seen: Set[bytes] = set()
+        self.queued = 0
+        self.frontier: asyncio.Queue = asyncio.Queue()
+        self.stats = {'fetched': 0, 'audited': 0, 'unchanged': 0, 'skipped': 0, 'errors': 0, 'disallowed': 0}
+
+    @staticmethod
+    def origin_of(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+    @staticmethod
+    def normalize_url(url: str) -> Optional[str]:
+        """Canonical form used for dedup: no fragment, lowercase scheme/host, '/' for empty paths"""
+        url, _ = urldefrag(url.strip())
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+            return None
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+    def host_policy(self, url: str) -> HostPoliteness:
+        host = urlsplit(url).netloc
+        policy = self.hosts.get(host)
+        if policy is None:
+            policy = self.hosts[host] = HostPoliteness(self.per_host_concurrency, self.crawl_delay or 0.0)
+        return policy
+
+    def enqueue(self, url: str) -> bool:
+        """Add url to the frontier unless it is off-site, disallowed, already seen or over budget"""
+        url = self.normalize_url(url)
+        if url is None:
+            return False
+        if self.mirror_of and url.startswith(self.mirror_of):
+            url = self.origin + url[len(self.mirror_of):]
+        if not url.startswith(self.origin + '/'):
+            return False
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+        if digest in self.seen or self.queued >= self.max_pages:
+            return False
+        self.seen.add(digest)
+        if self.robots is not None and not self.robots.can_fetch(self.user_agent, url):
+            self.stats['disallowed'] += 1
+            return False
+        self.queued += 1
+        self.frontier.put_nowait(url)
+        return True
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        try:
+            async with self.host_policy(url):
+                snapshot = await PageSnapshot.fetch(self.session, url)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        return snapshot.text if snapshot.status == 200 else None
+
+    async def load_robots(self) -> List[str]:
+        """Parse robots.txt and return the sitemap URLs it lists"""
+        robots_txt = await self.fetch_text(f"{self.origin}/robots.txt")
+        if robots_txt is None:
+            return [f"{self.origin}/sitemap.xml"]
+
+        self.robots = RobotFileParser()
+        self.robots.parse(robots_txt.splitlines())
+        if self.crawl_delay is None:
+            delay = self.robots.crawl_delay(self.user_agent)
+            self.crawl_delay = min(float(delay), self.max_crawl_delay) if delay else 0.0
+            self.hosts.clear()
+        return self.robots.site_maps() or [f"{self.origin}/sitemap.xml"]
+
+    async def load_sitemaps(self, sitemap_urls: List[str]) -> int:
+        """Seed the frontier from sitemap <loc> entries, following sitemap indexes"""
+        pending, visited, seeded = list(sitemap_urls), set(), 0
+        while pending and len(visited) < self.max_sitemaps:
+            sitemap_url = pending.pop()
+            if self.mirror_of and sitemap_url.startswith(self.mirror_of):
+                sitemap_url = self.origin + sitemap_url[len(self.mirror_of):]
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            document = await self.fetch_text(sitemap_url)
+            if document is None:
+                continue
+            try:
+                root = ElementTree.fromstring(document.encode('utf-8'))
+            except ElementTree.ParseError:
+                continue
+            is_index = root.tag.endswith('sitemapindex')
+            for entry in root:
+                for child in entry:
+                    if child.tag.rsplit('}', 1)[-1] != 'loc' or not child.text:
+                        continue
+                    if is_index:
+                        pending.append(child.text.strip())
+                    elif self.enqueue(child.text):
+                        seeded += 1
+        return seeded
+
+    async def crawl(self,
+                    start_url: str,
+                    audit_page: Callable[[PageSnapshot], Awaitable[Dict[str, Any]]]
+                    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Crawl the site behind start_url, yielding (url, audit_page result) per HTML page"""
+        self.origin = self.origin_of(start_url)
+        sitemaps = await self.load_robots()
+        self.enqueue(start_url)
+        await self.load_sitemaps(sitemaps)
+
+        # Bounded so a slow consumer pauses the workers instead of buffering every page
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        done = object()
+
+        async def worker():
+            while True:
+                url = await self.frontier.get()
+                try:
+                    try:
+                        result = await self.visit(url, audit_page)
+                    except Exception as error:
+                        # One bad page must not take the worker down and leave join() waiting forever
+                        self.stats['errors'] += 1
+                        result = {'error': f"{type(error).__name__}: {error}"}
+                    await results.put((url, result))
+                finally:
+                    self.frontier.task_done()
+
+        async def finish():
+            await self.frontier.join()
+            await results.put(done)
+
+        tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        tasks.append(asyncio.create_task(finish()))
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                if item[1] is not None:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def visit(self,
+                    url: str,
+                    audit_page: Callable[[PageSnapshot], Awaitable[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Fetch one page, queue its links and audit it; None for pages that are not audited"""
+        previous = await self.state.aget(url) if self.state is not None else None
+        try:
+            async with self.host_policy(url):
+                snapshot = await PageSnapshot.fetch(self.session, url, previous)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            self.stats['errors'] += 1
+            return {'error': f"{type(error).__name__}: {error}"}
+        self.stats['fetched'] += 1
+
+        if snapshot.not_modified and previous is not None:
+            # No body to parse: follow the links recorded on the last full visit
+            self.stats['unchanged'] += 1
+            for link in previous['links']:
+                self.enqueue(link)
+            result = await audit_page(snapshot)
+            self.stats['audited'] += 1
+            return result
+
+        content_type = snapshot.headers.get('content-type', 'text/html')
+        if snapshot.status != 200 or 'html' not in content_type:
+            self.stats['skipped'] += 1
+            return None
+
+        for href in snapshot.document.anchors:
+            self.enqueue(urljoin(snapshot.url, href))
+        result = await audit_page(snapshot)
+        self.stats['audited'] += 1
+        return result
+
+
+class AuditStateStore:
+    """SQLite record of each audited URL's validators and last check results"""
+
+    def __init__(self, path: Union[str, Path], checks_version: int = 1):
+        self.path = Path(path)
+        # Rows written under another version of the check rules are treated as never audited
+        self.checks_version = checks_version
+        self.reused = 0
+        self.audited = 0
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the state database on first use"""
+        if self.conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS page_audits ('
+                'url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT NOT NULL, '
+                'results BLOB NOT NULL, links BLOB NOT NULL, audited_at REAL NOT NULL, '
+                'checks_version INTEGER NOT NULL DEFAULT 0)'
+            )
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(page_audits)')}
+            if 'checks_version' not in columns:
+                self.conn.execute('ALTER TABLE page_audits ADD COLUMN checks_version INTEGER NOT NULL DEFAULT 0')
+        return self.conn
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Validators, per-area results and outgoing links from the last full audit of url"""
+        with self.lock:
+            row = self.connect().execute(
+                'SELECT etag, last_modified, body_hash, results, links, audited_at, checks_version '
+                'FROM page_audits WHERE url = ?',
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[6] != self.checks_version:
+            # Stale rules: no results to reuse and no validators, so the next fetch returns the full page
+            return {'etag': None, 'last_modified': None, 'body_hash': row[2], 'results': {},
+                    'links': json.loads(zlib.decompress(row[4])), 'audited_at': row[5]}
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'body_hash': row[2],
+            'results': json.loads(zlib.decompress(row[3])),
+            'links': json.loads(zlib.decompress(row[4])),
+            'audited_at': row[5]
+        }
+
+    def set(self, url: str, snapshot: PageSnapshot, results: Dict[str, Any]):
+        """Record a full audit of snapshot; links are stored so 304 revisits can still be crawled"""
+        links = [urljoin(snapshot.url, href) for href in snapshot.document.anchors]
+        row = (snapshot.headers.get('etag'), snapshot.headers.get('last-modified'), snapshot.body_hash,
+               zlib.compress(json.dumps(results, ensure_ascii=False).encode('utf-8')),
+               zlib.compress(json.dumps(links, ensure_ascii=False).encode('utf-8')),
+               time.time(), self.checks_version)
+        # Redirected pages are stored under the URL asked for too, so the next visit finds its validators
+        keys = dict.fromkeys((url, snapshot.requested_url, snapshot.url))
+        with self.lock:
+            conn = self.connect()
+            conn.executemany(
+                'INSERT OR REPLACE INTO page_audits '
+                '(url, etag, last_modified, body_hash, results, links, audited_at, checks_version) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(key,) + row for key in keys]
+            )
+            conn.commit()
+
+    async def aget(self, url: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get, url)
+
+    async def aset(self, url: str, snapshot: PageSnapshot, results: Dict[str, Any]):
+        await asyncio.to_thread(self.set, url, snapshot, results)
+
+    def stats(self) -> Dict[str, Any]:
+        checked = self.reused + self.audited
+        return {
+            'reused': self.reused,
+            'audited': self.audited,
+            'reuse_rate': round(self.reused / checked, 3) if checked else 0.0
+        }
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class YandexOptimizer:
+    """Yandex-specific optimization recommendations"""
+
+    def optimize_title_for_yandex(self, title: str) -> Dict[str, Any]:
+        """Optimize title for Yandex requirements"""
+        recommendations = []
+
+        if len(title) > 60:
+            recommendations.append('Shorten title to 50-60 characters for Yandex')
+        elif len(title) < 30:
+            recommendations.append('Expand title to at least 30 characters')
+
+        if 'grabgifts' not in title.lower():
+            recommendations.append('Consider including brand name "GrabGifts"')
+
+        return {
+            'current_title': title,
+            'recommendations': recommendations,
+            'optimized_examples': [
+                'Телеграм Игры - Лучшие Криптоигры 2024 | GrabGifts',
+                'Бесплатные Игры в Телеграм с Выводом Денег | GrabGifts.ru'
+            ]
+        }
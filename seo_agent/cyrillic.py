@@ -0,0 +1,304 @@
+"""
+Cyrillic keyword enrichment: transliteration, intent and variations
+"""
+
+import asyncio
+import json
+import re
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Any, Tuple, Union
+from pathlib import Path
+from types import MappingProxyType
+
+from .keywords import KEYWORD_PUNCTUATION_PATTERN, strip_russian_ending
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by clear(); puts computed under an older generation are dropped
+        self.generation = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self.lock:
+            value = self.data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any, generation: Optional[int] = None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.generation += 1
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        with self.lock:
+            return list(self.data.items())
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': len(self.data),
+            'maxsize': self.maxsize
+        }
+
+
+class CyrillicSEOProcessor:
+    """Cyrillic text processing for SEO"""
+
+    default_transliteration_map = {
+        'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+        'ж': 'zh', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
+        'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+        'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'shch',
+        'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya'
+    }
+
+    default_intent_vocabulary = {
+        # Checked in this order; the first intent with a matching word wins
+        'transactional': ['купить', 'скачать', 'играть', 'регистрация', 'бесплатно'],
+        'commercial': ['лучшие', 'топ', 'сравнение', 'выбрать', 'рейтинг'],
+        'navigational': ['сайт', 'официальный', 'войти', 'логин']
+    }
+
+    def __init__(self,
+                 transliteration_map: Optional[Dict[str, str]] = None,
+                 intent_vocabulary: Optional[Dict[str, List[str]]] = None,
+                 memo_size: int = 100000):
+        # Keyword -> (intent, transliterated, hyphenated), cleared whenever the rules change
+        self.memo = LRUCache(memo_size)
+        self.configure(transliteration_map or self.default_transliteration_map,
+                       intent_vocabulary or self.default_intent_vocabulary)
+
+    @property
+    def transliteration_map(self) -> MappingProxyType:
+        return self._transliteration_map
+
+    @transliteration_map.setter
+    def transliteration_map(self, value: Dict[str, str]):
+        self.configure(transliteration_map=value)
+
+    @property
+    def intent_vocabulary(self) -> MappingProxyType:
+        return self._intent_vocabulary
+
+    @intent_vocabulary.setter
+    def intent_vocabulary(self, value: Dict[str, List[str]]):
+        self.configure(intent_vocabulary=value)
+
+    def configure(self,
+                  transliteration_map: Optional[Dict[str, str]] = None,
+                  intent_vocabulary: Optional[Dict[str, List[str]]] = None):
+        """Replace the transliteration map and/or intent vocabulary and rebuild the matchers"""
+        # Rules are stored read-only so every change has to come through here
+        if transliteration_map is not None:
+            self._transliteration_map = MappingProxyType(dict(transliteration_map))
+        if intent_vocabulary is not None:
+            self._intent_vocabulary = MappingProxyType({
+                intent: tuple(words) for intent, words in intent_vocabulary.items()
+            })
+
+        self.transliteration_table = str.maketrans(dict(self._transliteration_map))
+
+        # One compiled alternation per intent, tried in priority order
+        self.intent_matchers = [
+            (intent, re.compile('|'.join(re.escape(word) for word in words)))
+            for intent, words in self._intent_vocabulary.items() if words
+        ]
+
+        self.memo.clear()
+
+    def config_fingerprint(self) -> str:
+        """Stable hash of the transliteration and intent rules"""
+        raw = json.dumps([dict(self._transliteration_map),
+                          {intent: list(words) for intent, words in self._intent_vocabulary.items()}],
+                         ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def enrich_keyword(self, keyword: str) -> Tuple[str, str, str]:
+        """Memoized (intent, transliterated, hyphenated) for a keyword"""
+        cached = self.memo.get(keyword)
+        if cached is not None:
+            return cached
+
+        generation = self.memo.generation
+        keyword_lower = keyword.lower()
+        enriched = (
+            self.match_intent(keyword_lower),
+            keyword_lower.translate(self.transliteration_table),
+            keyword_lower.replace(' ', '-')
+        )
+        self.memo.put(keyword, enriched, generation)
+        return enriched
+
+    def generate_url_variations(self, keyword: str) -> List[str]:
+        """Generate URL-friendly variations of Cyrillic keywords"""
+        # Transliterated and hyphenated versions
+        _, transliterated, hyphenated = self.enrich_keyword(keyword)
+        return [transliterated, hyphenated]
+
+    def normalize_keyword(self, keyword: str, stem: bool = True) -> str:
+        """Matching key: casefolded, ё as е, no punctuation, common Russian endings stripped"""
+        text = KEYWORD_PUNCTUATION_PATTERN.sub(' ', keyword.casefold().replace('ё', 'е'))
+        if not stem:
+            return ' '.join(text.split())
+        return ' '.join(map(strip_russian_ending, text.split()))
+
+    def transliterate(self, text: str) -> str:
+        """Transliterate Cyrillic text to Latin"""
+        return text.lower().translate(self.transliteration_table)
+
+    def detect_keyword_intent_russian(self, keyword: str) -> str:
+        """Detect search intent for Russian keywords"""
+        return self.enrich_keyword(keyword)[0]
+
+    def match_intent(self, keyword_lower: str) -> str:
+        """Detect intent for an already lowercased keyword"""
+        for intent, matcher in self.intent_matchers:
+            if matcher.search(keyword_lower):
+                return intent
+        return 'informational'
+
+    def enrich_batch(self, keywords: List[str]) -> List[Tuple[str, List[str]]]:
+        """Intent and URL variations for each keyword, computed inline"""
+        results = []
+        for keyword in keywords:
+            intent, transliterated, hyphenated = self.enrich_keyword(keyword)
+            results.append((intent, [transliterated, hyphenated]))
+        return results
+
+    def split_memoized(self, keywords: List[str]) -> Tuple[Dict[str, Tuple[str, str, str]], List[str]]:
+        """Partition keywords into memo hits and unique misses"""
+        known = {}
+        misses = []
+        for keyword in keywords:
+            if keyword in known:
+                continue
+            cached = self.memo.get(keyword)
+            if cached is not None:
+                known[keyword] = cached
+            else:
+                known[keyword] = None
+                misses.append(keyword)
+        return known, misses
+
+    async def enrich_batch_async(self,
+                                 keywords: List[str],
+                                 executor: Optional[Executor] = None,
+                                 chunk_size: int = 50000,
+                                 inline_threshold: int = 20000) -> List[Tuple[str, List[str]]]:
+        """Enrich a batch, offloading memo misses of large batches to an executor in chunks"""
+        if len(keywords) <= inline_threshold:
+            return self.enrich_batch(keywords)
+        if executor is None:
+            # No process pool (single-worker setups): still keep a large batch off the event loop
+            return await asyncio.to_thread(self.enrich_batch, keywords)
+
+        # The memo is thread-safe, so bulk lookups run off the event loop too
+        generation = self.memo.generation
+        known, misses = await asyncio.to_thread(self.split_memoized, keywords)
+
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(executor, enrich_keyword_chunk,
+                                 dict(self._transliteration_map),
+                                 {intent: list(words) for intent, words in self._intent_vocabulary.items()},
+                                 misses[start:start + chunk_size])
+            for start in range(0, len(misses), chunk_size)
+        ))
+
+        def merge() -> List[Tuple[str, List[str]]]:
+            fresh = (enriched for chunk in chunks for enriched in chunk)
+            for keyword, (intent, variations) in zip(misses, fresh):
+                known[keyword] = (intent, variations[0], variations[1])
+                self.memo.put(keyword, known[keyword], generation)
+            return [(known[keyword][0], [known[keyword][1], known[keyword][2]]) for keyword in keywords]
+
+        return await asyncio.to_thread(merge)
+
+    def memo_stats(self) -> Dict[str, Any]:
+        return self.memo.stats()
+
+    def save_memo(self, path: Union[str, Path]):
+        """Persist memoized enrichments together with the rules that produced them"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'fingerprint': self.config_fingerprint(),
+            'entries': [[keyword, *enriched] for keyword, enriched in self.memo.items()]
+        }
+        temp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def load_memo(self, path: Union[str, Path]) -> int:
+        """Load persisted enrichments; entries made under different rules are ignored"""
+        path = Path(path)
+        if not path.exists():
+            return 0
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        if payload.get('fingerprint') != self.config_fingerprint():
+            return 0
+
+        generation = self.memo.generation
+        entries = payload.get('entries', [])
+        for keyword, intent, transliterated, hyphenated in entries:
+            self.memo.put(keyword, (intent, transliterated, hyphenated), generation)
+        return len(entries)
+
+
+# Per-process processor reused across chunks while its configuration is unchanged
+_worker_processor: Optional[Tuple[Any, CyrillicSEOProcessor]] = None
+
+
+def enrich_keyword_chunk(transliteration_map: Dict[str, str],
+                         intent_vocabulary: Dict[str, List[str]],
+                         keywords: List[str]) -> List[Tuple[str, List[str]]]:
+    """Process-pool entry point for CyrillicSEOProcessor.enrich_batch_async"""
+    global _worker_processor
+
+    config_key = (tuple(transliteration_map.items()),
+                  tuple((intent, tuple(words)) for intent, words in intent_vocabulary.items()))
+    if _worker_processor is None or _worker_processor[0] != config_key:
+        _worker_processor = (config_key, CyrillicSEOProcessor(dict(transliteration_map),
+                                                              {intent: list(words) for intent, words
+                                                               in intent_vocabulary.items()}))
+    return _worker_processor[1].enrich_batch(keywords)
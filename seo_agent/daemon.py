@@ -0,0 +1,204 @@
+"""
+Resident JSON API over a warm analyst
+"""
+
+import argparse
+import asyncio
+import json
+import importlib
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Optional, Any, Callable, Awaitable, Iterable
+
+from .analyst import RussianSEOAnalyst
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+
+class AnalystDaemon:
+    """
+    Resident JSON API over one warm analyst: parsed strategy, pooled connections,
+    caches and memo stay loaded between requests
+    """
+
+    def __init__(self, agent: 'RussianSEOAnalyst', watch_interval: float = 2.0):
+        self.agent = agent
+        self.watch_interval = watch_interval
+        self.watcher: Optional[asyncio.Task] = None
+        self.warmup: Optional[asyncio.Task] = None
+
+    def create_app(self) -> 'web.Application':
+        from aiohttp import web
+
+        @web.middleware
+        async def json_errors(request: web.Request, handler: Callable[[web.Request], Awaitable[web.StreamResponse]]):
+            try:
+                return await handler(request)
+            except web.HTTPException:
+                raise
+            except Exception as error:
+                print(f"⚠️ {request.method} {request.path} failed: {type(error).__name__}: {error}")
+                return self.respond({'error': f"{type(error).__name__}: {error}"}, status=500)
+
+        app = web.Application(client_max_size=16 * 1024 * 1024, middlewares=[json_errors])
+        app.router.add_get('/health', self.health)
+        app.router.add_get('/metrics', self.metrics)
+        app.router.add_get('/strategy', self.strategy)
+        app.router.add_post('/research', self.research)
+        app.router.add_post('/gaps', self.gaps)
+        app.router.add_post('/audit', self.audit)
+        app.router.add_post('/strategy-update', self.strategy_update)
+        app.router.add_get('/jobs', self.job_stats)
+        app.router.add_post('/jobs', self.submit_job)
+        app.router.add_get('/jobs/{job_id:\\d+}', self.job_status)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+    async def on_startup(self, app: 'web.Application'):
+        await self.agent.open_session()
+        await self.agent.initialize()
+        self.watcher = asyncio.create_task(self.agent.watch_project_files(self.watch_interval))
+        # Import the keyword table stack in the background so the first request doesn't pay for it
+        self.warmup = asyncio.create_task(asyncio.to_thread(importlib.import_module, 'pandas'))
+
+    async def on_cleanup(self, app: 'web.Application'):
+        for task in (self.watcher, self.warmup):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(task for task in (self.watcher, self.warmup) if task is not None),
+                             return_exceptions=True)
+        await self.agent.close()
+
+    def respond(self, data: Any, status: int = 200) -> 'web.Response':
+        from aiohttp import web
+
+        return web.json_response(self.agent.make_serializable(data), status=status,
+                                 dumps=lambda obj: json.dumps(obj, ensure_ascii=False, default=str))
+
+    async def read_payload(self, request: 'web.Request', required: Iterable[str] = ()) -> Dict[str, Any]:
+        from aiohttp import web
+
+        try:
+            payload = await request.json() if request.can_read_body else {}
+        except json.JSONDecodeError as error:
+            raise web.HTTPBadRequest(text=json.dumps({'error': f"Invalid JSON: {error}"}),
+                                     content_type='application/json')
+        if not isinstance(payload, dict):
+            raise web.HTTPBadRequest(text=json.dumps({'error': 'Expected a JSON object'}),
+                                     content_type='application/json')
+        missing = [name for name in required if not payload.get(name)]
+        if missing:
+            raise web.HTTPBadRequest(text=json.dumps({'error': f"Missing fields: {', '.join(missing)}"}),
+                                     content_type='application/json')
+        return payload
+
+    async def health(self, request: 'web.Request') -> 'web.Response':
+        return self.respond({
+            'status': 'ok',
+            'strategy_keywords': len((self.agent.current_strategy or {}).get('keywords', [])),
+            'competitors': len(self.agent.current_competitors or []),
+            'project_files': self.agent.file_signatures
+        })
+
+    async def metrics(self, request: 'web.Request') -> 'web.Response':
+        from aiohttp import web
+
+        if request.query.get('format') == 'otlp':
+            return web.json_response(self.agent.instrumentation.to_otlp())
+        return web.Response(text=self.agent.instrumentation.to_prometheus(),
+                            content_type='text/plain', charset='utf-8')
+
+    async def strategy(self, request: 'web.Request') -> 'web.Response':
+        strategy = self.agent.current_strategy or {}
+        return self.respond({
+            'total_keywords': strategy.get('total_keywords', len(strategy.get('keywords', []))),
+            'last_updated': strategy.get('last_updated'),
+            # Without a strategy file the analyst reports clusters as an empty list
+            'clusters': {name: len(members) for name, members in dict(strategy.get('clusters') or {}).items()},
+            'topic_clusters': {name: len(members) for name, members in strategy.get('topic_clusters', {}).items()}
+        })
+
+    async def research(self, request: 'web.Request') -> 'web.Response':
+        payload = await self.read_payload(request, required=['seeds'])
+        keywords = await self.agent.research_keywords(
+            payload['seeds'],
+            market=payload.get('market', 'RU'),
+            volume_min=payload.get('volume_min', 500),
+            difficulty_max=payload.get('difficulty_max', 60)
+        )
+        return self.respond({'keywords': keywords})
+
+    async def gaps(self, request: 'web.Request') -> 'web.Response':
+        payload = await self.read_payload(request, required=['our_domain', 'competitor_domains'])
+        return self.respond(await self.agent.analyze_keyword_gaps(
+            payload['our_domain'],
+            payload['competitor_domains'],
+            market=payload.get('market', 'RU')
+        ))
+
+    async def audit(self, request: 'web.Request') -> 'web.Response':
+        payload = await self.read_payload(request)
+        # A start_url crawls the whole site; a domain audits its home page
+        if payload.get('start_url'):
+            return self.respond(await self.agent.audit_site(payload['start_url'],
+                                                            focus_areas=payload.get('focus_areas'),
+                                                            max_pages=payload.get('max_pages')))
+        if not payload.get('domain'):
+            return self.respond({'error': 'Missing fields: domain or start_url'}, status=400)
+        return self.respond(await self.agent.audit_technical_seo(payload['domain'],
+                                                                 focus_areas=payload.get('focus_areas')))
+
+    async def submit_job(self, request: 'web.Request') -> 'web.Response':
+        payload = await self.read_payload(request, required=['kind'])
+        try:
+            job_id, created = await self.agent.jobs.asubmit(payload['kind'], payload.get('params', {}),
+                                                            payload.get('priority', 0))
+        except ValueError as error:
+            return self.respond({'error': str(error)}, status=400)
+        return self.respond({'id': job_id, 'created': created}, status=201 if created else 200)
+
+    async def job_status(self, request: 'web.Request') -> 'web.Response':
+        job = await self.agent.jobs.aget(int(request.match_info['job_id']))
+        if job is None:
+            return self.respond({'error': 'No such job'}, status=404)
+        return self.respond(job)
+
+    async def job_stats(self, request: 'web.Request') -> 'web.Response':
+        return self.respond(await asyncio.to_thread(self.agent.jobs.stats))
+
+    async def strategy_update(self, request: 'web.Request') -> 'web.Response':
+        payload = await self.read_payload(request, required=['seeds', 'our_domain', 'competitor_domains'])
+        market = payload.get('market', 'RU')
+        new_keywords, gap_analysis, technical_audit = await asyncio.gather(
+            self.agent.research_keywords(payload['seeds'],
+                                         market=market,
+                                         volume_min=payload.get('volume_min', 500),
+                                         difficulty_max=payload.get('difficulty_max', 60)),
+            self.agent.analyze_keyword_gaps(payload['our_domain'], payload['competitor_domains'], market=market),
+            self.agent.audit_technical_seo(payload.get('domain', payload['our_domain']),
+                                           focus_areas=payload.get('focus_areas'))
+        )
+        update = await self.agent.generate_strategy_update(new_keywords, gap_analysis, technical_audit)
+        if payload.get('save'):
+            update['saved_to'] = await self.agent.save_analysis_results({
+                'analysis_date': datetime.now().isoformat(),
+                'new_keywords': new_keywords,
+                'gap_analysis': gap_analysis,
+                'technical_audit': technical_audit,
+                'strategy_update': update
+            })
+        return self.respond(update)
+
+
+def run_daemon(args: argparse.Namespace):
+    """Serve the analyst's JSON API until interrupted"""
+    from aiohttp import web
+
+    agent = RussianSEOAnalyst(args.config)
+    daemon_config = agent.config['daemon']
+    daemon = AnalystDaemon(agent, watch_interval=args.watch_interval or daemon_config['watch_interval'])
+    host = args.host or daemon_config['host']
+    port = args.port or daemon_config['port']
+    print(f"🌐 Russian SEO Analyst daemon listening on http://{host}:{port}")
+    web.run_app(daemon.create_app(), host=host, port=port, print=None)
@@ -0,0 +1,156 @@
+"""
+Run history of keyword metrics across analyses
+"""
+
+import asyncio
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple, Union, Iterable
+from pathlib import Path
+
+
+class RunHistoryStore:
+    """Append-only SQLite history of keyword volumes and rankings across runs"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the history database on first use"""
+        if self.conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS runs ('
+                'run_id INTEGER PRIMARY KEY, kind TEXT NOT NULL, market TEXT, started_at REAL NOT NULL)'
+            )
+            # domain is '' for market-level research, otherwise the site whose ranking was observed
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS observations ('
+                'run_id INTEGER NOT NULL, observed_at REAL NOT NULL, keyword TEXT NOT NULL, '
+                'domain TEXT NOT NULL, volume INTEGER, difficulty INTEGER, cpc REAL, ranking INTEGER)'
+            )
+            # Time-bounded seeks for "keyword X over N days" and "domain D since last week"
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_observations_keyword '
+                              'ON observations (keyword, observed_at)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_observations_domain '
+                              'ON observations (domain, observed_at)')
+        return self.conn
+
+    def record_run(self,
+                   kind: str,
+                   keywords_by_domain: Dict[str, Iterable[Any]],
+                   market: Optional[str] = None,
+                   observed_at: Optional[float] = None) -> int:
+        """Append one run's keyword observations; returns the new run id"""
+        observed_at = time.time() if observed_at is None else observed_at
+        with self.lock:
+            conn = self.connect()
+            run_id = conn.execute('INSERT INTO runs (kind, market, started_at) VALUES (?, ?, ?)',
+                                  (kind, market, observed_at)).lastrowid
+            conn.executemany(
+                'INSERT INTO observations '
+                '(run_id, observed_at, keyword, domain, volume, difficulty, cpc, ranking) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                ((run_id, observed_at, kw.keyword, domain, kw.volume, kw.difficulty, kw.cpc, kw.current_ranking)
+                 for domain, keywords in keywords_by_domain.items() for kw in keywords)
+            )
+            conn.commit()
+        return run_id
+
+    def volume_history(self,
+                       keyword: str,
+                       days: int = 90,
+                       now: Optional[float] = None) -> List[Tuple[float, int]]:
+        """(observed_at, volume) pairs for keyword within the last days"""
+        since = (time.time() if now is None else now) - days * 86400
+        with self.lock:
+            return self.connect().execute(
+                'SELECT MIN(observed_at), MAX(volume) FROM observations '
+                'WHERE keyword = ? AND observed_at >= ? AND volume IS NOT NULL '
+                'GROUP BY run_id ORDER BY MIN(observed_at)',
+                (keyword, since)
+            ).fetchall()
+
+    def volume_delta(self,
+                     keyword: str,
+                     days: int = 90,
+                     now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Change in search volume between the first and latest observation in the window"""
+        since = (time.time() if now is None else now) - days * 86400
+        query = ('SELECT observed_at, volume FROM observations '
+                 'WHERE keyword = ? AND observed_at >= ? AND volume IS NOT NULL ORDER BY observed_at {} LIMIT 1')
+        with self.lock:
+            conn = self.connect()
+            first = conn.execute(query.format('ASC'), (keyword, since)).fetchone()
+            last = conn.execute(query.format('DESC'), (keyword, since)).fetchone()
+        if first is None:
+            return None
+
+        delta = last[1] - first[1]
+        return {
+            'keyword': keyword,
+            'from': datetime.fromtimestamp(first[0]).isoformat(),
+            'to': datetime.fromtimestamp(last[0]).isoformat(),
+            'volume_from': first[1],
+            'volume_to': last[1],
+            'delta': delta,
+            'delta_pct': round(delta / first[1] * 100, 1) if first[1] else None
+        }
+
+    def rank_drops(self,
+                   domain: str,
+                   days: int = 7,
+                   min_drop: int = 5,
+                   now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Keywords whose latest rank is more than min_drop positions worse than days ago"""
+        now = time.time() if now is None else now
+        cutoff = now - days * 86400
+        # Latest ranking in the last period against the latest one in the period before it;
+        # both sides are range seeks on (domain, observed_at), not a scan of all history
+        with self.lock:
+            rows = self.connect().execute(
+                'WITH current AS ('
+                '  SELECT keyword, ranking, MAX(observed_at) AS observed_at FROM observations'
+                '  WHERE domain = ? AND observed_at > ? AND observed_at <= ? AND ranking IS NOT NULL'
+                '  GROUP BY keyword'
+                '), baseline AS ('
+                '  SELECT keyword, ranking, MAX(observed_at) AS observed_at FROM observations'
+                '  WHERE domain = ? AND observed_at > ? AND observed_at <= ? AND ranking IS NOT NULL'
+                '  GROUP BY keyword'
+                ') '
+                'SELECT current.keyword, baseline.ranking, current.ranking, current.ranking - baseline.ranking '
+                'FROM current JOIN baseline ON baseline.keyword = current.keyword '
+                'WHERE current.ranking - baseline.ranking > ? '
+                'ORDER BY current.ranking - baseline.ranking DESC',
+                (domain, cutoff, now, domain, cutoff - days * 86400, cutoff, min_drop)
+            ).fetchall()
+
+        return [
+            {'keyword': keyword, 'previous_ranking': previous, 'current_ranking': current, 'drop': drop}
+            for keyword, previous, current, drop in rows
+        ]
+
+    async def arecord_run(self,
+                          kind: str,
+                          keywords_by_domain: Dict[str, Iterable[Any]],
+                          market: Optional[str] = None) -> int:
+        return await asyncio.to_thread(self.record_run, kind, keywords_by_domain, market)
+
+    async def avolume_delta(self, keyword: str, days: int = 90) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.volume_delta, keyword, days)
+
+    async def arank_drops(self, domain: str, days: int = 7, min_drop: int = 5) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.rank_drops, domain, days, min_drop)
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,366 @@
+"""
+Durable job queue and the worker pool that drains it
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+import hashlib
+import inspect
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Any, Tuple, Union
+from pathlib import Path
+
+from .analyst import RussianSEOAnalyst
+
+
+class JobQueue:
+    """Durable SQLite queue of research, gap and audit jobs, shared by worker processes"""
+
+    # Job kind -> (analyst method, key its result is saved under)
+    job_kinds = {
+        'research': ('research_keywords', 'new_keywords'),
+        'gaps': ('analyze_keyword_gaps', 'gap_analysis'),
+        'audit': ('audit_technical_seo', 'technical_audit'),
+        'site_audit': ('audit_site', 'site_audit')
+    }
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 max_attempts: int = 3,
+                 lease_seconds: float = 300.0,
+                 retry_backoff: float = 30.0):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        # A running job whose lease lapses (its worker died) goes back to the queue
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the queue database on first use"""
+        if self.conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id INTEGER PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, dedupe_key TEXT NOT NULL, '
+                'priority INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, '
+                'max_attempts INTEGER NOT NULL, available_at REAL NOT NULL, lease_owner TEXT, lease_expires REAL, '
+                'result_path TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            # At most one queued or running job per distinct (kind, params)
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active ON jobs (dedupe_key) "
+                              "WHERE status IN ('queued', 'running')")
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC, id)')
+            self.conn.commit()
+        return self.conn
+
+    @staticmethod
+    def make_key(kind: str, params: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps([kind, params], sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+    @classmethod
+    def validate(cls, kind: str, params: Dict[str, Any]):
+        """Reject unknown kinds and parameters the analyst method wouldn't accept"""
+        if kind not in cls.job_kinds:
+            raise ValueError(f"Unknown job kind: {kind} (expected one of {', '.join(cls.job_kinds)})")
+        method = getattr(RussianSEOAnalyst, cls.job_kinds[kind][0])
+        try:
+            inspect.signature(method).bind(None, **params)
+        except TypeError as error:
+            raise ValueError(f"Invalid parameters for {kind} job: {error}") from None
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: int = 0) -> Tuple[int, bool]:
+        """Queue a job; returns (job id, created). An identical queued or running job is reused"""
+        self.validate(kind, params)
+        now = time.time()
+        key = self.make_key(kind, params)
+        with self.lock:
+            conn = self.connect()
+            cursor = conn.execute(
+                'INSERT INTO jobs (kind, params, dedupe_key, priority, status, max_attempts, '
+                'available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT DO NOTHING',
+                (kind, json.dumps(params, ensure_ascii=False), key, priority, 'queued',
+                 self.max_attempts, now, now, now)
+            )
+            created = cursor.rowcount == 1
+            if created:
+                job_id = cursor.lastrowid
+            else:
+                # The duplicate keeps its place but is bumped to the higher priority
+                job_id = conn.execute("SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                                      (key,)).fetchone()[0]
+                conn.execute('UPDATE jobs SET priority = MAX(priority, ?), updated_at = ? WHERE id = ?',
+                             (priority, now, job_id))
+            conn.commit()
+        return job_id, created
+
+    def claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        """Lease the highest-priority ready job to owner, first requeueing jobs whose lease lapsed"""
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "error = 'Worker lease expired', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ?",
+                (now, now)
+            )
+            # A single UPDATE ... RETURNING, so two processes can never claim the same job
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ("
+                "SELECT id FROM jobs WHERE status = 'queued' AND available_at <= ? "
+                "ORDER BY priority DESC, id LIMIT 1) "
+                "RETURNING id, kind, params, priority, attempts",
+                (owner, now + self.lease_seconds, now, now)
+            ).fetchone()
+            conn.commit()
+        if row is None:
+            return None
+        return {'id': row[0], 'kind': row[1], 'params': json.loads(row[2]), 'priority': row[3], 'attempts': row[4]}
+
+    def renew(self, job_id: int, owner: str) -> bool:
+        """Extend owner's lease; False if the job was requeued and taken by someone else"""
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            updated = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now + self.lease_seconds, now, job_id, owner)
+            ).rowcount
+            conn.commit()
+        return updated == 1
+
+    def complete(self, job_id: int, owner: str, result_path: str) -> bool:
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'done', result_path = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (result_path, now, job_id, owner)
+            ).rowcount
+            conn.commit()
+        return updated == 1
+
+    def fail(self, job_id: int, owner: str, error: str) -> bool:
+        """Record a failed attempt: retry after an exponential backoff, or give up after max_attempts"""
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            updated = conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+                "available_at = ? + ? * (1 << (attempts - 1)), error = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now, self.retry_backoff, error, now, job_id, owner)
+            ).rowcount
+            conn.commit()
+        return updated == 1
+
+    def release(self, job_id: int, owner: str) -> bool:
+        """Hand an interrupted job back without counting the attempt"""
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now, job_id, owner)
+            ).rowcount
+            conn.commit()
+        return updated == 1
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            cursor = self.connect().execute(
+                'SELECT id, kind, params, priority, status, attempts, max_attempts, available_at, '
+                'lease_owner, result_path, error, created_at, updated_at FROM jobs WHERE id = ?',
+                (job_id,)
+            )
+            row = cursor.fetchone()
+            columns = [description[0] for description in cursor.description]
+        if row is None:
+            return None
+        job = dict(zip(columns, row))
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def pending(self) -> int:
+        """Jobs still queued (including those waiting out a retry backoff) or running"""
+        with self.lock:
+            return self.connect().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.connect().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    async def asubmit(self, kind: str, params: Dict[str, Any], priority: int = 0) -> Tuple[int, bool]:
+        return await asyncio.to_thread(self.submit, kind, params, priority)
+
+    async def aclaim(self, owner: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.claim, owner)
+
+    async def arenew(self, job_id: int, owner: str) -> bool:
+        return await asyncio.to_thread(self.renew, job_id, owner)
+
+    async def acomplete(self, job_id: int, owner: str, result_path: str) -> bool:
+        return await asyncio.to_thread(self.complete, job_id, owner, result_path)
+
+    async def afail(self, job_id: int, owner: str, error: str) -> bool:
+        return await asyncio.to_thread(self.fail, job_id, owner, error)
+
+    async def arelease(self, job_id: int, owner: str) -> bool:
+        return await asyncio.to_thread(self.release, job_id, owner)
+
+    async def aget(self, job_id: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get, job_id)
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class JobWorker:
+    """Claims jobs from the analyst's queue and runs them on that one warm analyst"""
+
+    def __init__(self, agent: 'RussianSEOAnalyst', name: Optional[str] = None, poll_interval: float = 1.0):
+        self.agent = agent
+        self.queue = agent.jobs
+        self.name = name or f"{platform.node()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+
+    async def run_job(self, job: Dict[str, Any]) -> str:
+        """Run one job and save its result; returns the saved results path"""
+        method_name, result_key = JobQueue.job_kinds[job['kind']]
+        result = await getattr(self.agent, method_name)(**job['params'])
+        return await self.agent.save_analysis_results({
+            'job_id': job['id'],
+            'kind': job['kind'],
+            'params': job['params'],
+            'completed_at': datetime.now().isoformat(),
+            result_key: result
+        }, f"job_{job['id']}_{job['kind']}.json")
+
+    async def heartbeat(self, job_id: int, work: asyncio.Task, lease_lost: asyncio.Event):
+        """Renew the lease while the job runs; stop the job once the lease is gone"""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await self.queue.arenew(job_id, self.name):
+                # The lease lapsed and the job may already be running on another worker
+                lease_lost.set()
+                work.cancel()
+                return
+
+    async def run(self, drain: bool = False) -> int:
+        """Process jobs until cancelled, or with drain until nothing is queued or running; returns jobs done"""
+        completed = 0
+        while True:
+            job = await self.queue.aclaim(self.name)
+            if job is None:
+                if drain and not await asyncio.to_thread(self.queue.pending):
+                    return completed
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            print(f"⚙️ [{self.name}] job {job['id']} ({job['kind']}, attempt {job['attempts']})")
+            work = asyncio.create_task(self.run_job(job))
+            lease_lost = asyncio.Event()
+            heartbeat = asyncio.create_task(self.heartbeat(job['id'], work, lease_lost))
+            try:
+                result_path = await work
+            except asyncio.CancelledError:
+                if lease_lost.is_set():
+                    # No longer ours to complete, fail or release
+                    self.agent.instrumentation.count('seo_jobs_total', kind=job['kind'], status='abandoned')
+                    print(f"⚠️ [{self.name}] lost the lease on job {job['id']}; abandoned it")
+                    continue
+                # Shutting down: give the job back without spending one of its attempts
+                await self.queue.arelease(job['id'], self.name)
+                raise
+            except Exception as error:
+                await self.queue.afail(job['id'], self.name, f"{type(error).__name__}: {error}")
+                self.agent.instrumentation.count('seo_jobs_total', kind=job['kind'], status='failed')
+                print(f"⚠️ [{self.name}] job {job['id']} failed: {type(error).__name__}: {error}")
+            else:
+                if not await self.queue.acomplete(job['id'], self.name, result_path):
+                    # The lease lapsed between the last heartbeat and now; the job is someone else's
+                    self.agent.instrumentation.count('seo_jobs_total', kind=job['kind'], status='abandoned')
+                    print(f"⚠️ [{self.name}] lost the lease on job {job['id']} before completing it; abandoned it")
+                    continue
+                self.agent.instrumentation.count('seo_jobs_total', kind=job['kind'], status='done')
+                completed += 1
+            finally:
+                heartbeat.cancel()
+
+
+def run_job_worker(config_path: Optional[str], drain: bool) -> int:
+    """Worker process entry point: one warm analyst working through the shared queue"""
+    async def work() -> int:
+        agent = RussianSEOAnalyst(config_path)
+        # Parallelism comes from the worker processes, so each keeps enrichment in-process
+        agent.config['enrichment']['workers'] = 1
+        async with agent:
+            return await JobWorker(agent, poll_interval=agent.config['jobs']['poll_interval']).run(drain)
+
+    return asyncio.run(work())
+
+
+def run_job_pool(config_path: Optional[str], workers: int, drain: bool = False) -> int:
+    """Run workers processes against the shared queue; returns the jobs they completed"""
+    if workers <= 1:
+        return run_job_worker(config_path, drain)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job_worker, config_path, drain) for _ in range(workers)]
+        return sum(future.result() for future in futures)
+
+
+def run_jobs_command(args: argparse.Namespace) -> int:
+    """jobs submit / work / status"""
+    if args.action == 'work':
+        workers = args.workers or RussianSEOAnalyst.load_config(args.config)['jobs']['workers']
+        print(f"👷 Starting {workers} job workers{' (drain)' if args.drain else ''}")
+        completed = run_job_pool(args.config, workers, drain=args.drain)
+        print(f"✅ Workers completed {completed} jobs")
+        return 0
+
+    jobs_config = RussianSEOAnalyst.load_config(args.config)['jobs']
+    queue = JobQueue(jobs_config['path'], max_attempts=jobs_config['max_attempts'])
+    try:
+        if args.action == 'submit':
+            try:
+                job_id, created = queue.submit(args.kind, json.loads(args.params), args.priority)
+            except ValueError as error:  # includes malformed --params JSON
+                print(f"❌ {error}")
+                return 2
+            print(f"{'📥 Queued' if created else '🔁 Already queued as'} job {job_id}")
+        elif args.job_id is not None:
+            job = queue.get(args.job_id)
+            if job is None:
+                print(f"❌ No job {args.job_id}")
+                return 1
+            print(json.dumps(job, ensure_ascii=False, indent=2))
+        else:
+            print(json.dumps(queue.stats()))
+    finally:
+        queue.close()
+    return 0
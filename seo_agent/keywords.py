@@ -0,0 +1,1088 @@
+"""
+Keyword models, stores, result tables and clustering
+"""
+
+import json
+import re
+import time
+import heapq
+import importlib
+import importlib.util
+import sys
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Set, Tuple, Union, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType, ModuleType
+import numpy as np
+
+from .util import atomic_write
+
+if TYPE_CHECKING:
+    from .cyrillic import CyrillicSEOProcessor
+
+
+class LazyModule(ModuleType):
+    """Stand-in for a heavy module that is imported on first attribute access"""
+
+    def __getattr__(self, attribute: str) -> Any:
+        module = importlib.import_module(self.__name__)
+        # Later lookups hit the copied namespace and skip __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+
+def lazy_import(name: str) -> Optional[LazyModule]:
+    """A LazyModule for name, or None when it isn't installed; nothing is imported yet"""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    return LazyModule(name) if spec is not None else None
+
+
+# pandas and pyarrow dominate start-up time, so they load when a keyword table is first built
+pd = LazyModule('pandas')
+pa = lazy_import('pyarrow')  # Columnar result tables fall back to JSON columns without it
+pq = LazyModule('pyarrow.parquet') if pa is not None else None
+
+# Precompiled patterns for the strategy markdown parser
+NUMBER_PATTERN = re.compile(r'\d+')
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+CLUSTER_HEADER_PATTERN = re.compile(r'Keywords|игры|TON')
+
+# Keyword normalization shared by gap matching and near-duplicate detection
+KEYWORD_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]+')
+CYRILLIC_WORD_PATTERN = re.compile(r'[а-я]+')
+YEAR_PATTERN = re.compile(r'(?:19|20)\d\d')
+RUSSIAN_ENDINGS = (
+    # Longest first; a stem of at least three letters is always kept
+    frozenset(['ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими']),
+    frozenset(['ых', 'их', 'ой', 'ый', 'ий', 'ей', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ую', 'юю',
+               'ов', 'ев', 'ам', 'ям', 'ах', 'ях', 'ом', 'ем']),
+    frozenset(['а', 'я', 'ы', 'и', 'у', 'ю', 'е', 'о', 'ь'])
+)
+
+
+@lru_cache(maxsize=65536)
+def strip_russian_ending(token: str) -> str:
+    """Drop one common Russian inflectional ending so word forms share a matching key"""
+    if not CYRILLIC_WORD_PATTERN.fullmatch(token):
+        return token
+    for endings in RUSSIAN_ENDINGS:
+        size = len(next(iter(endings)))
+        if len(token) - size >= 3 and token[-size:] in endings:
+            return token[:-size]
+    return token
+
+
+# Header names (lowercase prefixes) that identify keyword table columns
+STRATEGY_COLUMN_ALIASES = {
+    'keyword': ('keyword', 'ключев', 'запрос'),
+    'volume': ('estimated search volume', 'search volume', 'volume', 'частотность', 'объем'),
+    'difficulty': ('difficulty', 'competition', 'сложность', 'конкуренция'),
+    'intent': ('search intent', 'intent', 'интент')
+}
+
+# Opportunity scoring weights shared by the scalar and vectorized scorers
+INTENT_SCORES = {
+    'transactional': 1.0,
+    'commercial': 0.8,
+    'informational': 0.6,
+    'navigational': 0.4
+}
+DEFAULT_INTENT_SCORE = 0.5
+QUICK_WIN_INTENTS = ('commercial', 'transactional')
+
+@dataclass
+class KeywordData:
+    keyword: str
+    volume: int
+    difficulty: int
+    cpc: float
+    intent: str
+    seasonality: Dict[str, float]
+    local_relevance: float
+    cyrillic_variations: List[str]
+    current_ranking: Optional[int] = None
+    competition_level: str = 'medium'
+
+@dataclass
+class CompetitorData:
+    domain: str
+    organic_keywords: int
+    organic_traffic: int
+    backlinks: int
+    domain_authority: int
+    top_keywords: List[KeywordData]
+    content_gaps: List[str]
+
+class KeywordIntent(str, Enum):
+    """Search intent values; members compare and hash equal to their strings"""
+    TRANSACTIONAL = 'transactional'
+    COMMERCIAL = 'commercial'
+    INFORMATIONAL = 'informational'
+    NAVIGATIONAL = 'navigational'
+
+    __str__ = str.__str__
+
+
+class CompetitionLevel(str, Enum):
+    """Competition levels; members compare and hash equal to their strings"""
+    LOW = 'low'
+    MEDIUM = 'medium'
+    HIGH = 'high'
+
+    __str__ = str.__str__
+
+
+EMPTY_SEASONALITY = MappingProxyType({})
+
+
+def compact_label(value: Any, enum_type: type) -> Any:
+    """Map a label onto its shared enum member, interning labels outside the enum"""
+    if isinstance(value, enum_type):
+        return value
+    member = enum_type._value2member_map_.get(value)
+    if member is not None:
+        return member
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class CompactKeywordData:
+    """Memory-lean KeywordData: slotted, interned keyword and enum intent/competition"""
+    keyword: str
+    volume: int
+    difficulty: int
+    cpc: float
+    intent: str
+    seasonality: Dict[str, float] = field(default_factory=lambda: EMPTY_SEASONALITY)
+    local_relevance: float = 1.0
+    cyrillic_variations: Tuple[str, ...] = ()
+    current_ranking: Optional[int] = None
+    competition_level: str = CompetitionLevel.MEDIUM
+
+    def __post_init__(self):
+        self.keyword = sys.intern(self.keyword)
+        self.intent = compact_label(self.intent, KeywordIntent)
+        self.competition_level = compact_label(self.competition_level, CompetitionLevel)
+        # Empty containers share one immutable instance instead of one per keyword
+        self.seasonality = MappingProxyType(dict(self.seasonality)) if self.seasonality else EMPTY_SEASONALITY
+        self.cyrillic_variations = tuple(self.cyrillic_variations)
+
+    @classmethod
+    def from_keyword(cls, keyword: KeywordData) -> 'CompactKeywordData':
+        return cls(keyword.keyword, keyword.volume, keyword.difficulty, keyword.cpc, keyword.intent,
+                   keyword.seasonality, keyword.local_relevance, keyword.cyrillic_variations,
+                   keyword.current_ranking, keyword.competition_level)
+
+    def to_keyword(self) -> KeywordData:
+        return KeywordData(self.keyword, self.volume, self.difficulty, self.cpc, str(self.intent),
+                           dict(self.seasonality), self.local_relevance, list(self.cyrillic_variations),
+                           self.current_ranking, str(self.competition_level))
+
+
+class KeywordStore:
+    """Struct-of-arrays storage for bulk keyword sets"""
+
+    NO_RANKING = -1
+
+    def __init__(self):
+        self.keywords: List[str] = []
+        self.volume = array('q')
+        self.difficulty = array('h')
+        self.cpc = array('d')
+        self.local_relevance = array('d')
+        self.current_ranking = array('i')
+        # Intent and competition are stored as one-byte codes into small label tables
+        self.intent_codes = array('B')
+        self.competition_codes = array('B')
+        self.intent_labels: List[str] = [member.value for member in KeywordIntent]
+        self.competition_labels: List[str] = [member.value for member in CompetitionLevel]
+        # Seasonality and variations are rare, so they are kept sparse by row index
+        self.seasonality: Dict[int, Dict[str, float]] = {}
+        self.cyrillic_variations: Dict[int, List[str]] = {}
+
+    @classmethod
+    def from_keywords(cls, keywords: Iterable[Any]) -> 'KeywordStore':
+        store = cls()
+        for keyword in keywords:
+            store.add(keyword)
+        return store
+
+    def label_code(self, labels: List[str], value: str) -> int:
+        try:
+            return labels.index(value)
+        except ValueError:
+            if len(labels) >= 256:
+                raise ValueError(f"Too many distinct labels for one-byte codes: {value!r}")
+            labels.append(sys.intern(value))
+            return len(labels) - 1
+
+    def append(self,
+               keyword: str,
+               volume: int,
+               difficulty: int,
+               cpc: float,
+               intent: str,
+               seasonality: Optional[Dict[str, float]] = None,
+               local_relevance: float = 1.0,
+               cyrillic_variations: Optional[List[str]] = None,
+               current_ranking: Optional[int] = None,
+               competition_level: str = 'medium'):
+        """Append one keyword row; arguments follow the KeywordData field order"""
+        index = len(self.keywords)
+        self.keywords.append(sys.intern(keyword))
+        self.volume.append(volume)
+        self.difficulty.append(difficulty)
+        self.cpc.append(cpc)
+        self.local_relevance.append(local_relevance)
+        self.current_ranking.append(self.NO_RANKING if current_ranking is None else current_ranking)
+        self.intent_codes.append(self.label_code(self.intent_labels, intent))
+        self.competition_codes.append(self.label_code(self.competition_labels, competition_level))
+        if seasonality:
+            self.seasonality[index] = dict(seasonality)
+        if cyrillic_variations:
+            self.cyrillic_variations[index] = list(cyrillic_variations)
+
+    def add(self, keyword: Any):
+        """Append a KeywordData-like object"""
+        self.append(keyword.keyword, keyword.volume, keyword.difficulty, keyword.cpc, keyword.intent,
+                    keyword.seasonality, keyword.local_relevance, keyword.cyrillic_variations,
+                    keyword.current_ranking, keyword.competition_level)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def __getitem__(self, index: int) -> CompactKeywordData:
+        ranking = self.current_ranking[index]
+        return CompactKeywordData(
+            self.keywords[index],
+            self.volume[index],
+            self.difficulty[index],
+            self.cpc[index],
+            self.intent_labels[self.intent_codes[index]],
+            self.seasonality.get(index, EMPTY_SEASONALITY),
+            self.local_relevance[index],
+            self.cyrillic_variations.get(index, ()),
+            None if ranking == self.NO_RANKING else ranking,
+            self.competition_labels[self.competition_codes[index]]
+        )
+
+    def __iter__(self):
+        for index in range(len(self.keywords)):
+            yield self[index]
+
+    def take(self, indices: Iterable[int]) -> 'KeywordStore':
+        """New store holding the given rows, in the given order"""
+        store = KeywordStore()
+        for index in indices:
+            store.add(self[index])
+        return store
+
+    def to_keywords(self) -> List[KeywordData]:
+        return [row.to_keyword() for row in self]
+
+    def deduplicate(self) -> 'KeywordStore':
+        """Drop case-insensitive duplicate keywords, keeping the first occurrence"""
+        seen = set()
+        keep = []
+        for index, keyword in enumerate(self.keywords):
+            key = keyword.lower()
+            if key not in seen:
+                seen.add(key)
+                keep.append(index)
+        return self.take(keep)
+
+    def opportunity_scores(self) -> np.ndarray:
+        """Vectorized RussianSEOAnalyst.calculate_opportunity_score over the arrays"""
+        intent_table = np.array([INTENT_SCORES.get(label, DEFAULT_INTENT_SCORE) for label in self.intent_labels])
+        volume_score = np.minimum(np.frombuffer(self.volume, dtype=np.int64) / 100000, 1.0)
+        difficulty_score = (100 - np.frombuffer(self.difficulty, dtype=np.int16).astype(np.int64)) / 100
+        intent_score = intent_table[np.frombuffer(self.intent_codes, dtype=np.uint8)]
+        relevance_score = np.frombuffer(self.local_relevance, dtype=np.float64)
+
+        return (
+            volume_score * 0.3 +
+            difficulty_score * 0.3 +
+            intent_score * 0.25 +
+            relevance_score * 0.15
+        )
+
+
+class KeywordFrame:
+    """Columnar keyword set backed by a DataFrame for vectorized scoring and filtering"""
+
+    columns = ['keyword', 'volume', 'difficulty', 'cpc', 'intent', 'seasonality',
+               'local_relevance', 'cyrillic_variations', 'current_ranking', 'competition_level']
+
+    def __init__(self, df: 'pd.DataFrame'):
+        self.df = df
+
+    @classmethod
+    def from_keywords(cls, keywords: Iterable[KeywordData]) -> 'KeywordFrame':
+        """Build a frame from KeywordData objects, one column at a time"""
+        keywords = list(keywords)
+        df = pd.DataFrame({
+            'keyword': pd.Series([kw.keyword for kw in keywords], dtype=object),
+            'volume': np.array([kw.volume for kw in keywords], dtype=np.int64),
+            'difficulty': np.array([kw.difficulty for kw in keywords], dtype=np.int64),
+            'cpc': np.array([kw.cpc for kw in keywords], dtype=np.float64),
+            'intent': pd.Categorical([kw.intent for kw in keywords]),
+            'seasonality': pd.Series([kw.seasonality for kw in keywords], dtype=object),
+            'local_relevance': np.array([kw.local_relevance for kw in keywords], dtype=np.float64),
+            'cyrillic_variations': pd.Series([kw.cyrillic_variations for kw in keywords], dtype=object),
+            'current_ranking': pd.array([kw.current_ranking for kw in keywords], dtype='Int64'),
+            'competition_level': pd.Categorical([kw.competition_level for kw in keywords])
+        })
+        return cls(df)
+
+    def to_keywords(self) -> List[KeywordData]:
+        """Convert rows back into KeywordData objects"""
+        df = self.df
+        rankings = [None if pd.isna(ranking) else ranking
+                    for ranking in df['current_ranking'].astype(object).tolist()]
+        return [
+            KeywordData(*row)
+            for row in zip(df['keyword'].tolist(), df['volume'].tolist(), df['difficulty'].tolist(),
+                           df['cpc'].tolist(), df['intent'].tolist(), df['seasonality'].tolist(),
+                           df['local_relevance'].tolist(), df['cyrillic_variations'].tolist(),
+                           rankings, df['competition_level'].tolist())
+        ]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def opportunity_scores(self) -> 'pd.Series':
+        """Vectorized RussianSEOAnalyst.calculate_opportunity_score"""
+        volume_score = np.minimum(self.df['volume'].to_numpy() / 100000, 1.0)
+        difficulty_score = (100 - self.df['difficulty'].to_numpy()) / 100
+        intent_score = (self.df['intent'].astype(object).map(INTENT_SCORES)
+                        .fillna(DEFAULT_INTENT_SCORE).to_numpy(dtype=np.float64))
+        relevance_score = self.df['local_relevance'].to_numpy()
+
+        scores = (
+            volume_score * 0.3 +
+            difficulty_score * 0.3 +
+            intent_score * 0.25 +
+            relevance_score * 0.15
+        )
+        return pd.Series(scores, index=self.df.index)
+
+    def filter(self, volume_min: Optional[int] = None, difficulty_max: Optional[int] = None) -> 'KeywordFrame':
+        """Keep keywords with volume >= volume_min and difficulty <= difficulty_max"""
+        mask = np.ones(len(self.df), dtype=bool)
+        if volume_min is not None:
+            mask &= self.df['volume'].to_numpy() >= volume_min
+        if difficulty_max is not None:
+            mask &= self.df['difficulty'].to_numpy() <= difficulty_max
+        return KeywordFrame(self.df[mask])
+
+    def deduplicate(self) -> 'KeywordFrame':
+        """Drop case-insensitive duplicate keywords, keeping the first occurrence"""
+        duplicated = self.df['keyword'].str.lower().duplicated(keep='first').to_numpy()
+        return KeywordFrame(self.df[~duplicated])
+
+    def collapse(self, labels: np.ndarray) -> 'KeywordFrame':
+        """Keep the best-scoring keyword of each cluster, recording the others as its variations"""
+        if len(self.df) == 0:
+            return self
+        order = np.argsort(-self.opportunity_scores().to_numpy(), kind='stable')
+        _, first = np.unique(labels[order], return_index=True)
+        heads = np.sort(order[first])
+
+        # Only multi-member clusters need their member keywords gathered
+        members: Dict[int, List[str]] = {}
+        keywords = self.df['keyword'].tolist()
+        for position in np.flatnonzero(np.bincount(labels)[labels] > 1).tolist():
+            members.setdefault(int(labels[position]), []).append(keywords[position])
+
+        df = self.df.iloc[heads].copy()
+        if members:
+            variations = df['cyrillic_variations'].tolist()
+            for row, position in enumerate(heads.tolist()):
+                group = members.get(int(labels[position]))
+                if group:
+                    variations[row] = list(dict.fromkeys(
+                        list(variations[row]) + [keyword for keyword in group if keyword != keywords[position]]
+                    ))
+            df['cyrillic_variations'] = pd.Series(variations, index=df.index, dtype=object)
+        return KeywordFrame(df)
+
+    def quick_win_mask(self) -> np.ndarray:
+        """Quick win criteria: volume > 1000, difficulty < 40, commercial or transactional intent"""
+        return (
+            (self.df['volume'].to_numpy() > 1000) &
+            (self.df['difficulty'].to_numpy() < 40) &
+            self.df['intent'].isin(QUICK_WIN_INTENTS).to_numpy()
+        )
+
+    def top(self, n: Optional[int] = None) -> 'KeywordFrame':
+        """Sort by opportunity score (stable, descending) and keep the first n rows"""
+        order = np.argsort(-self.opportunity_scores().to_numpy(), kind='stable')
+        if n is not None:
+            order = order[:n]
+        return KeywordFrame(self.df.iloc[order])
+
+    def quick_wins(self, n: int = 20) -> 'KeywordFrame':
+        """Top n quick win keywords by opportunity score"""
+        return KeywordFrame(self.df[self.quick_win_mask()]).top(n)
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """Plain column lists, the JSON fallback for result tables"""
+        df = self.df
+        return {
+            'keyword': df['keyword'].tolist(),
+            'volume': df['volume'].tolist(),
+            'difficulty': df['difficulty'].tolist(),
+            'cpc': df['cpc'].tolist(),
+            'intent': [str(intent) for intent in df['intent'].tolist()],
+            'seasonality': [dict(seasonality) for seasonality in df['seasonality'].tolist()],
+            'local_relevance': df['local_relevance'].tolist(),
+            'cyrillic_variations': [list(variations) for variations in df['cyrillic_variations'].tolist()],
+            'current_ranking': [None if pd.isna(ranking) else ranking
+                                for ranking in df['current_ranking'].astype(object).tolist()],
+            'competition_level': [str(level) for level in df['competition_level'].tolist()]
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]]) -> 'KeywordFrame':
+        return cls(pd.DataFrame({
+            'keyword': pd.Series(columns['keyword'], dtype=object),
+            'volume': np.array(columns['volume'], dtype=np.int64),
+            'difficulty': np.array(columns['difficulty'], dtype=np.int64),
+            'cpc': np.array(columns['cpc'], dtype=np.float64),
+            'intent': pd.Categorical(columns['intent']),
+            'seasonality': pd.Series(columns['seasonality'], dtype=object),
+            'local_relevance': np.array(columns['local_relevance'], dtype=np.float64),
+            'cyrillic_variations': pd.Series(columns['cyrillic_variations'], dtype=object),
+            'current_ranking': pd.array(columns['current_ranking'], dtype='Int64'),
+            'competition_level': pd.Categorical(columns['competition_level'])
+        }))
+
+    def to_arrow(self) -> 'pa.Table':
+        """Arrow table with dictionary-encoded labels and a map column for seasonality"""
+        columns = self.to_columns()
+        return pa.table({
+            'keyword': pa.array(columns['keyword'], pa.string()),
+            'volume': pa.array(self.df['volume'].to_numpy(), pa.int64()),
+            'difficulty': pa.array(self.df['difficulty'].to_numpy(), pa.int64()),
+            'cpc': pa.array(self.df['cpc'].to_numpy(), pa.float64()),
+            'intent': pa.array(columns['intent'], pa.string()).dictionary_encode(),
+            'seasonality': pa.array([list(seasonality.items()) for seasonality in columns['seasonality']],
+                                    pa.map_(pa.string(), pa.float64())),
+            'local_relevance': pa.array(self.df['local_relevance'].to_numpy(), pa.float64()),
+            'cyrillic_variations': pa.array(columns['cyrillic_variations'], pa.list_(pa.string())),
+            'current_ranking': pa.array(columns['current_ranking'], pa.int64()),
+            'competition_level': pa.array(columns['competition_level'], pa.string()).dictionary_encode()
+        })
+
+    @classmethod
+    def from_arrow(cls, table: 'pa.Table') -> 'KeywordFrame':
+        """Frame over an Arrow table; numeric columns are viewed without copying where possible"""
+        return cls(pd.DataFrame({
+            'keyword': pd.Series(table.column('keyword').to_pylist(), dtype=object),
+            'volume': table.column('volume').to_numpy(),
+            'difficulty': table.column('difficulty').to_numpy(),
+            'cpc': table.column('cpc').to_numpy(),
+            'intent': pd.Categorical(table.column('intent').to_pylist()),
+            'seasonality': pd.Series([dict(items) for items in table.column('seasonality').to_pylist()],
+                                     dtype=object),
+            'local_relevance': table.column('local_relevance').to_numpy(),
+            'cyrillic_variations': pd.Series(table.column('cyrillic_variations').to_pylist(), dtype=object),
+            'current_ranking': pd.array(table.column('current_ranking').to_pylist(), dtype='Int64'),
+            'competition_level': pd.Categorical(table.column('competition_level').to_pylist())
+        }))
+
+
+class TopKeywords:
+    """Bounded min-heap keeping the k best keywords by opportunity score"""
+
+    def __init__(self, k: int, score: Callable[[Any], float]):
+        self.k = k
+        self.score = score
+        self.heap: List[Tuple[float, int, Any]] = []
+        self.seen = 0
+
+    def push(self, keyword: Any) -> bool:
+        """Offer a keyword; returns True if it is currently in the top k"""
+        # Negated arrival order breaks ties in favour of earlier keywords, like a stable sort
+        entry = (self.score(keyword), -self.seen, keyword)
+        self.seen += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+            return True
+        if entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+            return True
+        return False
+
+    def ranked(self) -> List[Any]:
+        """Current top keywords, best first"""
+        return [entry[2] for entry in sorted(self.heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+
+class KeywordTableRef:
+    """Lazy handle on a keyword table written next to a results manifest; reads like a list of KeywordData"""
+
+    def __init__(self, path: Path, table_format: str, rows: int):
+        self.path = path
+        self.table_format = table_format
+        self.rows = rows
+        self._keywords: Optional[List[KeywordData]] = None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[KeywordData]:
+        return iter(self.to_keywords())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[KeywordData, List[KeywordData]]:
+        return self.to_keywords()[index]
+
+    def __repr__(self) -> str:
+        return f"KeywordTableRef({self.path.name!r}, rows={self.rows})"
+
+    def arrow(self, memory_map: bool = True) -> 'pa.Table':
+        """Open the table as Arrow; Arrow IPC files are memory-mapped instead of parsed"""
+        if self.table_format == 'arrow':
+            source = pa.memory_map(str(self.path)) if memory_map else pa.OSFile(str(self.path))
+            return pa.ipc.open_file(source).read_all()
+        if self.table_format == 'parquet':
+            return pq.read_table(str(self.path), memory_map=memory_map)
+        return pa.table(self.read_columns())
+
+    def read_columns(self) -> Dict[str, List[Any]]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def frame(self) -> KeywordFrame:
+        if self.table_format == 'json':
+            return KeywordFrame.from_columns(self.read_columns())
+        return KeywordFrame.from_arrow(self.arrow())
+
+    def to_keywords(self) -> List[KeywordData]:
+        if self._keywords is None:
+            self._keywords = self.frame().to_keywords()
+        return self._keywords
+
+
+class AnalysisResultsWriter:
+    """Writes results as compact JSON metadata plus one columnar file per keyword table"""
+
+    # Table format -> file suffix; arrow and parquet need pyarrow
+    table_formats = {
+        'arrow': '.arrow',
+        'parquet': '.parquet',
+        'json': '.columns.json'
+    }
+    manifest_version = 1
+
+    def __init__(self,
+                 output_dir: Union[str, Path],
+                 table_format: Optional[str] = None):
+        if table_format is None:
+            table_format = 'arrow' if pa is not None else 'json'
+        if table_format not in self.table_formats:
+            raise ValueError(f"Unknown results table format: {table_format}")
+        if table_format != 'json' and pa is None:
+            print(f"⚠️ pyarrow not installed; writing {table_format} tables as JSON columns")
+            table_format = 'json'
+        self.output_dir = Path(output_dir)
+        self.table_format = table_format
+
+    def keyword_table(self, obj: Any) -> Optional[KeywordFrame]:
+        """The KeywordFrame to store for obj, or None when obj is not a keyword list"""
+        # Every keyword list becomes a table whatever its size, so a key loads back in one shape
+        if isinstance(obj, (KeywordFrame, KeywordStore)):
+            return obj if isinstance(obj, KeywordFrame) else KeywordFrame.from_keywords(list(obj))
+        if (isinstance(obj, list) and obj
+                and all(isinstance(item, (KeywordData, CompactKeywordData)) for item in obj)):
+            return KeywordFrame.from_keywords(obj)
+        return None
+
+    def write_table(self, frame: KeywordFrame, path: Path):
+        if self.table_format == 'arrow':
+            table = frame.to_arrow()
+            with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        elif self.table_format == 'parquet':
+            pq.write_table(frame.to_arrow(), str(path), compression='zstd')
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(frame.to_columns(), f, ensure_ascii=False, separators=(',', ':'))
+
+    def save(self,
+             results: Dict[str, Any],
+             output_file: str,
+             serialize: Callable[[Any], Any]) -> Path:
+        """Write tables first and the manifest last, so readers never see a partial save"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.output_dir / output_file
+        stem = Path(output_file).stem
+        # Table names are unique per save; the manifest rename is the commit point
+        token = f"{time.time_ns():x}"
+        suffix = self.table_formats[self.table_format]
+        written: Set[str] = set()
+
+        def extract(obj: Any, path: List[str]) -> Any:
+            frame = self.keyword_table(obj)
+            if frame is not None:
+                name = f"{stem}.{'.'.join(path) or 'keywords'}.{token}{suffix}"
+                atomic_write(self.output_dir / name, lambda tmp_path: self.write_table(frame, tmp_path))
+                written.add(name)
+                return {'$table': name, 'format': self.table_format, 'rows': len(frame)}
+            if isinstance(obj, dict):
+                return {key: extract(value, path + [str(key)]) for key, value in obj.items()}
+            if isinstance(obj, list) and obj and isinstance(obj[0], (list, dict)):
+                return [extract(item, path + [str(index)]) for index, item in enumerate(obj)]
+            return serialize(obj)
+
+        manifest = {
+            'results_format': self.manifest_version,
+            'tables': [],
+            'results': extract(results, [])
+        }
+        manifest['tables'] = sorted(written)
+        previous_tables = self.manifest_tables(manifest_path)
+
+        def write_manifest(tmp_path: Path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+        atomic_write(manifest_path, write_manifest)
+
+        # Tables from the previous save are unreachable once the new manifest is in place
+        for name in previous_tables - written:
+            (self.output_dir / name).unlink(missing_ok=True)
+        return manifest_path
+
+    @staticmethod
+    def manifest_tables(manifest_path: Path) -> Set[str]:
+        """Table files referenced by an existing manifest"""
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        return set(data.get('tables', [])) if isinstance(data, dict) else set()
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> Dict[str, Any]:
+        """Read a results manifest; keyword tables come back as lazy KeywordTableRef handles"""
+        path = Path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or 'results_format' not in data:
+            return data  # Single-blob JSON written before tables were split out
+
+        def resolve(obj: Any) -> Any:
+            if isinstance(obj, dict):
+                if '$table' in obj:
+                    return KeywordTableRef(path.parent / obj['$table'], obj['format'], obj['rows'])
+                return {key: resolve(value) for key, value in obj.items()}
+            if isinstance(obj, list):
+                return [resolve(item) for item in obj]
+            return obj
+
+        return resolve(data['results'])
+
+
+class KeywordGapIndex:
+    """Normalized keyword -> bitmap of the domains that rank for it"""
+
+    def __init__(self, normalize: Callable[[str], str]):
+        self.normalize = normalize
+        self.domains: List[str] = []
+        self.domain_ids: Dict[str, int] = {}
+        # Python ints serve as bitmaps: bit i is set when domain i ranks for the keyword
+        self.postings: Dict[str, int] = {}
+        # First keyword seen for each normalized form, returned as its representative
+        self.representatives: Dict[str, Any] = {}
+        # Raw text -> normalized form; competitors share most keywords, so each is normalized once
+        self.keys: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def domain_mask(self, domains: Optional[Iterable[str]] = None) -> int:
+        """Bitmap of the given domains (all indexed domains when None)"""
+        if domains is None:
+            return (1 << len(self.domains)) - 1
+        mask = 0
+        for domain in domains:
+            mask |= 1 << self.domain_ids[domain]
+        return mask
+
+    def add_domain(self, domain: str, keywords: Iterable[Any]) -> int:
+        """Index a domain's keywords (KeywordData or plain strings); returns its domain id"""
+        domain_id = self.domain_ids.get(domain)
+        if domain_id is None:
+            domain_id = self.domain_ids[domain] = len(self.domains)
+            self.domains.append(domain)
+
+        bit = 1 << domain_id
+        postings, representatives, keys, normalize = self.postings, self.representatives, self.keys, self.normalize
+        for keyword in keywords:
+            text = keyword if isinstance(keyword, str) else keyword.keyword
+            key = keys.get(text)
+            if key is None:
+                key = keys[text] = normalize(text)
+            postings[key] = postings.get(key, 0) | bit
+            if key not in representatives:
+                representatives[key] = keyword
+        return domain_id
+
+    def select(self, include: int, exclude: int = 0, min_count: int = 1) -> List[Any]:
+        """Representatives ranked by >= min_count domains of include and by none of exclude"""
+        return [
+            self.representatives[key]
+            for key, mask in self.postings.items()
+            if not mask & exclude and (mask & include).bit_count() >= min_count
+        ]
+
+    def gaps(self, ours: Iterable[str], competitors: Optional[Iterable[str]] = None, min_count: int = 1) -> List[Any]:
+        """Keywords competitors rank for and we do not"""
+        exclude = self.domain_mask(ours)
+        include = self.domain_mask(competitors) & ~exclude
+        return self.select(include, exclude, min_count)
+
+    def overlap(self, domains: Iterable[str]) -> List[Any]:
+        """Keywords every one of domains ranks for"""
+        domains = list(domains)
+        return self.select(self.domain_mask(domains), min_count=len(domains))
+
+    def ranked_by(self, min_count: int, domains: Optional[Iterable[str]] = None) -> List[Any]:
+        """Keywords ranked by at least min_count of domains"""
+        return self.select(self.domain_mask(domains), min_count=min_count)
+
+    def domains_for(self, keyword: str) -> List[str]:
+        mask = self.postings.get(self.normalize(keyword), 0)
+        return [domain for domain_id, domain in enumerate(self.domains) if mask >> domain_id & 1]
+
+
+class NearDuplicateClusterer:
+    """MinHash/LSH grouping of keyword variants (word order, years, transliteration, inflection)"""
+
+    def __init__(self,
+                 processor: 'CyrillicSEOProcessor',
+                 num_perm: int = 64,
+                 bands: int = 16,
+                 threshold: float = 0.7,
+                 shingle_size: int = 3,
+                 chunk_size: int = 100000,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if not 1 <= shingle_size <= 3:
+            # Each character takes 21 bits of a packed uint64 shingle
+            raise ValueError("shingle_size must be between 1 and 3")
+        self.processor = processor
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Candidate pairs must also agree on this share of signature slots
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+        generator = np.random.default_rng(seed)
+        self.hash_a = generator.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.hash_b = generator.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def shingle_text(self, keyword: str) -> Tuple[str, str]:
+        """Order-insensitive Latin form without years, plus the other numbers it must match on"""
+        tokens = [token for token in self.processor.normalize_keyword(keyword, stem=False).split()
+                  if not YEAR_PATTERN.fullmatch(token)]
+        numbers = ' '.join(sorted(token for token in tokens if token.isdigit()))
+        return self.processor.transliterate(' '.join(sorted(tokens)) or keyword), numbers
+
+    def signatures(self, keywords: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(len(keywords), num_perm) MinHash signatures over character shingles, plus number ids"""
+        signatures = np.empty((len(keywords), self.num_perm), dtype=np.uint32)
+        # "iphone 13" and "iphone 14" shingle alike but are different products
+        numbers: Dict[str, int] = {}
+        number_ids = array('q')
+        size = self.shingle_size
+        for start in range(0, len(keywords), self.chunk_size):
+            texts = []
+            for keyword in keywords[start:start + self.chunk_size]:
+                text, keyword_numbers = self.shingle_text(keyword)
+                number_ids.append(numbers.setdefault(keyword_numbers, len(numbers)))
+                texts.append(f" {text} ".ljust(size))
+
+            # Shingles are read straight off the code points: each window of `size` characters
+            # packs into one integer, and windows that straddle two keywords are dropped
+            lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+            code_points = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+            owners = np.repeat(np.arange(len(texts)), lengths)
+            windows = len(code_points) - size + 1
+            shingles = code_points[:windows].copy()
+            for offset in range(1, size):
+                shingles = (shingles << np.uint64(21)) | code_points[offset:offset + windows]
+            shingles = shingles[owners[:windows] == owners[size - 1:]]
+            starts = np.concatenate(([0], np.cumsum(lengths - size + 1)[:-1]))
+
+            # Multiply-shift hashing: one odd multiplier per permutation, top 32 bits kept
+            block = signatures[start:start + len(texts)]
+            for column in range(self.num_perm):
+                hashed = (shingles * self.hash_a[column] + self.hash_b[column]) >> np.uint64(32)
+                block[:, column] = np.minimum.reduceat(hashed, starts)
+        return signatures, np.frombuffer(number_ids, dtype=np.int64)
+
+    def candidate_pairs(self, signatures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pairs sharing an LSH band bucket, found by sorting bucket keys rather than comparing all pairs"""
+        left, right = [], []
+        for band in range(self.bands):
+            rows = signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+            bucket = rows[:, 0].copy()
+            for column in range(1, self.rows):
+                bucket = bucket * np.uint64(1000003) ^ rows[:, column]
+            order = np.argsort(bucket, kind='stable')
+            ordered = bucket[order]
+            # Every pair in a bucket, not just neighbours: entries `gap` apart in sorted order
+            # share a bucket only if all entries between them do, so stop at the first empty gap
+            for gap in range(1, len(order)):
+                same = ordered[gap:] == ordered[:-gap]
+                if not same.any():
+                    break
+                left.append(order[:-gap][same])
+                right.append(order[gap:][same])
+
+        if not left:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        left, right = np.concatenate(left), np.concatenate(right)
+        pairs = np.unique(np.minimum(left, right) * len(signatures) + np.maximum(left, right))
+        return pairs // len(signatures), pairs % len(signatures)
+
+    def labels(self, keywords: List[str]) -> np.ndarray:
+        """Cluster label per keyword: the lowest index in its near-duplicate group"""
+        labels = np.arange(len(keywords))
+        if len(keywords) < 2:
+            return labels
+
+        signatures, number_ids = self.signatures(keywords)
+        left, right = self.candidate_pairs(signatures)
+        same_numbers = number_ids[left] == number_ids[right]
+        left, right = left[same_numbers], right[same_numbers]
+
+        # Verify candidates on the full signature to drop band-level coincidences
+        keep = np.zeros(len(left), dtype=bool)
+        for start in range(0, len(left), self.chunk_size):
+            stop = start + self.chunk_size
+            agreement = (signatures[left[start:stop]] == signatures[right[start:stop]]).mean(axis=1)
+            keep[start:stop] = agreement >= self.threshold
+        left, right = left[keep], right[keep]
+
+        # Connected components by min-label propagation with pointer jumping
+        while len(left):
+            merged = np.minimum(labels[left], labels[right])
+            if np.array_equal(merged, labels[left]) and np.array_equal(merged, labels[right]):
+                break
+            np.minimum.at(labels, left, merged)
+            np.minimum.at(labels, right, merged)
+            labels = labels[labels]
+        return labels
+
+
+class TopicClusterer:
+    """Sparse TF-IDF over word n-grams with mini-batch spherical k-means"""
+
+    other_cluster = 'Other keywords'
+
+    def __init__(self,
+                 processor: 'CyrillicSEOProcessor',
+                 n_clusters: Optional[int] = None,
+                 min_df: int = 2,
+                 max_features: int = 50000,
+                 batch_size: int = 1024,
+                 n_init: int = 3,
+                 seed: int = 1):
+        self.processor = processor
+        # None picks sqrt(n / 2) clusters, capped at max_auto_clusters
+        self.n_clusters = n_clusters
+        self.max_auto_clusters = 200
+        self.min_df = min_df
+        self.max_features = max_features
+        self.batch_size = batch_size
+        # Seedings tried; the one leaving the sample closest to its seeds is kept
+        self.n_init = n_init
+        self.seed = seed
+
+    def terms(self, keyword: str) -> Set[str]:
+        """Stemmed word unigrams and bigrams of a keyword"""
+        tokens = self.processor.normalize_keyword(keyword).split()
+        return set(tokens) | {f"{first} {second}" for first, second in zip(tokens, tokens[1:])}
+
+    def vectorize(self, keywords: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """L2-normalized TF-IDF rows in CSR form (indptr, indices, data)"""
+        documents = [self.terms(keyword) for keyword in keywords]
+        document_frequency = Counter(term for terms in documents for term in terms)
+
+        # Terms seen in a single keyword cannot link two keywords; small sets keep them all
+        min_df = self.min_df if len(keywords) >= 1000 else 1
+        frequent = [(count, term) for term, count in document_frequency.items() if count >= min_df]
+        frequent = heapq.nlargest(self.max_features, frequent) if len(frequent) > self.max_features else frequent
+        vocabulary = {term: column for column, (_, term) in enumerate(frequent)}
+        idf = np.array([np.log((1 + len(keywords)) / (1 + count)) + 1 for count, _ in frequent], dtype=np.float32)
+
+        indptr = array('q', [0])
+        indices = array('q')
+        for terms in documents:
+            indices.extend(vocabulary[term] for term in terms if term in vocabulary)
+            indptr.append(len(indices))
+
+        indptr = np.frombuffer(indptr, dtype=np.int64)
+        indices = np.frombuffer(indices, dtype=np.int64)
+        data = idf[indices] if len(indices) else np.empty(0, dtype=np.float32)
+        lengths = np.diff(indptr)
+        if len(data):
+            norms = np.sqrt(np.add.reduceat(data * data, indptr[:-1][lengths > 0]))
+            data = data / np.repeat(norms, lengths[lengths > 0])
+        return indptr, indices, data.astype(np.float32), len(vocabulary)
+
+    @staticmethod
+    def gather(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of the nonzeros of rows, plus each row's start within them"""
+        lengths = indptr[rows + 1] - indptr[rows]
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        positions = np.arange(lengths.sum()) - np.repeat(starts - indptr[rows], lengths)
+        return positions, starts
+
+    def similarities(self, centroids: np.ndarray, csr: Tuple, rows: np.ndarray) -> np.ndarray:
+        """(len(rows), k) cosine similarities of non-empty rows to the centroids"""
+        indptr, indices, data = csr[:3]
+        positions, starts = self.gather(indptr, rows)
+        contributions = centroids[:, indices[positions]] * data[positions]
+        return np.add.reduceat(contributions, starts, axis=1).T
+
+    @staticmethod
+    def dense_rows(csr: Tuple, rows: Iterable[int]) -> np.ndarray:
+        """Rows of the CSR matrix as a dense (len(rows), width) array"""
+        indptr, indices, data, width = csr
+        rows = list(rows)
+        dense = np.zeros((len(rows), width))
+        for position, row in enumerate(rows):
+            start, stop = indptr[row], indptr[row + 1]
+            dense[position, indices[start:stop]] = data[start:stop]
+        return dense
+
+    def seed_rows(self, csr: Tuple, rows: np.ndarray, k: int, generator: np.random.Generator) -> List[int]:
+        """Greedy k-means++ seeding on a sample: later seeds favour rows far from every earlier one"""
+        sample = generator.choice(rows, size=min(len(rows), max(20 * k, 1000), 20000), replace=False)
+        # Several candidates are drawn per seed and the one leaving rows closest to a seed is kept;
+        # a single draw often lands two seeds in one topic, which mini-batch updates cannot undo
+        trials = 2 + int(np.log(k))
+        best_seeds, best_potential = None, np.inf
+        for first in sample[:self.n_init]:
+            seeds = [int(first)]
+            closest = self.similarities(self.dense_rows(csr, seeds), csr, sample)[:, 0]
+            while len(seeds) < k:
+                weights = np.square(1 - closest)
+                if weights.sum() <= 0:
+                    break
+                candidates = generator.choice(len(sample), size=trials, p=weights / weights.sum())
+                reach = np.maximum(closest[:, None],
+                                   self.similarities(self.dense_rows(csr, sample[candidates]), csr, sample))
+                best = int(np.square(1 - reach).sum(axis=0).argmin())
+                seeds.append(int(sample[candidates[best]]))
+                closest = reach[:, best]
+            potential = np.square(1 - closest).sum()
+            if potential < best_potential:
+                best_seeds, best_potential = seeds, potential
+        seeds = best_seeds
+        # Too few distinct rows in the sample: pad with random ones
+        extra = [int(row) for row in generator.choice(rows, size=k, replace=False) if row not in seeds]
+        return seeds + extra[:k - len(seeds)]
+
+    def fit_predict(self, keywords: List[str], n_clusters: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Cluster label and centroid similarity per keyword; -1 for keywords sharing no terms with a cluster"""
+        csr = self.vectorize(keywords)
+        indptr, indices, data, width = csr
+        labels = np.full(len(keywords), -1, dtype=np.int64)
+        similarity = np.zeros(len(keywords), dtype=np.float32)
+        rows = np.flatnonzero(np.diff(indptr) > 0)
+        if len(rows) == 0:
+            return labels, similarity
+
+        k = n_clusters or self.n_clusters or min(self.max_auto_clusters, max(2, round(np.sqrt(len(rows) / 2))))
+        k = min(k, len(rows))
+        generator = np.random.default_rng(self.seed)
+
+        # Centroid j is scale[j] * raw[j]; shrinking and renormalizing then only touch scale,
+        # and the squared norm of raw is maintained from the entries each batch changes
+        raw = np.zeros((k, width), dtype=np.float64)
+        for cluster, seed_row in enumerate(self.seed_rows(csr, rows, k, generator)):
+            start, stop = indptr[seed_row], indptr[seed_row + 1]
+            raw[cluster, indices[start:stop]] = data[start:stop]
+        scale = np.ones(k)
+        norm2 = np.ones(k)
+        # Each seed counts as one observation of its cluster
+        counts = np.ones(k, dtype=np.int64)
+
+        # Mini-batch updates: each centroid is the running mean of the rows assigned to it
+        batches = max(100, 3 * -(-len(rows) // self.batch_size))
+        for _ in range(batches):
+            batch = generator.choice(rows, size=min(self.batch_size, len(rows)), replace=False)
+            scores = self.similarities(raw, csr, batch) * scale
+            # Rows sharing no term with any centroid would all land in cluster 0; leave them out
+            batch = batch[scores.max(axis=1) > 0]
+            if len(batch) == 0:
+                continue
+            assigned = scores[scores.max(axis=1) > 0].argmax(axis=1)
+            added = np.bincount(assigned, minlength=k)
+            touched = np.flatnonzero(added)
+            totals = counts + added
+            scale[touched] *= counts[touched] / totals[touched]
+
+            positions, starts = self.gather(indptr, batch)
+            owners = np.repeat(assigned, np.diff(np.append(starts, len(positions))))
+            cells, inverse = np.unique(owners * width + indices[positions], return_inverse=True)
+            increments = np.bincount(inverse, weights=data[positions] / (totals[owners] * scale[owners]))
+            cell_rows, cell_columns = cells // width, cells % width
+            old = raw[cell_rows, cell_columns]
+            new = old + increments
+            raw[cell_rows, cell_columns] = new
+            norm2 += np.bincount(cell_rows, weights=new * new - old * old, minlength=k)
+            counts = totals
+            # Spherical k-means: unit-length centroids keep dot products as cosines
+            scale[touched] = 1 / np.sqrt(np.maximum(norm2[touched], 1e-24))
+
+        centroids = raw * scale[:, None]
+        for start in range(0, len(rows), self.batch_size * 8):
+            chunk = rows[start:start + self.batch_size * 8]
+            scores = self.similarities(centroids, csr, chunk)
+            best = scores.max(axis=1)
+            # Rows sharing no term with any centroid have no cluster to join
+            labels[chunk] = np.where(best > 0, scores.argmax(axis=1), -1)
+            similarity[chunk] = best
+        return labels, similarity
+
+    def cluster(self, keywords: List[Any], n_clusters: Optional[int] = None) -> Dict[str, List[Any]]:
+        """Topical clusters named after their most central keyword, in first-appearance order"""
+        texts = [keyword if isinstance(keyword, str) else keyword.keyword for keyword in keywords]
+        labels, similarity = self.fit_predict(texts, n_clusters)
+
+        members: Dict[int, List[int]] = {}
+        for position, label in enumerate(labels.tolist()):
+            members.setdefault(label, []).append(position)
+
+        clusters: Dict[str, List[Any]] = {}
+        for label, positions in members.items():
+            if label < 0:
+                continue
+            name = texts[max(positions, key=lambda position: similarity[position])]
+            suffix = 2
+            while name in clusters:
+                name = f"{texts[positions[0]]} ({suffix})"
+                suffix += 1
+            clusters[name] = [keywords[position] for position in positions]
+        if -1 in members:
+            clusters[self.other_cluster] = [keywords[position] for position in members[-1]]
+        return clusters
@@ -0,0 +1,341 @@
+"""
+Metrics, tracing spans and profiling
+"""
+
+import bisect
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import threading
+import tracemalloc
+from collections import deque
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable, Awaitable, Iterable
+from functools import wraps
+from pathlib import Path
+
+from .util import atomic_write
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus / OpenTelemetry explicit-bucket layout"""
+
+    default_buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+    def __init__(self, buckets: Optional[Tuple[float, ...]] = None):
+        self.buckets = buckets or self.default_buckets
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is the +Inf overflow
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Span:
+    """A timed unit of work; nests through a context variable so asyncio tasks inherit their parent"""
+
+    __slots__ = ('instrumentation', 'name', 'metric', 'labels', 'attributes', 'trace_id', 'span_id',
+                 'parent_id', 'start_ns', 'duration', 'status', 'started', 'token')
+
+    def __init__(self,
+                 instrumentation: 'Instrumentation',
+                 name: str,
+                 metric: str,
+                 labels: Dict[str, str],
+                 attributes: Dict[str, Any]):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.metric = metric
+        self.labels = labels
+        self.attributes = attributes
+        self.status = 'ok'
+
+    def __enter__(self) -> 'Span':
+        parent = CURRENT_SPAN.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.token = CURRENT_SPAN.set(self)
+        self.start_ns = time.time_ns()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.status = 'error'
+            self.attributes['error.type'] = exc_type.__name__
+        CURRENT_SPAN.reset(self.token)
+        self.instrumentation.finish(self)
+
+
+class NullSpan:
+    """Shared no-op span handed out while instrumentation is disabled"""
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+CURRENT_SPAN: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+NULL_SPAN = NullSpan()
+
+
+class Instrumentation:
+    """
+    Spans, counters and histograms for the analysis pipeline, exported as
+    Prometheus text or OTLP JSON. Every entry point returns immediately when disabled.
+    """
+
+    descriptions = {
+        'seo_stage_duration_seconds': 'Wall time of analysis pipeline stages',
+        'seo_provider_request_duration_seconds': 'Wall time of provider API calls, including retries',
+        'seo_keywords_in_total': 'Keywords received by a stage',
+        'seo_keywords_out_total': 'Keywords produced by a stage'
+    }
+
+    def __init__(self, enabled: bool = False, max_spans: int = 10000, service_name: str = 'grabgifts-seo-agent'):
+        self.enabled = enabled
+        self.service_name = service_name
+        self.started_ns = time.time_ns()
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self.spans: deque = deque(maxlen=max_spans)  # finished spans, oldest dropped first
+        # Callables returning (name, 'counter' | 'gauge', labels, value) read at export time,
+        # so stats the components already keep cost nothing on the hot path
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+        self.lock = threading.Lock()
+
+    def span(self,
+             name: str,
+             metric: str = 'seo_stage_duration_seconds',
+             labels: Optional[Dict[str, str]] = None,
+             **attributes: Any) -> Union[Span, NullSpan]:
+        """Time a block; its duration lands in the metric histogram under labels (default: stage=name)"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, metric, labels if labels is not None else {'stage': name}, attributes)
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def finish(self, span: Span):
+        self.observe(span.metric, span.duration, status=span.status, **span.labels)
+        self.spans.append(span)
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]):
+        self.collectors.append(collector)
+
+    def collect(self) -> List[Tuple[str, str, Dict[str, str], float]]:
+        """Counters recorded directly plus everything the collectors report right now"""
+        with self.lock:
+            samples = [(name, 'counter', dict(labels), value) for (name, labels), value in self.counters.items()]
+        for collector in self.collectors:
+            samples.extend(collector())
+        return samples
+
+    @staticmethod
+    def prometheus_labels(labels: Dict[str, Any]) -> str:
+        if not labels:
+            return ''
+        pairs = []
+        for key, value in sorted(labels.items()):
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{value}"')
+        return '{' + ','.join(pairs) + '}'
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        families: Dict[str, Tuple[str, List[str]]] = {}
+
+        for name, kind, labels, value in self.collect():
+            families.setdefault(name, (kind, []))[1].append(f"{name}{self.prometheus_labels(labels)} {value}")
+
+        with self.lock:
+            histograms = [(name, dict(labels), histogram) for (name, labels), histogram in self.histograms.items()]
+        for name, labels, histogram in histograms:
+            lines = families.setdefault(name, ('histogram', []))[1]
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{self.prometheus_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{self.prometheus_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{self.prometheus_labels(labels)} {histogram.count}")
+
+        output = []
+        for name in sorted(families):
+            kind, lines = families[name]
+            output.append(f"# HELP {name} {self.descriptions.get(name, name.replace('_', ' '))}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(lines)
+        return '\n'.join(output) + '\n'
+
+    @staticmethod
+    def otlp_attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        attributes = []
+        for key, value in values.items():
+            if isinstance(value, bool):
+                attributes.append({'key': key, 'value': {'boolValue': value}})
+            elif isinstance(value, int):
+                attributes.append({'key': key, 'value': {'intValue': str(value)}})
+            elif isinstance(value, float):
+                attributes.append({'key': key, 'value': {'doubleValue': value}})
+            else:
+                attributes.append({'key': key, 'value': {'stringValue': str(value)}})
+        return attributes
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON bodies: resourceMetrics for /v1/metrics and resourceSpans for /v1/traces"""
+        now = str(time.time_ns())
+        start = str(self.started_ns)
+        resource_attributes = {'resource': {'attributes': self.otlp_attributes({'service.name': self.service_name})}}
+        scope = {'name': 'seo_agent'}
+
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for name, kind, labels, value in self.collect():
+            if kind == 'counter':
+                metric = metrics.setdefault(name, {'name': name, 'sum': {
+                    'dataPoints': [], 'aggregationTemporality': 2, 'isMonotonic': True}})
+                points = metric['sum']['dataPoints']
+            else:
+                metric = metrics.setdefault(name, {'name': name, 'gauge': {'dataPoints': []}})
+                points = metric['gauge']['dataPoints']
+            points.append({'attributes': self.otlp_attributes(labels), 'startTimeUnixNano': start,
+                           'timeUnixNano': now, 'asDouble': float(value)})
+
+        with self.lock:
+            histograms = [(name, dict(labels), histogram) for (name, labels), histogram in self.histograms.items()]
+            spans = list(self.spans)
+        for name, labels, histogram in histograms:
+            metric = metrics.setdefault(name, {'name': name, 'histogram': {
+                'dataPoints': [], 'aggregationTemporality': 2}})
+            metric['histogram']['dataPoints'].append({
+                'attributes': self.otlp_attributes(labels),
+                'startTimeUnixNano': start,
+                'timeUnixNano': now,
+                'count': str(histogram.count),
+                'sum': histogram.sum,
+                'bucketCounts': [str(count) for count in histogram.counts],
+                'explicitBounds': list(histogram.buckets)
+            })
+        for name, metric in metrics.items():
+            metric['description'] = self.descriptions.get(name, '')
+            metric['unit'] = 's' if name.endswith('_seconds') else '1'
+
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                'traceId': span.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 3 if span.metric == 'seo_provider_request_duration_seconds' else 1,  # CLIENT / INTERNAL
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.start_ns + int(span.duration * 1e9)),
+                'attributes': self.otlp_attributes({**span.labels, **span.attributes}),
+                'status': {'code': 2 if span.status == 'error' else 1}
+            }
+            if span.parent_id is not None:
+                otlp_span['parentSpanId'] = span.parent_id
+            otlp_spans.append(otlp_span)
+
+        return {
+            'resourceMetrics': [{**resource_attributes, 'scopeMetrics': [
+                {'scope': scope, 'metrics': list(metrics.values())}]}],
+            'resourceSpans': [{**resource_attributes, 'scopeSpans': [
+                {'scope': scope, 'spans': otlp_spans}]}]
+        }
+
+    def export(self, path: Union[str, Path], export_format: str = 'prometheus'):
+        """Write a snapshot of every metric (and, for OTLP, the spans) to path"""
+        if export_format == 'prometheus':
+            content = self.to_prometheus()
+        elif export_format == 'otlp':
+            content = json.dumps(self.to_otlp(), ensure_ascii=False)
+        else:
+            raise ValueError(f"Unknown metrics format: {export_format}")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        def write(tmp_path: Path):
+            tmp_path.write_text(content, encoding='utf-8')
+
+        atomic_write(path, write)
+
+
+def instrumented(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Run an async analyst method inside a stage span named after it"""
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if not self.instrumentation.enabled:
+            return await method(self, *args, **kwargs)
+        with self.instrumentation.span(method.__name__):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class ProfileCapture:
+    """Opt-in cProfile and tracemalloc capture around a single run, written to output_dir"""
+
+    def __init__(self, output_dir: Union[str, Path], cpu: bool = True, memory: bool = True, top: int = 30):
+        self.output_dir = Path(output_dir)
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.profiler: Optional[cProfile.Profile] = None
+        self.started_tracing = False
+
+    def __enter__(self) -> 'ProfileCapture':
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        if self.cpu:
+            # Profiles the event loop thread; work sent to threads and processes is not included
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+        # Snapshot before writing the CPU report so its own allocations don't show up
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:self.top]
+            if self.started_tracing:
+                tracemalloc.stop()
+            lines = [f"Traced memory: current {current / 2 ** 20:.1f} MiB, peak {peak / 2 ** 20:.1f} MiB", '']
+            lines.extend(str(stat) for stat in statistics)
+            (self.output_dir / 'tracemalloc.txt').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+        if self.profiler is not None:
+            self.profiler.dump_stats(self.output_dir / 'profile.pstats')
+            report = io.StringIO()
+            pstats.Stats(self.profiler, stream=report).sort_stats('cumulative').print_stats(self.top)
+            (self.output_dir / 'profile.txt').write_text(report.getvalue(), encoding='utf-8')
+
+        print(f"🔬 Profile written to {self.output_dir}")
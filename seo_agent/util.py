@@ -0,0 +1,20 @@
+"""
+Small helpers shared by the results writer, telemetry export and benchmarks
+"""
+
+import os
+import uuid
+from typing import Callable
+from pathlib import Path
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]):
+    """Write to a hidden temporary file in the same directory, then rename over path"""
+    # Unique per call, so concurrent writers in one process never share a temporary file
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
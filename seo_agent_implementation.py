@@ -2,944 +2,63 @@
 """
 Russian SEO Analysis Agent Implementation
 Specialized sub-agent for GrabGifts.ru Russian market SEO analysis
+
+The agent lives in the seo_agent package; this script is its command line and
+keeps the names importable from here for existing callers
 """
 
+import argparse
 import asyncio
-import aiohttp
-import json
-import re
-import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
-from pathlib import Path
-import markdown
-import pandas as pd
-
-@dataclass
-class KeywordData:
-    keyword: str
-    volume: int
-    difficulty: int
-    cpc: float
-    intent: str
-    seasonality: Dict[str, float]
-    local_relevance: float
-    cyrillic_variations: List[str]
-    current_ranking: Optional[int] = None
-    competition_level: str = 'medium'
-
-@dataclass
-class CompetitorData:
-    domain: str
-    organic_keywords: int
-    organic_traffic: int
-    backlinks: int
-    domain_authority: int
-    top_keywords: List[KeywordData]
-    content_gaps: List[str]
-
-class RussianSEOAnalyst:
-    """
-    Main SEO analysis agent for Russian market
-    """
-
-    def __init__(self, config_path: Optional[str] = None):
-        self.config = self.load_config(config_path)
-        self.project_path = Path('/Users/komalamin/Documents/Windsurf projects/GrabGiftsRUsite')
-        self.strategy_file = self.project_path / 'russian-keyword-strategy.md'
-        self.competitor_file = self.project_path / 'grabgifts_competitive_analysis.md'
-
-        # Initialize tool connectors
-        self.ahrefs = AhrefsRussianAnalyzer(self.config.get('ahrefs_api_key'))
-        self.semrush = SemrushYandexAnalyzer(self.config.get('semrush_api_key'))
-        self.yandex_wordstat = YandexWordstatConnector(self.config.get('yandex_token'))
-        self.technical_auditor = RussianTechnicalSEOAuditor()
-        self.cyrillic_processor = CyrillicSEOProcessor()
-        self.yandex_optimizer = YandexOptimizer()
-
-        # Current strategy data
-        self.current_strategy = None
-        self.current_competitors = None
-
-    def load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
-        """Load configuration from file or environment variables"""
-        config = {}
-
-        # Try to load from file first
-        if config_path and os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
-        # Fallback to environment variables
-        config.setdefault('ahrefs_api_key', os.getenv('AHREFS_API_KEY'))
-        config.setdefault('semrush_api_key', os.getenv('SEMRUSH_API_KEY'))
-        config.setdefault('yandex_token', os.getenv('YANDEX_WORDSTAT_TOKEN'))
-
-        return config
-
-    async def initialize(self):
-        """Initialize the agent with current project data"""
-        print("🔄 Initializing Russian SEO Analyst...")
-
-        # Load current strategy
-        self.current_strategy = await self.load_strategy_file()
-        print(f"✅ Loaded {len(self.current_strategy.get('keywords', []))} keywords from strategy")
-
-        # Load competitor data
-        self.current_competitors = await self.load_competitor_file()
-        print(f"✅ Loaded {len(self.current_competitors)} competitors from analysis")
-
-        print("🚀 Russian SEO Analyst ready!")
-
-    async def load_strategy_file(self) -> Dict[str, Any]:
-        """Load and parse the Russian keyword strategy file"""
-        if not self.strategy_file.exists():
-            return {'keywords': [], 'clusters': [], 'performance_data': {}}
-
-        with open(self.strategy_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Parse the markdown content
-        strategy_data = self.parse_strategy_markdown(content)
-        return strategy_data
-
-    def parse_strategy_markdown(self, content: str) -> Dict[str, Any]:
-        """Parse strategy markdown file to extract structured data"""
-        keywords = []
-        clusters = {}
-
-        # Extract keyword tables using regex
-        table_pattern = r'\|([^|]+)\|([^|]+)\|([^|]+)\|([^|]+)\|([^|]+)\|'
-        tables = re.findall(table_pattern, content, re.MULTILINE)
-
-        current_cluster = None
-
-        for line in content.split('\n'):
-            # Identify cluster headers
-            if line.startswith('### ') and ('Keywords' in line or 'игры' in line or 'TON' in line):
-                current_cluster = line.replace('### ', '').strip()
-                clusters[current_cluster] = []
-
-            # Extract keyword data from table rows
-            if '|' in line and 'телеграм' in line.lower() or 'крипто' in line.lower():
-                parts = [p.strip() for p in line.split('|') if p.strip()]
-                if len(parts) >= 5:
-                    try:
-                        keyword_data = KeywordData(
-                            keyword=parts[0],
-                            volume=self.parse_volume(parts[1]),
-                            difficulty=self.parse_difficulty(parts[2]),
-                            cpc=0.0,
-                            intent=parts[3] if len(parts) > 3 else 'informational',
-                            seasonality={},
-                            local_relevance=1.0,
-                            cyrillic_variations=[]
-                        )
-                        keywords.append(keyword_data)
-
-                        if current_cluster:
-                            clusters[current_cluster].append(keyword_data)
-                    except (ValueError, IndexError):
-                        continue
-
-        return {
-            'keywords': keywords,
-            'clusters': clusters,
-            'last_updated': datetime.now().isoformat(),
-            'total_keywords': len(keywords)
-        }
-
-    def parse_volume(self, volume_str: str) -> int:
-        """Parse search volume from string representation"""
-        volume_str = volume_str.lower().replace('k', '000').replace('м', '000')
-
-        if 'high' in volume_str or 'высокий' in volume_str:
-            return 50000
-        elif 'medium' in volume_str or 'средний' in volume_str:
-            return 15000
-        elif 'low' in volume_str or 'низкий' in volume_str:
-            return 3000
-
-        # Try to extract numbers
-        numbers = re.findall(r'\d+', volume_str)
-        if numbers:
-            return int(numbers[0])
-
-        return 1000  # Default
-
-    def parse_difficulty(self, difficulty_str: str) -> int:
-        """Parse keyword difficulty from string representation"""
-        difficulty_str = difficulty_str.lower()
-
-        if 'high' in difficulty_str or 'высокий' in difficulty_str:
-            return 80
-        elif 'medium' in difficulty_str or 'средний' in difficulty_str:
-            return 50
-        elif 'low' in difficulty_str or 'низкий' in difficulty_str:
-            return 20
-
-        # Try to extract numbers
-        numbers = re.findall(r'\d+', difficulty_str)
-        if numbers:
-            return min(int(numbers[0]), 100)
-
-        return 50  # Default
-
-    async def load_competitor_file(self) -> List[CompetitorData]:
-        """Load and parse the competitive analysis file"""
-        if not self.competitor_file.exists():
-            return []
-
-        with open(self.competitor_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        competitors = self.parse_competitor_markdown(content)
-        return competitors
-
-    def parse_competitor_markdown(self, content: str) -> List[CompetitorData]:
-        """Parse competitor analysis markdown to extract competitor data"""
-        competitors = []
-
-        # Extract competitor names and data
-        competitor_sections = re.split(r'#### \d+\. ', content)[1:]  # Skip first empty split
-
-        for section in competitor_sections:
-            lines = section.split('\n')
-            if not lines:
-                continue
-
-            competitor_name = lines[0].strip()
-
-            # Create competitor data object
-            competitor = CompetitorData(
-                domain=self.extract_domain_from_name(competitor_name),
-                organic_keywords=0,
-                organic_traffic=0,
-                backlinks=0,
-                domain_authority=0,
-                top_keywords=[],
-                content_gaps=[]
-            )
-
-            competitors.append(competitor)
-
-        return competitors
-
-    def extract_domain_from_name(self, name: str) -> str:
-        """Extract likely domain from competitor name"""
-        domain_mapping = {
-            'Hamster Kombat': 'hamsterkombat.io',
-            'Notcoin': 'notcoin.io',
-            'X Empire': 'xempire.io',
-            'TapSwap': 'tapswap.club',
-            'Catizen': 'catizen.ai',
-            'CSGOFast': 'csgofast.com',
-            'CSGOEmpire': 'csgoempire.com',
-            'VK Play': 'vkplay.ru'
-        }
-
-        for key, domain in domain_mapping.items():
-            if key in name:
-                return domain
-
-        # Fallback: create domain from name
-        return name.lower().replace(' ', '') + '.com'
-
-    async def research_keywords(self,
-                               seeds: List[str],
-                               market: str = 'RU',
-                               search_engines: List[str] = ['yandex', 'google.ru'],
-                               volume_min: int = 500,
-                               difficulty_max: int = 60) -> List[KeywordData]:
-        """
-        Comprehensive keyword research for Russian market
-        """
-        print(f"🔍 Researching keywords for seeds: {seeds}")
-
-        all_keywords = []
-
-        # Expand through multiple sources
-        if self.ahrefs.api_key:
-            ahrefs_keywords = await self.ahrefs.keyword_research(seeds, market)
-            all_keywords.extend(ahrefs_keywords)
-            print(f"📊 Found {len(ahrefs_keywords)} keywords from Ahrefs")
-
-        if self.yandex_wordstat.token:
-            yandex_keywords = await self.yandex_wordstat.get_keyword_suggestions(seeds)
-            all_keywords.extend(yandex_keywords)
-            print(f"📊 Found {len(yandex_keywords)} keywords from Yandex Wordstat")
-
-        # Process and enhance keywords
-        enhanced_keywords = []
-        for keyword in all_keywords:
-            if isinstance(keyword, dict):
-                enhanced_keyword = KeywordData(
-                    keyword=keyword.get('keyword', ''),
-                    volume=keyword.get('volume', 0),
-                    difficulty=keyword.get('difficulty', 50),
-                    cpc=keyword.get('cpc', 0.0),
-                    intent=self.cyrillic_processor.detect_keyword_intent_russian(keyword.get('keyword', '')),
-                    seasonality={},
-                    local_relevance=1.0,
-                    cyrillic_variations=self.cyrillic_processor.generate_url_variations(keyword.get('keyword', ''))
-                )
-            else:
-                enhanced_keyword = keyword
-
-            # Apply filters
-            if (enhanced_keyword.volume >= volume_min and
-                enhanced_keyword.difficulty <= difficulty_max):
-                enhanced_keywords.append(enhanced_keyword)
-
-        # Remove duplicates and sort by opportunity score
-        unique_keywords = self.deduplicate_keywords(enhanced_keywords)
-        sorted_keywords = sorted(unique_keywords,
-                               key=lambda k: self.calculate_opportunity_score(k),
-                               reverse=True)
-
-        print(f"✅ Final keyword list: {len(sorted_keywords)} keywords")
-        return sorted_keywords
-
-    def deduplicate_keywords(self, keywords: List[KeywordData]) -> List[KeywordData]:
-        """Remove duplicate keywords"""
-        seen = set()
-        unique = []
-
-        for keyword in keywords:
-            if keyword.keyword.lower() not in seen:
-                seen.add(keyword.keyword.lower())
-                unique.append(keyword)
-
-        return unique
-
-    def calculate_opportunity_score(self, keyword: KeywordData) -> float:
-        """Calculate opportunity score for keyword prioritization"""
-        # Normalize volume (0-1)
-        volume_score = min(keyword.volume / 100000, 1.0)
-
-        # Normalize difficulty (inverted, easier = better)
-        difficulty_score = (100 - keyword.difficulty) / 100
-
-        # Intent scoring
-        intent_scores = {
-            'transactional': 1.0,
-            'commercial': 0.8,
-            'informational': 0.6,
-            'navigational': 0.4
-        }
-        intent_score = intent_scores.get(keyword.intent, 0.5)
-
-        # Local relevance
-        relevance_score = keyword.local_relevance
-
-        # Weighted combination
-        opportunity_score = (
-            volume_score * 0.3 +
-            difficulty_score * 0.3 +
-            intent_score * 0.25 +
-            relevance_score * 0.15
-        )
-
-        return opportunity_score
-
-    async def analyze_keyword_gaps(self,
-                                  our_domain: str,
-                                  competitor_domains: List[str],
-                                  market: str = 'RU') -> Dict[str, Any]:
-        """Analyze keyword gaps against competitors"""
-        print(f"🔍 Analyzing keyword gaps for {our_domain} vs {len(competitor_domains)} competitors")
-
-        gap_analysis = {
-            'keyword_gaps': [],
-            'content_gaps': [],
-            'opportunity_keywords': [],
-            'competitor_strengths': {}
-        }
-
-        # Get our current keywords
-        our_keywords = set(kw.keyword for kw in self.current_strategy.get('keywords', []))
-
-        # Analyze each competitor
-        for competitor in competitor_domains:
-            if self.ahrefs.api_key:
-                competitor_keywords = await self.ahrefs.get_competitor_keywords(competitor, market)
-
-                # Find gaps
-                missing_keywords = []
-                for comp_kw in competitor_keywords:
-                    if comp_kw.keyword not in our_keywords:
-                        missing_keywords.append(comp_kw)
-
-                gap_analysis['keyword_gaps'].extend(missing_keywords)
-                gap_analysis['competitor_strengths'][competitor] = {
-                    'total_keywords': len(competitor_keywords),
-                    'high_value_keywords': [kw for kw in competitor_keywords if kw.volume > 10000],
-                    'ranking_strengths': await self.identify_ranking_strengths(competitor, competitor_keywords)
-                }
-
-        # Identify quick wins
-        gap_analysis['opportunity_keywords'] = self.identify_quick_wins(
-            gap_analysis['keyword_gaps']
-        )
-
-        print(f"✅ Found {len(gap_analysis['keyword_gaps'])} gap keywords")
-        return gap_analysis
-
-    def identify_quick_wins(self, gap_keywords: List[KeywordData]) -> List[KeywordData]:
-        """Identify quick win opportunities from gap analysis"""
-        quick_wins = []
-
-        for keyword in gap_keywords:
-            # Quick win criteria
-            if (keyword.volume > 1000 and
-                keyword.difficulty < 40 and
-                keyword.intent in ['commercial', 'transactional']):
-                quick_wins.append(keyword)
-
-        # Sort by opportunity score
-        quick_wins.sort(key=self.calculate_opportunity_score, reverse=True)
-
-        return quick_wins[:20]  # Top 20 quick wins
-
-    async def audit_technical_seo(self,
-                                 domain: str,
-                                 focus_areas: List[str] = None) -> Dict[str, Any]:
-        """Perform comprehensive technical SEO audit"""
-        if focus_areas is None:
-            focus_areas = [
-                'cyrillic_support',
-                'yandex_optimization',
-                'mobile_performance',
-                'schema_markup',
-                'page_speed_russia'
-            ]
-
-        print(f"🔧 Auditing technical SEO for {domain}")
-
-        audit_results = {}
-
-        for area in focus_areas:
-            if area == 'cyrillic_support':
-                audit_results[area] = await self.technical_auditor.check_cyrillic_rendering(f"https://{domain}")
-            elif area == 'yandex_optimization':
-                audit_results[area] = await self.technical_auditor.check_yandex_requirements(f"https://{domain}")
-            elif area == 'mobile_performance':
-                audit_results[area] = await self.technical_auditor.check_mobile_compliance(f"https://{domain}")
-            elif area == 'schema_markup':
-                audit_results[area] = await self.technical_auditor.check_schema_markup(f"https://{domain}")
-            elif area == 'page_speed_russia':
-                audit_results[area] = await self.technical_auditor.check_speed_from_russia(f"https://{domain}")
-
-        # Generate overall score
-        audit_results['overall_score'] = self.calculate_technical_score(audit_results)
-        audit_results['priority_fixes'] = self.prioritize_technical_fixes(audit_results)
-
-        print(f"✅ Technical audit complete. Score: {audit_results['overall_score']}/100")
-        return audit_results
-
-    def calculate_technical_score(self, audit_results: Dict[str, Any]) -> int:
-        """Calculate overall technical SEO score"""
-        scores = []
-
-        for area, result in audit_results.items():
-            if isinstance(result, dict) and 'status' in result:
-                if result['status'] == 'pass':
-                    scores.append(100)
-                elif result['status'] == 'warning':
-                    scores.append(70)
-                else:
-                    scores.append(30)
-
-        return int(sum(scores) / len(scores)) if scores else 0
-
-    def prioritize_technical_fixes(self, audit_results: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Prioritize technical fixes by impact and effort"""
-        fixes = []
-
-        priority_mapping = {
-            'cyrillic_support': {'impact': 'high', 'effort': 'low'},
-            'yandex_optimization': {'impact': 'high', 'effort': 'medium'},
-            'mobile_performance': {'impact': 'high', 'effort': 'medium'},
-            'page_speed_russia': {'impact': 'medium', 'effort': 'low'},
-            'schema_markup': {'impact': 'medium', 'effort': 'low'}
-        }
-
-        for area, result in audit_results.items():
-            if isinstance(result, dict) and result.get('status') == 'fail':
-                fix = {
-                    'area': area,
-                    'issues': result.get('issues', []),
-                    'recommendations': result.get('recommendations', []),
-                    'priority': self.calculate_fix_priority(
-                        priority_mapping.get(area, {'impact': 'medium', 'effort': 'medium'})
-                    )
-                }
-                fixes.append(fix)
-
-        # Sort by priority
-        fixes.sort(key=lambda x: x['priority'], reverse=True)
-        return fixes
-
-    def calculate_fix_priority(self, fix_data: Dict[str, str]) -> int:
-        """Calculate priority score for technical fixes"""
-        impact_scores = {'high': 3, 'medium': 2, 'low': 1}
-        effort_scores = {'low': 3, 'medium': 2, 'high': 1}  # Lower effort = higher score
-
-        impact = impact_scores.get(fix_data['impact'], 2)
-        effort = effort_scores.get(fix_data['effort'], 2)
-
-        return impact * effort
-
-    async def generate_strategy_update(self,
-                                     new_keywords: List[KeywordData],
-                                     gap_analysis: Dict[str, Any],
-                                     technical_audit: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate comprehensive strategy update recommendations"""
-        print("📋 Generating strategy update recommendations...")
-
-        update = {
-            'timestamp': datetime.now().isoformat(),
-            'summary': {
-                'new_keywords_found': len(new_keywords),
-                'keyword_gaps_identified': len(gap_analysis.get('keyword_gaps', [])),
-                'quick_wins_available': len(gap_analysis.get('opportunity_keywords', [])),
-                'technical_score': technical_audit.get('overall_score', 0),
-                'priority_fixes': len(technical_audit.get('priority_fixes', []))
-            },
-            'keyword_recommendations': {
-                'high_priority_additions': new_keywords[:10],
-                'quick_win_opportunities': gap_analysis.get('opportunity_keywords', [])[:5],
-                'content_gap_keywords': gap_analysis.get('content_gaps', [])[:5]
-            },
-            'technical_recommendations': {
-                'immediate_fixes': [fix for fix in technical_audit.get('priority_fixes', []) if fix['priority'] >= 6],
-                'medium_term_improvements': [fix for fix in technical_audit.get('priority_fixes', []) if 3 <= fix['priority'] < 6],
-                'long_term_optimizations': [fix for fix in technical_audit.get('priority_fixes', []) if fix['priority'] < 3]
-            },
-            'competitive_insights': {
-                'competitor_strengths': gap_analysis.get('competitor_strengths', {}),
-                'market_opportunities': self.identify_market_opportunities(gap_analysis)
-            },
-            'implementation_timeline': self.create_implementation_timeline(new_keywords, gap_analysis, technical_audit)
-        }
-
-        print("✅ Strategy update generated successfully")
-        return update
-
-    def identify_market_opportunities(self, gap_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Identify market opportunities from gap analysis"""
-        opportunities = []
-
-        # Analyze competitor weaknesses
-        competitor_strengths = gap_analysis.get('competitor_strengths', {})
-
-        for competitor, data in competitor_strengths.items():
-            high_value_keywords = data.get('high_value_keywords', [])
-
-            # Look for underutilized high-value keywords
-            underutilized = [kw for kw in high_value_keywords if kw.difficulty < 50]
-
-            if underutilized:
-                opportunities.append({
-                    'type': 'competitor_weakness',
-                    'competitor': competitor,
-                    'opportunity': f"Target {len(underutilized)} underutilized high-value keywords",
-                    'keywords': underutilized[:5],
-                    'estimated_impact': 'high'
-                })
-
-        return opportunities
-
-    def create_implementation_timeline(self,
-                                     new_keywords: List[KeywordData],
-                                     gap_analysis: Dict[str, Any],
-                                     technical_audit: Dict[str, Any]) -> Dict[str, List[str]]:
-        """Create implementation timeline for recommendations"""
-        timeline = {
-            'week_1': [],
-            'week_2-4': [],
-            'month_2-3': [],
-            'quarter_2': []
-        }
-
-        # Week 1: Critical technical fixes
-        immediate_fixes = technical_audit.get('priority_fixes', [])[:3]
-        for fix in immediate_fixes:
-            timeline['week_1'].append(f"Fix {fix['area']}: {fix['issues'][0] if fix['issues'] else 'General improvements'}")
-
-        # Week 2-4: Quick win keywords
-        quick_wins = gap_analysis.get('opportunity_keywords', [])[:5]
-        for kw in quick_wins:
-            timeline['week_2-4'].append(f"Target keyword: {kw.keyword}")
-
-        # Month 2-3: New high-priority keywords
-        high_priority = new_keywords[:10]
-        for kw in high_priority:
-            timeline['month_2-3'].append(f"Develop content for: {kw.keyword}")
-
-        # Quarter 2: Long-term technical improvements
-        long_term_fixes = technical_audit.get('priority_fixes', [])[3:]
-        for fix in long_term_fixes:
-            timeline['quarter_2'].append(f"Implement {fix['area']} improvements")
-
-        return timeline
-
-    async def save_analysis_results(self,
-                                   results: Dict[str, Any],
-                                   output_file: str = 'seo_analysis_results.json') -> str:
-        """Save analysis results to file"""
-        output_path = self.project_path / output_file
-
-        # Convert KeywordData objects to dictionaries for JSON serialization
-        serializable_results = self.make_serializable(results)
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(serializable_results, f, ensure_ascii=False, indent=2)
-
-        print(f"💾 Analysis results saved to {output_path}")
-        return str(output_path)
-
-    def make_serializable(self, obj: Any) -> Any:
-        """Convert objects to JSON-serializable format"""
-        if isinstance(obj, KeywordData):
-            return {
-                'keyword': obj.keyword,
-                'volume': obj.volume,
-                'difficulty': obj.difficulty,
-                'cpc': obj.cpc,
-                'intent': obj.intent,
-                'seasonality': obj.seasonality,
-                'local_relevance': obj.local_relevance,
-                'cyrillic_variations': obj.cyrillic_variations,
-                'current_ranking': obj.current_ranking,
-                'competition_level': obj.competition_level
-            }
-        elif isinstance(obj, CompetitorData):
-            return {
-                'domain': obj.domain,
-                'organic_keywords': obj.organic_keywords,
-                'organic_traffic': obj.organic_traffic,
-                'backlinks': obj.backlinks,
-                'domain_authority': obj.domain_authority,
-                'top_keywords': [self.make_serializable(kw) for kw in obj.top_keywords],
-                'content_gaps': obj.content_gaps
-            }
-        elif isinstance(obj, list):
-            return [self.make_serializable(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: self.make_serializable(value) for key, value in obj.items()}
-        else:
-            return obj
-
-
-class AhrefsRussianAnalyzer:
-    """Ahrefs API integration for Russian market analysis"""
-
-    def __init__(self, api_key: Optional[str]):
-        self.api_key = api_key
-        self.base_url = 'https://api.ahrefs.com/v2'
-
-    async def keyword_research(self, seeds: List[str], market: str = 'RU') -> List[KeywordData]:
-        """Research keywords using Ahrefs API"""
-        if not self.api_key:
-            print("⚠️ Ahrefs API key not available, using mock data")
-            return self.generate_mock_keywords(seeds)
-
-        # Actual Ahrefs API implementation would go here
-        # For now, return mock data
-        return self.generate_mock_keywords(seeds)
-
-    def generate_mock_keywords(self, seeds: List[str]) -> List[KeywordData]:
-        """Generate mock keyword data for demonstration"""
-        mock_keywords = []
-
-        for seed in seeds:
-            # Generate variations
-            variations = [
-                f"{seed} бесплатно",
-                f"{seed} скачать",
-                f"{seed} онлайн",
-                f"лучшие {seed}",
-                f"новые {seed}",
-                f"{seed} 2024",
-                f"{seed} отзывы",
-                f"{seed} рейтинг"
-            ]
-
-            for i, variation in enumerate(variations):
-                keyword = KeywordData(
-                    keyword=variation,
-                    volume=5000 - (i * 500),
-                    difficulty=30 + (i * 5),
-                    cpc=0.5 + (i * 0.1),
-                    intent='commercial' if 'скачать' in variation or 'лучшие' in variation else 'informational',
-                    seasonality={},
-                    local_relevance=0.9,
-                    cyrillic_variations=[]
-                )
-                mock_keywords.append(keyword)
-
-        return mock_keywords
-
-    async def get_competitor_keywords(self, domain: str, market: str = 'RU') -> List[KeywordData]:
-        """Get competitor keywords from Ahrefs"""
-        if not self.api_key:
-            return self.generate_mock_competitor_keywords(domain)
-
-        # Actual implementation would go here
-        return self.generate_mock_competitor_keywords(domain)
-
-    def generate_mock_competitor_keywords(self, domain: str) -> List[KeywordData]:
-        """Generate mock competitor keyword data"""
-        base_keywords = [
-            'телеграм игры',
-            'криптоигры',
-            'блокчейн игры',
-            'тапалки',
-            'заработок в играх',
-            'TON игры'
-        ]
-
-        keywords = []
-        for keyword in base_keywords:
-            kw_data = KeywordData(
-                keyword=keyword,
-                volume=10000 + hash(domain + keyword) % 20000,
-                difficulty=40 + hash(keyword) % 30,
-                cpc=0.3 + (hash(keyword) % 100) / 100,
-                intent='commercial',
-                seasonality={},
-                local_relevance=0.8,
-                cyrillic_variations=[]
-            )
-            keywords.append(kw_data)
-
-        return keywords
-
-
-class SemrushYandexAnalyzer:
-    """SEMrush API integration with focus on Yandex data"""
-
-    def __init__(self, api_key: Optional[str]):
-        self.api_key = api_key
-        self.base_url = 'https://api.semrush.com/'
-
-    async def analyze_yandex_factors(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze Yandex-specific ranking factors"""
-        # Mock implementation
-        return {
-            'yandex_factors': {
-                'behavioral_signals': 0.7,
-                'content_quality': 0.8,
-                'technical_optimization': 0.6,
-                'link_profile': 0.5
-            },
-            'recommendations': [
-                'Improve page loading speed for Russian users',
-                'Optimize for Yandex.Direct integration',
-                'Enhance mobile user experience'
-            ]
-        }
-
-
-class YandexWordstatConnector:
-    """Yandex Wordstat API connector"""
-
-    def __init__(self, token: Optional[str]):
-        self.token = token
-        self.base_url = 'https://api.direct.yandex.com/json/v5/keywordsresearch'
-
-    async def get_keyword_suggestions(self, seeds: List[str]) -> List[KeywordData]:
-        """Get keyword suggestions from Yandex Wordstat"""
-        if not self.token:
-            print("⚠️ Yandex Wordstat token not available, using mock data")
-            return self.generate_mock_yandex_keywords(seeds)
-
-        # Actual implementation would go here
-        return self.generate_mock_yandex_keywords(seeds)
-
-    def generate_mock_yandex_keywords(self, seeds: List[str]) -> List[KeywordData]:
-        """Generate mock Yandex keyword data"""
-        mock_keywords = []
-
-        yandex_specific_terms = [
-            'яндекс игры',
-            'игры браузер',
-            'онлайн игры россия',
-            'мобильные игры',
-            'игры без регистрации'
-        ]
-
-        for term in yandex_specific_terms:
-            keyword = KeywordData(
-                keyword=term,
-                volume=8000 + hash(term) % 15000,
-                difficulty=35 + hash(term) % 25,
-                cpc=0.4 + (hash(term) % 80) / 100,
-                intent='informational',
-                seasonality={},
-                local_relevance=1.0,
-                cyrillic_variations=[]
-            )
-            mock_keywords.append(keyword)
-
-        return mock_keywords
-
-
-class RussianTechnicalSEOAuditor:
-    """Technical SEO auditor for Russian websites"""
-
-    async def check_cyrillic_rendering(self, url: str) -> Dict[str, Any]:
-        """Check Cyrillic text rendering"""
-        return {
-            'status': 'pass',
-            'issues': [],
-            'recommendations': [
-                'Ensure UTF-8 encoding is properly declared',
-                'Test Cyrillic fonts across different devices',
-                'Validate HTML entities are not used for Cyrillic text'
-            ]
-        }
-
-    async def check_yandex_requirements(self, url: str) -> Dict[str, Any]:
-        """Check Yandex-specific requirements"""
-        return {
-            'status': 'warning',
-            'issues': [
-                'Missing Yandex.Metrica counter',
-                'Yandex.Webmaster verification not found'
-            ],
-            'recommendations': [
-                'Install Yandex.Metrica for better analytics',
-                'Add Yandex.Webmaster verification meta tag',
-                'Optimize for Yandex mobile ranking factors'
-            ]
-        }
-
-    async def check_mobile_compliance(self, url: str) -> Dict[str, Any]:
-        """Check mobile compliance"""
-        return {
-            'status': 'pass',
-            'issues': [],
-            'recommendations': [
-                'Test on popular Russian mobile devices',
-                'Optimize for slower mobile connections',
-                'Ensure touch targets are appropriately sized'
-            ]
-        }
-
-    async def check_schema_markup(self, url: str) -> Dict[str, Any]:
-        """Check schema markup implementation"""
-        return {
-            'status': 'fail',
-            'issues': [
-                'No VideoGame schema found',
-                'Missing Organization schema',
-                'No FAQ schema for common questions'
-            ],
-            'recommendations': [
-                'Implement VideoGame schema for game listings',
-                'Add Organization schema with Russian contact info',
-                'Create FAQ schema for common user questions'
-            ]
-        }
-
-    async def check_speed_from_russia(self, url: str) -> Dict[str, Any]:
-        """Check page speed from Russian locations"""
-        return {
-            'status': 'warning',
-            'issues': [
-                'Slow loading from Russian CDN locations',
-                'Large image files not optimized'
-            ],
-            'recommendations': [
-                'Implement Russian CDN endpoints',
-                'Optimize images for mobile connections',
-                'Enable browser caching for static assets'
-            ]
-        }
-
-
-class CyrillicSEOProcessor:
-    """Cyrillic text processing for SEO"""
-
-    def __init__(self):
-        self.transliteration_map = {
-            'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
-            'ж': 'zh', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
-            'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
-            'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'shch',
-            'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya'
-        }
-
-    def generate_url_variations(self, keyword: str) -> List[str]:
-        """Generate URL-friendly variations of Cyrillic keywords"""
-        variations = []
-
-        # Transliterated version
-        transliterated = self.transliterate(keyword)
-        variations.append(transliterated)
-
-        # Hyphenated version
-        hyphenated = keyword.replace(' ', '-').lower()
-        variations.append(hyphenated)
-
-        return variations
-
-    def transliterate(self, text: str) -> str:
-        """Transliterate Cyrillic text to Latin"""
-        result = ''
-        for char in text.lower():
-            result += self.transliteration_map.get(char, char)
-        return result
-
-    def detect_keyword_intent_russian(self, keyword: str) -> str:
-        """Detect search intent for Russian keywords"""
-        keyword_lower = keyword.lower()
-
-        if any(word in keyword_lower for word in ['купить', 'скачать', 'играть', 'регистрация', 'бесплатно']):
-            return 'transactional'
-        elif any(word in keyword_lower for word in ['лучшие', 'топ', 'сравнение', 'выбрать', 'рейтинг']):
-            return 'commercial'
-        elif any(word in keyword_lower for word in ['сайт', 'официальный', 'войти', 'логин']):
-            return 'navigational'
-        else:
-            return 'informational'
-
-
-class YandexOptimizer:
-    """Yandex-specific optimization recommendations"""
-
-    def optimize_title_for_yandex(self, title: str) -> Dict[str, Any]:
-        """Optimize title for Yandex requirements"""
-        recommendations = []
-
-        if len(title) > 60:
-            recommendations.append('Shorten title to 50-60 characters for Yandex')
-        elif len(title) < 30:
-            recommendations.append('Expand title to at least 30 characters')
-
-        if 'grabgifts' not in title.lower():
-            recommendations.append('Consider including brand name "GrabGifts"')
-
-        return {
-            'current_title': title,
-            'recommendations': recommendations,
-            'optimized_examples': [
-                'Телеграм Игры - Лучшие Криптоигры 2024 | GrabGifts',
-                'Бесплатные Игры в Телеграм с Выводом Денег | GrabGifts.ru'
-            ]
-        }
+import contextlib
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from seo_agent.keywords import (
+    AnalysisResultsWriter, CompactKeywordData, CompetitionLevel, CompetitorData, KeywordData, KeywordFrame,
+    KeywordGapIndex, KeywordIntent, KeywordStore, KeywordTableRef, LazyModule, NearDuplicateClusterer,
+    TopKeywords, TopicClusterer, compact_label, lazy_import, strip_russian_ending
+)
+from seo_agent.telemetry import Histogram, Instrumentation, NullSpan, ProfileCapture, Span, instrumented
+from seo_agent.providers import (
+    AhrefsRussianAnalyzer, ProviderConnector, ProviderThrottledError, RequestScheduler, ResponseCache,
+    SchedulerMetrics, SemrushYandexAnalyzer, SingleFlight, TokenBucket, TransportStats,
+    YandexWordstatConnector, parse_retry_after
+)
+from seo_agent.history import RunHistoryStore
+from seo_agent.cyrillic import CyrillicSEOProcessor, LRUCache, enrich_keyword_chunk
+from seo_agent.audit import (
+    AuditStateStore, HostPoliteness, PageDocument, PageSnapshot, PageStatusError,
+    RussianTechnicalSEOAuditor, SiteCrawler, YandexOptimizer
+)
+from seo_agent.analyst import RussianSEOAnalyst
+from seo_agent.jobs import JobQueue, JobWorker, run_job_pool, run_job_worker, run_jobs_command
+from seo_agent.daemon import AnalystDaemon, run_daemon
 
 
 # Example usage and demonstration
-async def main():
+async def main(args: Optional[argparse.Namespace] = None):
     """Demonstration of the Russian SEO Analyst agent"""
+    agent = RussianSEOAnalyst()
+    if args is not None and args.metrics_output:
+        agent.instrumentation.enabled = True
+        agent.config['instrumentation'].update(export_path=args.metrics_output, export_format=args.metrics_format)
+    if args is not None and args.fetch_pages:
+        agent.technical_auditor.fetch_pages = True
+
+    # Profiling covers the whole run, including initialization and shutdown
+    capture = contextlib.nullcontext()
+    if args is not None and args.profile:
+        capture = ProfileCapture(args.profile)
 
     # Initialize the agent
-    agent = RussianSEOAnalyst()
-    await agent.initialize()
+    with capture:
+        async with agent:
+            await run_demo(agent)
+
+
+async def run_demo(agent: RussianSEOAnalyst):
+    """Run the demonstration workflow against an initialized agent"""
 
     print("\n" + "="*60)
     print("🔍 RUSSIAN SEO ANALYSIS AGENT DEMONSTRATION")
@@ -978,8 +97,11 @@ async def main():
     print("-" * 30)
 
     technical_audit = await agent.audit_technical_seo('grabgifts.ru')
-    print(f"Technical SEO Score: {technical_audit['overall_score']}/100")
+    score = technical_audit['overall_score']
+    print(f"Technical SEO Score: {'n/a' if score is None else f'{score}/100'}")
     print(f"Priority fixes needed: {len(technical_audit['priority_fixes'])}")
+    if technical_audit['errors']:
+        print(f"Checks that could not run: {', '.join(error['area'] for error in technical_audit['errors'])}")
 
     # 4. Strategy Update Generation
     print("\n4. 📋 STRATEGY UPDATE GENERATION")
@@ -1009,11 +131,58 @@ async def main():
 
     output_file = await agent.save_analysis_results(results)
     print(f"Results saved to: {output_file}")
+    print(f"HTTP transport: {agent.transport_stats.as_dict()}")
+    print(f"Provider scheduling: {agent.provider_metrics()}")
+    if agent.response_cache is not None:
+        print(f"Response cache: {agent.response_cache.stats()}")
+    if agent.audit_state is not None:
+        print(f"Incremental audit: {agent.audit_state.stats()}")
+    if agent.history is not None:
+        print(f"Rank drops since last week: {await agent.history.arank_drops('grabgifts.ru')}")
+    print(f"Enrichment memo: {agent.cyrillic_processor.memo_stats()}")
 
     print("\n" + "="*60)
     print("✅ ANALYSIS COMPLETE!")
     print("="*60)
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line: the demonstration workflow (default), the resident API or the job queue"""
+    parser = argparse.ArgumentParser(description='Russian SEO analysis agent for GrabGifts.ru')
+    commands = parser.add_subparsers(dest='command')
+    demo = commands.add_parser('demo', help='Run the demonstration workflow')
+    demo.add_argument('--metrics-output', help='Enable instrumentation and write the metrics here on exit')
+    demo.add_argument('--metrics-format', choices=['prometheus', 'otlp'], default='prometheus')
+    demo.add_argument('--profile', metavar='DIR', help='Capture cProfile and tracemalloc reports for this run into DIR')
+    demo.add_argument('--fetch-pages', action='store_true', help='Download the audited pages instead of auditing offline')
+
+    serve = commands.add_parser('serve', help='Run the resident JSON API over a warm analyst')
+    serve.add_argument('--config', help='JSON config file (defaults come from the environment)')
+    serve.add_argument('--host', help='Listen address (default: daemon.host)')
+    serve.add_argument('--port', type=int, help='Listen port (default: daemon.port)')
+    serve.add_argument('--watch-interval', type=float, help='Seconds between strategy file change checks')
+
+    jobs = commands.add_parser('jobs', help='Queue analysis jobs and run the worker pool')
+    jobs.add_argument('--config', help='JSON config file (defaults come from the environment)')
+    job_actions = jobs.add_subparsers(dest='action', required=True)
+    submit = job_actions.add_parser('submit', help='Queue a job (identical queued or running jobs are reused)')
+    submit.add_argument('kind', choices=list(JobQueue.job_kinds))
+    submit.add_argument('--params', default='{}', help='Keyword arguments for the analyst method, as JSON')
+    submit.add_argument('--priority', type=int, default=0, help='Higher runs first')
+    work = job_actions.add_parser('work', help='Run worker processes against the queue')
+    work.add_argument('--workers', type=int, help='Worker processes (default: jobs.workers)')
+    work.add_argument('--drain', action='store_true', help='Exit once nothing is queued or running')
+    status = job_actions.add_parser('status', help='Queue counts, or one job with --id')
+    status.add_argument('--id', dest='job_id', type=int)
+
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.command == 'serve':
+        run_daemon(args)
+    elif args.command == 'jobs':
+        sys.exit(run_jobs_command(args))
+    else:
+        asyncio.run(main(args if args.command == 'demo' else None))
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Shared fixtures for the agent tests: a local static mirror of the site and isolated analysts
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from seo_agent.analyst import RussianSEOAnalyst
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+SITE = FIXTURES / 'site'
+
+REQUESTS = web.AppKey('requests', List[Tuple[str, str]])
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.xml': 'application/xml',
+    '.txt': 'text/plain'
+}
+
+
+def site_app(root: Path = SITE, redirects: Optional[Dict[str, str]] = None) -> web.Application:
+    """Static mirror of root with ETag validators and compression; requests are recorded as (path, If-None-Match)"""
+    app = web.Application()
+    app[REQUESTS] = []
+
+    async def serve(request: web.Request) -> web.Response:
+        app[REQUESTS].append((request.path_qs, request.headers.get('If-None-Match')))
+        if redirects and request.path in redirects:
+            raise web.HTTPFound(redirects[request.path])
+        path = root / request.path.lstrip('/')
+        if request.path.endswith('/'):
+            path = path / 'index.html'
+        if not path.is_file() or root.resolve() not in path.resolve().parents:
+            raise web.HTTPNotFound()
+
+        body = path.read_bytes()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        response = web.Response(body=body, headers={'ETag': etag,
+                                                    'Cache-Control': 'max-age=300',
+                                                    'Content-Type': CONTENT_TYPES.get(path.suffix, 'text/plain')})
+        response.enable_compression()
+        return response
+
+    app.router.add_get('/{tail:.*}', serve)
+    return app
+
+
+def requested_paths(app: web.Application) -> List[str]:
+    return [path for path, _ in app[REQUESTS]]
+
+
+def make_analyst(workdir: Path, **overrides: Any) -> RussianSEOAnalyst:
+    """An analyst whose stores live in workdir; caches, history and the enrichment memo are off"""
+    config: Dict[str, Any] = {
+        'ahrefs_api_key': None,
+        'semrush_api_key': None,
+        'yandex_token': None,
+        'cache': {'enabled': False},
+        'audit_state': {'enabled': False, 'path': str(workdir / 'audit_state.sqlite3')},
+        'history': {'enabled': False},
+        'results': {'output_dir': str(workdir)},
+        'enrichment': {'memo_path': None, 'workers': 1},
+        'crawl': {'workers': 4}
+    }
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key] = {**config[key], **value}
+        else:
+            config[key] = value
+
+    config_path = workdir / 'config.json'
+    config_path.write_text(json.dumps(config))
+    return RussianSEOAnalyst(str(config_path))
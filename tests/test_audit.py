@@ -0,0 +1,188 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+import aiohttp
+from aiohttp import test_utils
+
+from seo_agent.audit import PageSnapshot, PageStatusError, RussianTechnicalSEOAuditor, SiteCrawler
+
+from .helpers import REQUESTS, SITE, make_analyst, requested_paths, site_app
+
+AREAS = list(RussianTechnicalSEOAuditor.check_registry)
+
+
+class PageSnapshotFromFileTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.agent = make_analyst(Path(self.workdir.name))
+
+    async def asyncTearDown(self):
+        await self.agent.close()
+        self.workdir.cleanup()
+
+    async def test_local_page_is_parsed_and_audited_offline(self):
+        snapshot = PageSnapshot.from_file(SITE / 'index.html')
+
+        self.assertTrue(snapshot.local)
+        self.assertEqual(snapshot.status, 200)
+        self.assertEqual(snapshot.url, (SITE / 'index.html').resolve().as_uri())
+        self.assertEqual(snapshot.document.lang, 'ru')
+        self.assertEqual(snapshot.document.declared_charset(), 'utf-8')
+        self.assertIn('Телеграм Игры', snapshot.document.title)
+        self.assertEqual(snapshot.schema_types(), {'Organization', 'VideoGame', 'FAQPage'})
+        self.assertIn('/games.html', snapshot.document.anchors)
+
+        results = await self.agent.audit_page(snapshot)
+        self.assertEqual({area: results[area]['status'] for area in AREAS}, dict.fromkeys(AREAS, 'pass'))
+        self.assertEqual(results['overall_score'], 100)
+        self.assertEqual(results['errors'], [])
+
+    async def test_meta_charset_decides_the_encoding(self):
+        path = Path(self.workdir.name) / 'legacy.html'
+        path.write_bytes('<html><head><meta charset="windows-1251"></head><body>Привет</body></html>'.encode('cp1251'))
+        snapshot = PageSnapshot.from_file(path, url='https://grabgifts.ru/legacy.html')
+
+        self.assertEqual(snapshot.url, 'https://grabgifts.ru/legacy.html')
+        self.assertEqual(snapshot.encoding, 'windows-1251')
+        self.assertIn('Привет', snapshot.text)
+
+        result = await self.agent.technical_auditor.check_cyrillic_rendering(snapshot.url, snapshot)
+        self.assertEqual(result['status'], 'fail')
+        self.assertIn('Page declares windows-1251 instead of UTF-8', result['issues'])
+        self.assertIn('Russian content without lang="ru" on <html>', result['issues'])
+
+    async def test_offline_audits_never_open_the_state_store(self):
+        workdir = Path(self.workdir.name) / 'offline'
+        workdir.mkdir()
+        async with make_analyst(workdir, audit_state={'enabled': True}) as agent:
+            await agent.audit_page(PageSnapshot.from_file(SITE / 'index.html'))
+            await agent.run_page_checks('https://grabgifts.ru/', AREAS, None, {})
+
+        self.assertFalse((workdir / 'audit_state.sqlite3').exists())
+
+
+class PageFetchTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.app = site_app()
+        self.server = test_utils.TestServer(self.app)
+        await self.server.start_server()
+        self.origin = str(self.server.make_url('')).rstrip('/')
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.workdir.cleanup()
+
+    async def test_error_status_is_reported_not_audited(self):
+        agent = make_analyst(Path(self.workdir.name), audit_fetch_pages=True)
+        async with agent:
+            with self.assertRaises(PageStatusError) as raised:
+                await agent.technical_auditor.get_snapshot(f"{self.origin}/missing.html", {})
+            self.assertEqual(raised.exception.status, 404)
+
+            results = await agent.run_page_checks(f"{self.origin}/missing.html", AREAS, None, {})
+        self.assertTrue(all(result['status'] == 'error' for result in results.values()))
+        self.assertIsNone(agent.calculate_technical_score(results))
+
+
+class SiteCrawlTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.app = site_app(redirects={'/home': '/'})
+        self.server = test_utils.TestServer(self.app)
+        await self.server.start_server()
+        self.origin = str(self.server.make_url('')).rstrip('/')
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.workdir.cleanup()
+
+    def analyst(self, **overrides):
+        return make_analyst(Path(self.workdir.name), **overrides)
+
+    async def audit_mirror(self, agent):
+        return await agent.audit_site(f"{self.origin}/", mirror_of='https://grabgifts.ru')
+
+    async def test_crawl_follows_sitemaps_and_links_and_obeys_robots(self):
+        async with self.analyst() as agent:
+            site = await self.audit_mirror(agent)
+
+        # Sitemap URLs on the mirrored origin are rebased onto the local server
+        self.assertEqual(set(site['pages']), {f"{self.origin}/", f"{self.origin}/games.html", f"{self.origin}/blog/"})
+        paths = requested_paths(self.app)
+        self.assertEqual(paths[0], '/robots.txt')
+        self.assertIn('/sitemap.xml', paths)
+        self.assertIn('/sitemap-pages.xml', paths)
+        self.assertNotIn('/private/admin.html', paths)
+        # Every page is fetched once, however many sitemaps and links point at it
+        self.assertEqual(paths.count('/'), 1)
+        self.assertEqual(paths.count('/games.html'), 1)
+
+        stats = site['crawl_stats']
+        self.assertEqual(stats['audited'], 3)
+        self.assertGreaterEqual(stats['disallowed'], 1)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(site['pages'][f"{self.origin}/"]['overall_score'], 100)
+        self.assertEqual(site['errors'], {})
+
+    async def test_page_that_raises_is_reported_and_the_crawl_finishes(self):
+        async def audit_page(snapshot):
+            if snapshot.url.endswith('/games.html'):
+                raise ValueError('broken check')
+            return {'overall_score': 100}
+
+        async with aiohttp.ClientSession() as session:
+            crawler = SiteCrawler(session, workers=2, mirror_of='https://grabgifts.ru')
+            pages = dict(await asyncio.wait_for(self.collect(crawler.crawl(f"{self.origin}/", audit_page)), 5))
+
+        self.assertEqual(pages[f"{self.origin}/games.html"], {'error': 'ValueError: broken check'})
+        self.assertEqual(pages[f"{self.origin}/"], {'overall_score': 100})
+        self.assertEqual(pages[f"{self.origin}/blog/"], {'overall_score': 100})
+        self.assertEqual(crawler.stats['errors'], 1)
+        self.assertEqual(crawler.stats['audited'], 2)
+
+    @staticmethod
+    async def collect(results):
+        return [item async for item in results]
+
+    async def test_unchanged_pages_reuse_stored_results_on_revisit(self):
+        overrides = {'audit_state': {'enabled': True}}
+        async with self.analyst(**overrides) as agent:
+            first = await self.audit_mirror(agent)
+        self.app[REQUESTS].clear()
+
+        async with self.analyst(**overrides) as agent:
+            second = await self.audit_mirror(agent)
+            state = agent.audit_state.stats()
+
+        # Every page was requested conditionally and answered 304
+        page_requests = [(path, etag) for path, etag in self.app[REQUESTS] if path.endswith(('/', '.html'))]
+        self.assertEqual(len(page_requests), 3)
+        self.assertTrue(all(etag for _, etag in page_requests))
+        self.assertEqual(second['crawl_stats']['unchanged'], 3)
+        self.assertEqual(state['reused'], 3)
+        self.assertEqual(state['audited'], 0)
+        # Links recorded on the first visit still reach pages found only through links
+        self.assertEqual(set(second['pages']), set(first['pages']))
+        self.assertEqual(second['pages'], first['pages'])
+
+    async def test_redirected_pages_send_validators_on_revisit(self):
+        overrides = {'audit_state': {'enabled': True}}
+        for _ in range(2):
+            self.app[REQUESTS].clear()
+            async with self.analyst(**overrides) as agent:
+                site = await agent.audit_site(f"{self.origin}/home", mirror_of='https://grabgifts.ru')
+
+        self.assertIn(f"{self.origin}/home", site['pages'])
+        home = [etag for path, etag in self.app[REQUESTS] if path == '/home']
+        self.assertEqual(len(home), 1)
+        self.assertIsNotNone(home[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from seo_agent.cyrillic import CyrillicSEOProcessor
+from seo_agent.keywords import KeywordData, NearDuplicateClusterer, TopicClusterer
+
+from .helpers import make_analyst
+
+TOPICS = [
+    ['телеграм игры', 'игры в телеграм', 'лучшие телеграм игры', 'новые телеграм игры', 'телеграм игры онлайн',
+     'бесплатные телеграм игры'],
+    ['купить биткоин', 'курс биткоин', 'биткоин кошелек', 'биткоин сегодня', 'майнинг биткоин', 'биткоин прогноз'],
+    ['хамстер комбат', 'хамстер комбат коды', 'комбо хамстер', 'хамстер шифр', 'хамстер карточки', 'хамстер листинг']
+]
+
+
+class NearDuplicateClustererTests(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = CyrillicSEOProcessor()
+
+    def test_every_pair_in_a_bucket_is_a_candidate(self):
+        clusterer = NearDuplicateClusterer(self.processor, num_perm=4, bands=1)
+        signatures = np.array([[1, 2, 3, 4], [9, 9, 9, 9], [1, 2, 3, 4], [1, 2, 3, 4], [5, 6, 7, 8]],
+                              dtype=np.uint32)
+
+        left, right = clusterer.candidate_pairs(signatures)
+        self.assertEqual(sorted(zip(left.tolist(), right.tolist())), [(0, 2), (0, 3), (2, 3)])
+
+    def test_pairs_from_several_bands_are_merged(self):
+        clusterer = NearDuplicateClusterer(self.processor, num_perm=4, bands=2)
+        signatures = np.array([[1, 1, 7, 7], [1, 1, 8, 8], [2, 2, 8, 8]], dtype=np.uint32)
+
+        left, right = clusterer.candidate_pairs(signatures)
+        self.assertEqual(sorted(zip(left.tolist(), right.tolist())), [(0, 1), (1, 2)])
+
+    def test_keyword_variants_share_a_label(self):
+        keywords = ['телеграм игры', 'Игры телеграм', 'телеграм игры 2025', 'telegram igry', 'телеграмм игры',
+                    'топ 10 игр', 'топ 20 игр', 'хамстер комбат']
+        labels = NearDuplicateClusterer(self.processor).labels(keywords).tolist()
+
+        # Word order, case, years, transliteration and a doubled letter collapse; other numbers keep keywords apart
+        self.assertEqual(labels, [0, 0, 0, 0, 0, 5, 6, 7])
+        self.assertEqual(NearDuplicateClusterer(self.processor).labels(['игры']).tolist(), [0])
+
+    def test_shingles_wider_than_a_packed_uint64_are_rejected(self):
+        with self.assertRaises(ValueError):
+            NearDuplicateClusterer(self.processor, shingle_size=4)
+        with self.assertRaises(ValueError):
+            NearDuplicateClusterer(self.processor, shingle_size=0)
+
+
+class TopicClustererTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.processor = CyrillicSEOProcessor()
+        self.keywords = [keyword for topic in TOPICS for keyword in topic]
+
+    def test_separate_topics_never_share_a_cluster(self):
+        # Keywords within a topic share one term at most, so a poor seeding cannot be repaired by the updates
+        for seed in range(1, 31):
+            with self.subTest(seed=seed):
+                labels = TopicClusterer(self.processor, n_clusters=3, seed=seed).fit_predict(self.keywords)[0]
+                groups = [set(labels[n * 6:n * 6 + 6].tolist()) for n in range(3)]
+                self.assertEqual([len(group) for group in groups], [1, 1, 1])
+                self.assertEqual(len(set.union(*groups)), 3)
+
+    def test_clusters_are_named_after_a_member_in_first_appearance_order(self):
+        clusters = TopicClusterer(self.processor).cluster(self.keywords + ['???'])
+
+        self.assertEqual(list(clusters.values()), TOPICS + [['???']])
+        self.assertEqual(list(clusters)[-1], TopicClusterer.other_cluster)
+        for name, members in clusters.items():
+            self.assertTrue(name in members or name == TopicClusterer.other_cluster)
+
+    def test_rows_sharing_no_term_with_a_centroid_are_left_out(self):
+        labels, similarity = TopicClusterer(self.processor, n_clusters=1).fit_predict(['телеграм игры', 'хамстер'])
+        # Whichever keyword seeds the single cluster, the other one is not forced into it
+        self.assertEqual(sorted(labels.tolist()), [-1, 0])
+        self.assertEqual(similarity[labels == -1].tolist(), [0])
+
+    async def test_analyst_clusters_keyword_data_when_enabled(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            disabled = make_analyst(Path(workdir))
+            self.assertEqual(await disabled.cluster_keywords(self.keywords), {})
+
+            agent = make_analyst(Path(workdir), topic_clusters={'enabled': True, 'n_clusters': 3})
+            keywords = [KeywordData(keyword, 1000, 30, 1.0, 'informational', {}, 1.0, []) for keyword in self.keywords]
+            clusters = await agent.cluster_keywords(keywords)
+
+        self.assertEqual([[kw.keyword for kw in members] for members in clusters.values()], TOPICS)
+
+
+if __name__ == '__main__':
+    unittest.main()
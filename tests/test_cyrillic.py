@@ -0,0 +1,119 @@
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from seo_agent.cyrillic import CyrillicSEOProcessor
+
+KEYWORDS = [
+    'Телеграм игры', 'купить игры ТОН', 'лучшие тапалки 2025', 'официальный сайт хамстер',
+    'Ёжик в тумане', 'щедрые бонусы', 'crypto игры онлайн', 'Скачать бесплатно', 'рейтинг топ игр',
+    'войти в аккаунт', 'объявления', 'телеграм игры'
+] * 3
+
+
+def reference_transliterate(processor: CyrillicSEOProcessor, text: str) -> str:
+    """Character-by-character transliteration, as it was done before the translate table"""
+    result = ''
+    for char in text.lower():
+        result += processor.transliteration_map.get(char, char)
+    return result
+
+
+def reference_intent(keyword: str) -> str:
+    """The original substring scans, one vocabulary at a time"""
+    keyword_lower = keyword.lower()
+    if any(word in keyword_lower for word in ['купить', 'скачать', 'играть', 'регистрация', 'бесплатно']):
+        return 'transactional'
+    elif any(word in keyword_lower for word in ['лучшие', 'топ', 'сравнение', 'выбрать', 'рейтинг']):
+        return 'commercial'
+    elif any(word in keyword_lower for word in ['сайт', 'официальный', 'войти', 'логин']):
+        return 'navigational'
+    return 'informational'
+
+
+class BatchEnrichmentTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.processor = CyrillicSEOProcessor()
+        self.expected = [
+            (reference_intent(keyword),
+             [reference_transliterate(self.processor, keyword), keyword.replace(' ', '-').lower()])
+            for keyword in KEYWORDS
+        ]
+
+    def test_batch_matches_the_per_keyword_rules(self):
+        self.assertEqual(self.processor.enrich_batch(KEYWORDS), self.expected)
+        self.assertEqual(self.processor.transliterate('Ёжик'), 'yozhik')
+
+    async def test_process_pool_chunks_match_inline_enrichment(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            enriched = await self.processor.enrich_batch_async(KEYWORDS, executor, chunk_size=4, inline_threshold=0)
+
+        self.assertEqual(enriched, self.expected)
+        # Worker results are memoized in the parent, once per distinct keyword
+        self.assertEqual(len(self.processor.memo), len(set(KEYWORDS)))
+
+    async def test_large_batch_without_a_pool_runs_off_the_loop(self):
+        enriched = await self.processor.enrich_batch_async(KEYWORDS, None, inline_threshold=0)
+        self.assertEqual(enriched, self.expected)
+
+
+class EnrichmentMemoTests(unittest.TestCase):
+
+    def test_repeated_keywords_are_served_from_the_memo(self):
+        processor = CyrillicSEOProcessor()
+        first = processor.enrich_batch(KEYWORDS)
+        self.assertEqual(processor.enrich_batch(KEYWORDS), first)
+
+        stats = processor.memo_stats()
+        self.assertEqual(stats['misses'], len(set(KEYWORDS)))
+        self.assertEqual(stats['hits'], 2 * len(KEYWORDS) - len(set(KEYWORDS)))
+        self.assertEqual(stats['size'], len(set(KEYWORDS)))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        processor = CyrillicSEOProcessor(memo_size=2)
+        for keyword in ('игры', 'тапалки', 'игры', 'хамстер'):
+            processor.enrich_keyword(keyword)
+
+        self.assertEqual([keyword for keyword, _ in processor.memo.items()], ['игры', 'хамстер'])
+        self.assertEqual(processor.memo_stats()['evictions'], 1)
+
+    def test_changing_the_rules_invalidates_memoized_results(self):
+        processor = CyrillicSEOProcessor()
+        self.assertEqual(processor.generate_url_variations('игры'), ['igry', 'игры'])
+        self.assertEqual(processor.detect_keyword_intent_russian('игры онлайн'), 'informational')
+
+        processor.transliteration_map = {**processor.transliteration_map, 'ы': 'i'}
+        self.assertEqual(processor.generate_url_variations('игры'), ['igri', 'игры'])
+
+        processor.intent_vocabulary = {**processor.intent_vocabulary, 'transactional': ['онлайн']}
+        self.assertEqual(processor.detect_keyword_intent_russian('игры онлайн'), 'transactional')
+
+    def test_results_computed_under_old_rules_are_not_stored(self):
+        processor = CyrillicSEOProcessor()
+        generation = processor.memo.generation
+        processor.configure(transliteration_map={'и': 'ee'})
+
+        processor.memo.put('игры', ('informational', 'igry', 'игры'), generation)
+        self.assertEqual(processor.enrich_keyword('игры')[1], 'eeгры')
+
+    def test_persisted_memo_is_only_loaded_under_the_same_rules(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = Path(workdir) / 'memo.json'
+            saved = CyrillicSEOProcessor()
+            saved.enrich_batch(KEYWORDS)
+            saved.save_memo(path)
+
+            warm = CyrillicSEOProcessor()
+            self.assertEqual(warm.load_memo(path), len(set(KEYWORDS)))
+            self.assertEqual(warm.enrich_batch(KEYWORDS), saved.enrich_batch(KEYWORDS))
+            self.assertEqual(warm.memo_stats()['misses'], 0)
+
+            reconfigured = CyrillicSEOProcessor(intent_vocabulary={'commercial': ['игры']})
+            self.assertEqual(reconfigured.load_memo(path), 0)
+            self.assertEqual(reconfigured.load_memo(Path(workdir) / 'missing.json'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import test_utils, web
+
+from seo_agent.daemon import AnalystDaemon
+
+from .helpers import make_analyst
+
+STRATEGY = """# Стратегия
+
+### Telegram игры
+| Запрос | Сложность | Частотность |
+|---|---|---|
+| телеграм игры | 20 | 12000 |
+| игры в телеграм | 35 | 8000 |
+"""
+
+
+class AnalystDaemonTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        workdir = Path(self.workdir.name)
+
+        async def matching_terms(request: web.Request) -> web.Response:
+            return web.json_response({'keywords': [{'keyword': 'телеграм игры онлайн', 'volume': 5000,
+                                                    'difficulty': 20}], 'total': 1})
+
+        provider = web.Application()
+        provider.router.add_get('/v3/keywords-explorer/matching-terms', matching_terms)
+        self.provider = test_utils.TestServer(provider)
+        await self.provider.start_server()
+
+        self.agent = make_analyst(workdir,
+                                  ahrefs_api_key='test-key',
+                                  ahrefs_base_url=str(self.provider.make_url('/v3')),
+                                  instrumentation={'enabled': True},
+                                  jobs={'path': str(workdir / 'jobs.sqlite3')})
+        self.agent.strategy_file = workdir / 'strategy.md'
+        self.agent.competitor_file = workdir / 'competitors.md'
+        self.agent.strategy_file.write_text(STRATEGY, encoding='utf-8')
+
+        self.client = test_utils.TestClient(test_utils.TestServer(
+            AnalystDaemon(self.agent, watch_interval=0.05).create_app()))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.provider.close()
+        self.workdir.cleanup()
+
+    async def get_json(self, path: str, status: int = 200):
+        response = await self.client.get(path)
+        self.assertEqual(response.status, status)
+        return await response.json()
+
+    async def post_json(self, path: str, payload=None, status: int = 200, **kwargs):
+        response = await self.client.post(path, json=payload, **kwargs)
+        self.assertEqual(response.status, status)
+        return await response.json()
+
+    async def test_strategy_is_loaded_at_startup_and_reloaded_on_change(self):
+        health = await self.get_json('/health')
+        self.assertEqual((health['status'], health['strategy_keywords'], health['competitors']), ('ok', 2, 0))
+        self.assertEqual((await self.get_json('/strategy'))['clusters'], {'Telegram игры': 2})
+
+        self.agent.strategy_file.write_text(STRATEGY + '| тапалки | 10 | 20000 |\n', encoding='utf-8')
+        for _ in range(200):
+            if (await self.get_json('/health'))['strategy_keywords'] == 3:
+                break
+            await asyncio.sleep(0.02)
+        self.assertEqual((await self.get_json('/strategy'))['clusters'], {'Telegram игры': 3})
+
+    async def test_research_returns_serialized_keywords(self):
+        result = await self.post_json('/research', {'seeds': ['телеграм игры']})
+        self.assertEqual([kw['keyword'] for kw in result['keywords']], ['телеграм игры онлайн'])
+        self.assertEqual(result['keywords'][0]['volume'], 5000)
+
+    async def test_bad_requests_get_json_errors(self):
+        self.assertEqual(await self.post_json('/research', {}, status=400), {'error': 'Missing fields: seeds'})
+        self.assertEqual(await self.post_json('/research', ['игры'], status=400), {'error': 'Expected a JSON object'})
+        invalid = await self.post_json('/gaps', data='{', headers={'Content-Type': 'application/json'}, status=400)
+        self.assertTrue(invalid['error'].startswith('Invalid JSON'))
+        self.assertEqual(await self.post_json('/audit', {}, status=400),
+                         {'error': 'Missing fields: domain or start_url'})
+
+    async def test_handler_exceptions_become_500_responses(self):
+        async def research_keywords(*args, **kwargs):
+            raise RuntimeError('provider down')
+
+        self.agent.research_keywords = research_keywords
+        self.assertEqual(await self.post_json('/research', {'seeds': ['игры']}, status=500),
+                         {'error': 'RuntimeError: provider down'})
+        self.assertEqual((await self.get_json('/health'))['status'], 'ok')
+
+    async def test_jobs_are_queued_once_and_reported(self):
+        params = {'domain': 'grabgifts.ru'}
+        first = await self.post_json('/jobs', {'kind': 'audit', 'params': params}, status=201)
+        again = await self.post_json('/jobs', {'kind': 'audit', 'params': params, 'priority': 5})
+        self.assertEqual((first['created'], again), (True, {'id': first['id'], 'created': False}))
+
+        job = await self.get_json(f"/jobs/{first['id']}")
+        self.assertEqual((job['kind'], job['params'], job['status'], job['priority']), ('audit', params, 'queued', 5))
+        self.assertEqual(await self.get_json('/jobs'), {'queued': 1, 'running': 0, 'done': 0, 'failed': 0})
+        self.assertEqual(await self.get_json('/jobs/999', status=404), {'error': 'No such job'})
+
+        unknown = await self.post_json('/jobs', {'kind': 'backlinks'}, status=400)
+        self.assertTrue(unknown['error'].startswith('Unknown job kind: backlinks'))
+        invalid = await self.post_json('/jobs', {'kind': 'audit', 'params': {'url': 'x'}}, status=400)
+        self.assertTrue(invalid['error'].startswith('Invalid parameters for audit job'))
+
+    async def test_metrics_in_both_formats(self):
+        await self.post_json('/research', {'seeds': ['телеграм игры']})
+
+        response = await self.client.get('/metrics')
+        self.assertEqual(response.content_type, 'text/plain')
+        text = await response.text()
+        self.assertIn('seo_project_file_loads_total{file="strategy.md"} 1', text)
+        self.assertIn('seo_keywords_out_total{stage="research_keywords"} 1', text)
+
+        otlp = await self.get_json('/metrics?format=otlp')
+        spans = otlp['resourceSpans'][0]['scopeSpans'][0]['spans']
+        self.assertIn('research_keywords', [span['name'] for span in spans])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from seo_agent.cyrillic import CyrillicSEOProcessor
+from seo_agent.keywords import KeywordGapIndex
+
+
+class KeywordGapIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = KeywordGapIndex(CyrillicSEOProcessor().normalize_keyword)
+        self.index.add_domain('grabgifts.ru', ['Елка купить', 'тапалки'])
+        self.index.add_domain('rival.ru', ['ёлка купить!', 'ТАПАЛКА', 'игры телеграм', 'хамстер'])
+        self.index.add_domain('other.ru', ['Игры, Телеграм', 'хамстер', 'крипто игры'])
+
+    def test_spelling_variants_of_our_keywords_are_not_gaps(self):
+        gaps = self.index.gaps(['grabgifts.ru'])
+        # ё/е, case, punctuation and inflection all collapse to one key; the first spelling seen is kept
+        self.assertEqual(gaps, ['игры телеграм', 'хамстер', 'крипто игры'])
+        self.assertEqual(self.index.domains_for('ЁЛКА КУПИТЬ'), ['grabgifts.ru', 'rival.ru'])
+        self.assertEqual(len(self.index), 5)
+
+    def test_min_count_keeps_keywords_shared_by_enough_competitors(self):
+        self.assertEqual(self.index.gaps(['grabgifts.ru'], min_count=2), ['игры телеграм', 'хамстер'])
+        self.assertEqual(self.index.gaps(['grabgifts.ru'], ['rival.ru'], min_count=1), ['игры телеграм', 'хамстер'])
+        self.assertEqual(self.index.gaps(['grabgifts.ru'], min_count=3), [])
+
+    def test_overlap_and_ranked_by(self):
+        self.assertEqual(self.index.overlap(['grabgifts.ru', 'rival.ru']), ['Елка купить', 'тапалки'])
+        self.assertEqual(self.index.ranked_by(2), ['Елка купить', 'тапалки', 'игры телеграм', 'хамстер'])
+
+    def test_re_adding_a_domain_reuses_its_bit(self):
+        self.assertEqual(self.index.add_domain('grabgifts.ru', ['хамстер']), 0)
+        self.assertEqual(self.index.gaps(['grabgifts.ru']), ['игры телеграм', 'крипто игры'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from aiohttp import test_utils, web
+
+from seo_agent.history import RunHistoryStore
+from seo_agent.keywords import KeywordData
+
+from .helpers import make_analyst
+
+DAY = 86400
+
+
+def ranked(keyword: str, ranking: int, volume: int = 1000) -> KeywordData:
+    return KeywordData(keyword=keyword, volume=volume, difficulty=30, cpc=1.0, intent='commercial',
+                       seasonality={}, local_relevance=1.0, cyrillic_variations=[], current_ranking=ranking)
+
+
+class RunHistoryStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.store = RunHistoryStore(Path(self.workdir.name) / 'history.sqlite3')
+        self.now = time.time()
+
+    def tearDown(self):
+        self.store.close()
+        self.workdir.cleanup()
+
+    def record(self, days_ago: float, keywords_by_domain):
+        self.store.record_run('research', keywords_by_domain, market='ru', observed_at=self.now - days_ago * DAY)
+
+    def test_volume_history_has_one_point_per_run_in_the_window(self):
+        self.record(100, {'grabgifts.ru': [ranked('тапалки', 5, volume=400)]})
+        self.record(60, {'grabgifts.ru': [ranked('тапалки', 5, volume=1000)],
+                         'rival.ru': [ranked('тапалки', 2, volume=1200)]})
+        self.record(10, {'grabgifts.ru': [ranked('тапалки', 5, volume=1500), ranked('игры', 1)]})
+
+        history = self.store.volume_history('тапалки', days=90, now=self.now)
+        self.assertEqual([volume for _, volume in history], [1200, 1500])
+        self.assertEqual([observed_at for observed_at, _ in history], [self.now - 60 * DAY, self.now - 10 * DAY])
+        self.assertEqual(self.store.volume_history('нет такого', now=self.now), [])
+
+    def test_volume_delta_compares_the_first_and_latest_observation(self):
+        self.record(100, {'grabgifts.ru': [ranked('тапалки', 5, volume=400)]})
+        self.record(60, {'grabgifts.ru': [ranked('тапалки', 5, volume=1000)]})
+        self.record(10, {'grabgifts.ru': [ranked('тапалки', 5, volume=1500)]})
+        self.record(30, {'grabgifts.ru': [ranked('игры', 5, volume=0)]})
+        self.record(20, {'grabgifts.ru': [ranked('игры', 5, volume=300)]})
+
+        delta = self.store.volume_delta('тапалки', days=90, now=self.now)
+        self.assertEqual((delta['volume_from'], delta['volume_to'], delta['delta'], delta['delta_pct']),
+                         (1000, 1500, 500, 50.0))
+        self.assertLess(delta['from'], delta['to'])
+        self.assertIsNone(self.store.volume_delta('игры', now=self.now)['delta_pct'])
+        self.assertIsNone(self.store.volume_delta('нет такого', now=self.now))
+
+    def test_rank_drops_compare_the_latest_rank_in_each_period(self):
+        self.record(20, {'grabgifts.ru': [ranked('старое', 1)]})
+        self.record(10, {'grabgifts.ru': [ranked('тапалки', 3), ranked('игры', 10), ranked('хамстер', 20)],
+                         'rival.ru': [ranked('тапалки', 1)]})
+        self.record(9, {'grabgifts.ru': [ranked('тапалки', 4), ranked('старое', None)]})
+        self.record(2, {'grabgifts.ru': [ranked('тапалки', 20), ranked('игры', 15), ranked('старое', 50)],
+                        'rival.ru': [ranked('тапалки', 40)]})
+        self.record(1, {'grabgifts.ru': [ranked('тапалки', 15), ranked('хамстер', 8), ranked('крипто', 90)]})
+
+        # игры fell by exactly min_drop, хамстер improved, старое has no baseline in the previous week
+        self.assertEqual(self.store.rank_drops('grabgifts.ru', days=7, min_drop=5, now=self.now), [
+            {'keyword': 'тапалки', 'previous_ranking': 4, 'current_ranking': 15, 'drop': 11}
+        ])
+        self.assertEqual([drop['keyword'] for drop in self.store.rank_drops('grabgifts.ru', min_drop=4, now=self.now)],
+                         ['тапалки', 'игры'])
+        self.assertEqual(self.store.rank_drops('rival.ru', now=self.now)[0]['drop'], 39)
+
+
+class GapHistoryTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.positions = {'grabgifts.ru': 12, 'rival.ru': 3}
+        app = web.Application()
+
+        async def organic_keywords(request: web.Request) -> web.Response:
+            position = self.positions[request.query['target']]
+            return web.json_response({'keywords': [{'keyword': 'тапалки', 'volume': 20000, 'best_position': position}]})
+
+        app.router.add_get('/v3/site-explorer/organic-keywords', organic_keywords)
+        self.server = test_utils.TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.workdir.cleanup()
+
+    async def test_own_rankings_are_recorded_whenever_history_is_on(self):
+        agent = make_analyst(Path(self.workdir.name),
+                             ahrefs_api_key='test-key',
+                             ahrefs_base_url=str(self.server.make_url('/v3')),
+                             history={'enabled': True, 'path': str(Path(self.workdir.name) / 'history.sqlite3')},
+                             gap_include_own_rankings=False)
+        agent.current_strategy = {'keywords': []}
+        async with agent:
+            agent.history.record_run('gap_analysis', {'grabgifts.ru': [ranked('тапалки', 2)]},
+                                     observed_at=time.time() - 8 * DAY)
+            gaps = await agent.analyze_keyword_gaps('grabgifts.ru', ['rival.ru'])
+            drops = await agent.history.arank_drops('grabgifts.ru')
+
+        # Without gap_include_own_rankings our rankings are recorded but do not hide gaps
+        self.assertEqual([gap.keyword for gap in gaps['keyword_gaps']], ['тапалки'])
+        self.assertEqual(drops, [{'keyword': 'тапалки', 'previous_ranking': 2, 'current_ranking': 12, 'drop': 10}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from seo_agent.jobs import JobQueue, JobWorker, run_jobs_command
+
+from .helpers import make_analyst
+
+
+class LeaseLosingWorker(JobWorker):
+    """Runs the job, but another worker takes it over and finishes it first"""
+
+    async def run_job(self, job):
+        result_path = await super().run_job(job)
+        self.queue.release(job['id'], self.name)
+        self.queue.claim('other-worker')
+        self.queue.complete(job['id'], 'other-worker', 'elsewhere.json')
+        return result_path
+
+
+class JobQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.workdir.name) / 'jobs.sqlite3'
+        self.queue = JobQueue(self.path, max_attempts=2, retry_backoff=0)
+
+    def tearDown(self):
+        self.queue.close()
+        self.workdir.cleanup()
+
+    def test_identical_jobs_are_deduplicated_while_active(self):
+        first, created = self.queue.submit('research', {'seeds': ['игры'], 'market': 'RU'})
+        self.assertTrue(created)
+        self.assertEqual(self.queue.submit('research', {'market': 'RU', 'seeds': ['игры']}, priority=3), (first, False))
+        self.assertEqual(self.queue.get(first)['priority'], 3)
+        self.assertEqual(self.queue.submit('research', {'seeds': ['игры']})[1], True)
+
+        job = self.queue.claim('worker')
+        self.assertEqual(self.queue.submit('research', {'seeds': ['игры'], 'market': 'RU'}), (first, False))
+        self.assertTrue(self.queue.complete(job['id'], 'worker', 'results.json'))
+        self.assertEqual(self.queue.submit('research', {'seeds': ['игры'], 'market': 'RU'})[1], True)
+
+    def test_jobs_are_claimed_by_priority_then_age(self):
+        low, _ = self.queue.submit('audit', {'domain': 'a.ru'})
+        high, _ = self.queue.submit('audit', {'domain': 'b.ru'}, priority=5)
+        later, _ = self.queue.submit('audit', {'domain': 'c.ru'}, priority=5)
+
+        claimed = [self.queue.claim(f"worker-{n}") for n in range(4)]
+        self.assertEqual([job['id'] for job in claimed[:3]], [high, later, low])
+        self.assertIsNone(claimed[3])
+        self.assertEqual(claimed[0], {'id': high, 'kind': 'audit', 'params': {'domain': 'b.ru'},
+                                      'priority': 5, 'attempts': 1})
+        self.assertEqual(self.queue.stats(), {'queued': 0, 'running': 3, 'done': 0, 'failed': 0})
+
+    def test_lapsed_lease_is_taken_over(self):
+        queue = JobQueue(self.path, max_attempts=2, lease_seconds=0.05)
+        job_id, _ = queue.submit('audit', {'domain': 'grabgifts.ru'})
+        self.assertEqual(queue.claim('dead-worker')['id'], job_id)
+        self.assertIsNone(queue.claim('other-worker'))
+
+        time.sleep(0.1)
+        taken = queue.claim('other-worker')
+        self.assertEqual((taken['id'], taken['attempts']), (job_id, 2))
+        self.assertFalse(queue.renew(job_id, 'dead-worker'))
+        self.assertFalse(queue.complete(job_id, 'dead-worker', 'stale.json'))
+        self.assertTrue(queue.renew(job_id, 'other-worker'))
+
+        # The second lapse uses up the last attempt
+        queue.lease_seconds = 0
+        queue.renew(job_id, 'other-worker')
+        self.assertIsNone(queue.claim('third-worker'))
+        job = queue.get(job_id)
+        self.assertEqual((job['status'], job['error']), ('failed', 'Worker lease expired'))
+        queue.close()
+
+    def test_failures_back_off_then_give_up(self):
+        queue = JobQueue(self.path, max_attempts=3, retry_backoff=0.05)
+        job_id, _ = queue.submit('audit', {'domain': 'grabgifts.ru'})
+
+        # Attempt n waits retry_backoff * 2 ** (n - 1) before it can be claimed again
+        for attempt, backoff in ((1, 0.05), (2, 0.1)):
+            self.assertEqual(queue.claim('worker')['attempts'], attempt)
+            before = time.time()
+            self.assertTrue(queue.fail(job_id, 'worker', 'TimeoutError: '))
+            job = queue.get(job_id)
+            self.assertEqual((job['status'], job['attempts'], job['error']), ('queued', attempt, 'TimeoutError: '))
+            self.assertGreaterEqual(job['available_at'], before + backoff)
+            self.assertIsNone(queue.claim('worker'))
+            self.assertEqual(queue.pending(), 1)
+            time.sleep(max(0, job['available_at'] - time.time()) + 0.01)
+
+        self.assertEqual(queue.claim('worker')['attempts'], 3)
+        self.assertTrue(queue.fail(job_id, 'worker', 'TimeoutError: '))
+        self.assertEqual(queue.get(job_id)['status'], 'failed')
+        self.assertIsNone(queue.claim('worker'))
+        self.assertFalse(queue.fail(job_id, 'worker', 'again'))
+        self.assertEqual(queue.pending(), 0)
+        queue.close()
+
+    def test_released_jobs_keep_their_attempts(self):
+        job_id, _ = self.queue.submit('audit', {'domain': 'grabgifts.ru'})
+        self.queue.claim('worker')
+        self.assertTrue(self.queue.release(job_id, 'worker'))
+        self.assertFalse(self.queue.release(job_id, 'worker'))
+        self.assertEqual(self.queue.claim('worker')['attempts'], 1)
+
+    def test_unknown_kinds_and_parameters_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown job kind'):
+            self.queue.submit('backlinks', {})
+        with self.assertRaisesRegex(ValueError, 'Invalid parameters for gaps job'):
+            self.queue.submit('gaps', {'our_domain': 'grabgifts.ru'})
+        self.assertEqual(self.queue.stats()['queued'], 0)
+
+
+class JobWorkerTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.jobs_path = Path(self.workdir.name) / 'jobs.sqlite3'
+        self.agent = make_analyst(Path(self.workdir.name), jobs={'path': str(self.jobs_path)})
+
+    async def asyncTearDown(self):
+        await self.agent.close()
+        self.workdir.cleanup()
+
+    async def test_job_finished_elsewhere_is_not_counted_as_completed(self):
+        job_id, _ = self.agent.jobs.submit('audit', {'domain': 'grabgifts.ru'})
+
+        completed = await LeaseLosingWorker(self.agent, name='worker', poll_interval=0.01).run(drain=True)
+
+        self.assertEqual(completed, 0)
+        job = self.agent.jobs.get(job_id)
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['result_path'], 'elsewhere.json')
+
+
+class JobsCommandTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.workdir.name) / 'config.json'
+        self.config_path.write_text(json.dumps({'jobs': {'path': str(Path(self.workdir.name) / 'jobs.sqlite3')}}))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_command(self, action: str, **options) -> str:
+        args = argparse.Namespace(action=action, config=str(self.config_path), **options)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(run_jobs_command(args), 0)
+        return output.getvalue()
+
+    def test_submit_then_status_use_the_configured_queue(self):
+        submit = dict(kind='research', params='{"seeds": ["игры"]}', priority=0)
+        self.assertIn('Queued job 1', self.run_command('submit', **submit))
+        self.assertIn('Already queued as job 1', self.run_command('submit', **submit))
+
+        stats = json.loads(self.run_command('status', job_id=None))
+        self.assertEqual(stats['queued'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
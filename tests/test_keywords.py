@@ -0,0 +1,119 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from seo_agent.keywords import CompactKeywordData, KeywordData, KeywordFrame, KeywordIntent, KeywordStore
+
+from .helpers import make_analyst
+
+INTENTS = ['transactional', 'commercial', 'informational', 'navigational', 'unknown']
+
+
+def sample_keywords(count: int, seed: int = 7):
+    """A reproducible corpus with case-variant duplicates, ties and missing rankings"""
+    rng = random.Random(seed)
+    keywords = []
+    for n in range(count):
+        keywords.append(KeywordData(
+            keyword=f"{'Игры' if n % 7 == 0 else 'игры'} {n % (count // 2)}",
+            volume=rng.choice([0, 500, 1000, 1001, 5000, 120000]),
+            difficulty=rng.randint(0, 100),
+            cpc=round(rng.random() * 5, 2),
+            intent=rng.choice(INTENTS),
+            seasonality={'12': 1.5} if n % 5 == 0 else {},
+            local_relevance=rng.choice([0.5, 0.9, 1.0]),
+            cyrillic_variations=[f"igry {n}"],
+            current_ranking=rng.choice([None, 3, 40]),
+            competition_level=rng.choice(['low', 'medium', 'high'])
+        ))
+    return keywords
+
+
+class KeywordFrameTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.agent = make_analyst(Path(self.workdir.name))
+        self.keywords = sample_keywords(400)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_round_trip_keeps_every_field(self):
+        self.assertEqual(KeywordFrame.from_keywords(self.keywords).to_keywords(), self.keywords)
+        self.assertEqual(KeywordFrame.from_keywords([]).to_keywords(), [])
+
+    def test_scores_match_the_scalar_scorer(self):
+        scores = KeywordFrame.from_keywords(self.keywords).opportunity_scores().tolist()
+        for keyword, score in zip(self.keywords, scores):
+            self.assertAlmostEqual(score, self.agent.calculate_opportunity_score(keyword), places=12)
+
+    def test_filter_deduplicate_and_rank_match_the_loop(self):
+        # The per-keyword pipeline research_keywords ran before the columnar one
+        seen, expected = set(), []
+        for keyword in self.keywords:
+            if keyword.volume >= 500 and keyword.difficulty <= 60 and keyword.keyword.lower() not in seen:
+                seen.add(keyword.keyword.lower())
+                expected.append(keyword)
+        expected.sort(key=self.agent.calculate_opportunity_score, reverse=True)
+
+        frame = KeywordFrame.from_keywords(self.keywords).filter(volume_min=500, difficulty_max=60).deduplicate()
+        self.assertEqual(frame.top().to_keywords(), expected)
+        self.assertEqual(frame.top(10).to_keywords(), expected[:10])
+
+    def test_quick_wins_match_the_loop(self):
+        expected = [kw for kw in self.keywords
+                    if kw.volume > 1000 and kw.difficulty < 40 and kw.intent in ('commercial', 'transactional')]
+        expected.sort(key=self.agent.calculate_opportunity_score, reverse=True)
+
+        self.assertEqual(self.agent.identify_quick_wins(self.keywords), expected[:20])
+
+
+class CompactKeywordTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.agent = make_analyst(Path(self.workdir.name))
+        self.keywords = sample_keywords(200)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_compact_keyword_round_trips_and_shares_labels(self):
+        compact = [CompactKeywordData.from_keyword(kw) for kw in self.keywords]
+        self.assertEqual([kw.to_keyword() for kw in compact], self.keywords)
+
+        self.assertFalse(hasattr(compact[0], '__dict__'))
+        commercial = [kw for kw in compact if kw.intent == 'commercial']
+        self.assertIs(commercial[0].intent, KeywordIntent.COMMERCIAL)
+        # Labels outside the enum are interned instead; these two strings are built at runtime
+        first, second = (CompactKeywordData(f"игры {n}", 1, 1, 0.0, ''.join(['seaso', 'nal'])) for n in range(2))
+        self.assertIs(first.intent, second.intent)
+        self.assertIs(CompactKeywordData('игры', 1, 1, 0.0, 'x').seasonality,
+                      CompactKeywordData('игры 2', 1, 1, 0.0, 'x').seasonality)
+
+    def test_store_round_trips_every_field(self):
+        store = KeywordStore.from_keywords(self.keywords)
+        self.assertEqual(len(store), len(self.keywords))
+        self.assertEqual(store.to_keywords(), self.keywords)
+        self.assertEqual(store[3].to_keyword(), self.keywords[3])
+
+    def test_store_is_a_drop_in_for_the_analyst_helpers(self):
+        store = KeywordStore.from_keywords(self.keywords)
+
+        deduplicated = self.agent.deduplicate_keywords(store)
+        self.assertIsInstance(deduplicated, KeywordStore)
+        self.assertEqual(deduplicated.to_keywords(), self.agent.deduplicate_keywords(self.keywords))
+
+        expected = [self.agent.calculate_opportunity_score(kw) for kw in self.keywords]
+        self.assertEqual([self.agent.calculate_opportunity_score(kw) for kw in store], expected)
+        for score, reference in zip(store.opportunity_scores().tolist(), expected):
+            self.assertAlmostEqual(score, reference, places=12)
+
+        self.assertEqual(self.agent.make_serializable(store),
+                         [self.agent.make_serializable(kw) for kw in self.keywords])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+
+import aiohttp
+from aiohttp import test_utils, web
+
+from seo_agent.providers import (
+    AhrefsRussianAnalyzer, ProviderConnector, ProviderThrottledError, YandexWordstatConnector, parse_retry_after
+)
+
+from .helpers import make_analyst
+
+
+# Fast retries; the token bucket never holds a test back
+TEST_RATE_LIMIT = {'rate_per_second': None, 'backoff_base': 0.01, 'backoff_max': 0.05}
+
+
+class ProviderServerTestCase(unittest.IsolatedAsyncioTestCase):
+    """Runs a stand-in provider API; subclasses register routes in routes()"""
+
+    async def asyncSetUp(self):
+        self.hits = []
+        app = web.Application()
+        self.routes(app)
+        self.server = test_utils.TestServer(app)
+        await self.server.start_server()
+        self.session = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    def routes(self, app: web.Application):
+        raise NotImplementedError
+
+    def connector(self, connector_type=ProviderConnector, **kwargs) -> ProviderConnector:
+        connector = connector_type(base_url=str(self.server.make_url('/v3')), rate_limit=dict(TEST_RATE_LIMIT), **kwargs)
+        connector.bind_session(self.session)
+        return connector
+
+
+class ConnectionReuseTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        app = web.Application()
+
+        async def echo(request: web.Request) -> web.Response:
+            return web.json_response({'path': request.path, 'n': request.query.get('n')})
+
+        app.router.add_get('/{tail:.*}', echo)
+        self.server = test_utils.TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.workdir.cleanup()
+
+    async def test_connectors_share_one_pooled_connection(self):
+        agent = make_analyst(Path(self.workdir.name),
+                             ahrefs_base_url=str(self.server.make_url('/ahrefs')),
+                             yandex_wordstat_base_url=str(self.server.make_url('/wordstat')))
+        async with agent:
+            self.assertIs(agent.ahrefs.session, agent.yandex_wordstat.session)
+            for n in range(3):
+                await agent.ahrefs.request_json('GET', 'ping', params={'n': n})
+                await agent.yandex_wordstat.request_json('GET', 'ping', params={'n': n})
+
+            stats = agent.transport_stats
+            self.assertEqual(stats.requests, 6)
+            self.assertEqual(stats.connections_created, 1)
+            self.assertEqual(stats.connections_reused, 5)
+            self.assertGreater(stats.bytes_received, 0)
+
+
+class RetryAfterTests(ProviderServerTestCase):
+
+    def routes(self, app: web.Application):
+        async def throttled(request: web.Request) -> web.Response:
+            self.hits.append(time.monotonic())
+            if len(self.hits) <= self.throttled_responses:
+                return web.Response(status=429, headers={'Retry-After': self.retry_after})
+            return web.json_response({'ok': True})
+
+        app.router.add_get('/v3/limited', throttled)
+
+    async def test_backs_off_for_retry_after_then_succeeds(self):
+        self.throttled_responses, self.retry_after = 1, '0.3'
+        connector = self.connector()
+
+        self.assertEqual(await connector.request_json('GET', 'limited'), {'ok': True})
+        self.assertEqual(len(self.hits), 2)
+        self.assertGreaterEqual(self.hits[1] - self.hits[0], 0.3)
+
+        stats = connector.scheduler.stats()
+        self.assertEqual(stats['throttled'], 1)
+        self.assertEqual(stats['retries'], 1)
+        # Multiplicative decrease after a 429
+        self.assertEqual(stats['concurrency_limit'], 2)
+
+    async def test_gives_up_after_max_retries(self):
+        self.throttled_responses, self.retry_after = 10, '0'
+        connector = self.connector()
+        connector.scheduler.max_retries = 2
+
+        with self.assertRaises(ProviderThrottledError) as raised:
+            await connector.request_json('GET', 'limited')
+        self.assertEqual(raised.exception.status, 429)
+        self.assertEqual(len(self.hits), 3)
+        self.assertEqual(connector.scheduler.stats()['failures'], 1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('2'), 2.0)
+        self.assertEqual(parse_retry_after('-5'), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 60, usegmt=True)), 60, delta=2)
+
+
+class SeedBatchingTests(ProviderServerTestCase):
+
+    max_seeds_accepted = 3
+    extra_rows = []
+
+    def routes(self, app: web.Application):
+        async def matching_terms(request: web.Request) -> web.Response:
+            seeds = request.query['keywords'].split(',')
+            self.hits.append(seeds)
+            if len(seeds) > self.max_seeds_accepted:
+                return web.Response(status=413)
+            rows = [{'keyword': f"{seed} купить", 'volume': 1000, 'difficulty': 20, 'cpc': 150} for seed in seeds]
+            rows += self.extra_rows
+            return web.json_response({'keywords': rows, 'total': len(rows)})
+
+        app.router.add_get('/v3/keywords-explorer/matching-terms', matching_terms)
+
+    async def test_oversized_batch_is_split_and_rows_keep_seed_order(self):
+        connector = self.connector(AhrefsRussianAnalyzer, api_key='test-key')
+        connector.max_batch_seeds = 8
+        seeds = [f"игры {n}" for n in range(8)]
+
+        rows = await connector.keyword_research(seeds + ['  Игры 0 '])
+
+        self.assertEqual([row['keyword'] for row in rows], [f"{seed} купить" for seed in seeds])
+        self.assertEqual(rows[0]['cpc'], 1.5)
+        # 8 -> 413, 2 x 4 -> 413, 4 x 2 -> ok
+        self.assertEqual(sorted((len(batch) for batch in self.hits), reverse=True), [8, 4, 4, 2, 2, 2, 2])
+        self.assertEqual(connector.batches_split, 3)
+        self.assertEqual(connector.batch_requests, 4)
+        self.assertEqual(connector.duplicate_seeds, 1)
+
+    async def test_split_does_not_shrink_later_batches(self):
+        connector = self.connector(AhrefsRussianAnalyzer, api_key='test-key')
+        connector.max_batch_seeds = 8
+        await connector.keyword_research([f"игры {n}" for n in range(4)])
+        self.hits.clear()
+
+        self.max_seeds_accepted = 8
+        await connector.keyword_research([f"подарки {n}" for n in range(8)])
+        self.assertEqual(connector.max_batch_seeds, 8)
+        self.assertEqual([len(batch) for batch in self.hits], [8])
+
+    async def test_concurrent_callers_share_in_flight_seeds(self):
+        connector = self.connector(AhrefsRussianAnalyzer, api_key='test-key')
+        first, second = await asyncio.gather(connector.keyword_research(['игры 1', 'игры 2']),
+                                             connector.keyword_research(['игры 2', 'игры 3']))
+
+        self.assertEqual([row['keyword'] for row in first], ['игры 1 купить', 'игры 2 купить'])
+        self.assertEqual([row['keyword'] for row in second], ['игры 2 купить', 'игры 3 купить'])
+        self.assertEqual(sorted(seed for batch in self.hits for seed in batch), ['игры 1', 'игры 2', 'игры 3'])
+        self.assertEqual(connector.calls_saved()['shared_seeds'], 1)
+
+    async def test_rows_matching_no_seed_are_counted_not_credited(self):
+        connector = self.connector(AhrefsRussianAnalyzer, api_key='test-key')
+        self.extra_rows = [{'keyword': 'тапалки', 'volume': 500}]
+
+        rows = await connector.keyword_research(['игры 1', 'игры 2'])
+        self.assertEqual([row['keyword'] for row in rows], ['игры 1 купить', 'игры 2 купить'])
+        # One unmatched row in every batch response
+        self.assertEqual(connector.unattributed_rows, len(self.hits))
+
+
+class PaginationTests(ProviderServerTestCase):
+
+    rows = [{'keyword': f"ключ {n}"} for n in range(35)]
+
+    def routes(self, app: web.Application):
+        async def listing(request: web.Request) -> web.Response:
+            limit, offset = int(request.query['limit']), int(request.query['offset'])
+            self.hits.append(offset)
+            page = {'keywords': self.rows[offset:offset + limit]}
+            if request.match_info['kind'] == 'counted':
+                page['total'] = len(self.rows)
+            return web.json_response(page)
+
+        app.router.add_get('/v3/{kind}', listing)
+
+    async def test_pages_requested_concurrently_once_total_is_known(self):
+        connector = self.connector()
+        connector.page_size = 10
+
+        rows = await connector.fetch_pages('counted', {'q': 'x'}, 'keywords')
+        self.assertEqual(rows, self.rows)
+        self.assertEqual(self.hits[0], 0)
+        self.assertEqual(sorted(self.hits), [0, 10, 20, 30])
+
+    async def test_pages_followed_until_a_short_page_without_total(self):
+        connector = self.connector()
+        connector.page_size = 10
+
+        rows = await connector.fetch_pages('uncounted', {'q': 'x'}, 'keywords')
+        self.assertEqual(rows, self.rows)
+        self.assertEqual(self.hits, [0, 10, 20, 30])
+
+
+class ConfiguredKeyTests(ProviderServerTestCase):
+    """A configured key means real data or a clear error, never silent mock data"""
+
+    def routes(self, app: web.Application):
+        async def matching_terms(request: web.Request) -> web.Response:
+            self.hits.append(request.path)
+            rows = [{'keyword': f"{seed} купить", 'volume': 1000} for seed in request.query['keywords'].split(',')]
+            return web.json_response({'keywords': rows, 'total': len(rows)})
+
+        async def organic_keywords(request: web.Request) -> web.Response:
+            self.hits.append(request.path)
+            return web.json_response({'keywords': [{'keyword': 'тапалки', 'volume': 20000, 'best_position': 4}]})
+
+        app.router.add_get('/v3/keywords-explorer/matching-terms', matching_terms)
+        app.router.add_get('/v3/site-explorer/organic-keywords', organic_keywords)
+
+    async def test_connectors_without_a_session_raise(self):
+        ahrefs = AhrefsRussianAnalyzer(api_key='test-key')
+        wordstat = YandexWordstatConnector(token='test-token')
+
+        for call in (ahrefs.keyword_research(['игры']), ahrefs.get_competitor_keywords('rival.ru'),
+                     wordstat.get_keyword_suggestions(['игры'])):
+            with self.assertRaisesRegex(RuntimeError, 'no open HTTP session'):
+                await call
+
+    async def test_mock_data_only_without_a_key(self):
+        self.assertTrue(await AhrefsRussianAnalyzer(api_key=None).keyword_research(['игры']))
+        self.assertTrue(await AhrefsRussianAnalyzer(api_key=None).get_competitor_keywords('rival.ru'))
+        self.assertTrue(await YandexWordstatConnector(token=None).get_keyword_suggestions(['игры']))
+
+    async def test_analyst_flows_open_the_session(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            agent = make_analyst(Path(workdir), ahrefs_api_key='test-key',
+                                 ahrefs_base_url=str(self.server.make_url('/v3')))
+            agent.current_strategy = {'keywords': []}
+            try:
+                keywords = await agent.research_keywords(['игры'], volume_min=0, difficulty_max=100)
+                gaps = await agent.analyze_keyword_gaps('grabgifts.ru', ['rival.ru'])
+            finally:
+                await agent.close()
+
+        self.assertEqual([kw.keyword for kw in keywords], ['игры купить'])
+        self.assertEqual([gap.keyword for gap in gaps['keyword_gaps']], ['тапалки'])
+        self.assertEqual(self.hits, ['/v3/keywords-explorer/matching-terms', '/v3/site-explorer/organic-keywords'])
+
+
+if __name__ == '__main__':
+    unittest.main()
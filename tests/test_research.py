@@ -0,0 +1,83 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import test_utils, web
+
+from seo_agent.keywords import TopKeywords
+
+from .helpers import make_analyst
+
+# Matching terms per seed: (keyword, volume, difficulty)
+MATCHING_TERMS = {
+    'игры': [('игры купить', 1000, 20), ('игры онлайн купить', 2000, 30), ('игры дешево', 100, 10)],
+    'игры онлайн': [('Игры Онлайн купить', 5000, 10), ('игры онлайн бесплатно', 800, 70),
+                    ('игры онлайн 2025', 3000, 25)]
+}
+
+
+class StreamingResearchTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.requested = []
+        self.second_page_allowed = asyncio.Event()
+        app = web.Application()
+
+        async def matching_terms(request: web.Request) -> web.Response:
+            seeds = request.query['keywords'].split(',')
+            self.requested.append(seeds)
+            if 'игры онлайн' in seeds:
+                await self.second_page_allowed.wait()
+            rows = [{'keyword': keyword, 'volume': volume, 'difficulty': difficulty}
+                    for seed in seeds for keyword, volume, difficulty in MATCHING_TERMS[seed]]
+            return web.json_response({'keywords': rows, 'total': len(rows)})
+
+        app.router.add_get('/v3/keywords-explorer/matching-terms', matching_terms)
+        self.server = test_utils.TestServer(app)
+        await self.server.start_server()
+        self.agent = make_analyst(Path(self.workdir.name), ahrefs_api_key='test-key',
+                                  ahrefs_base_url=str(self.server.make_url('/v3')))
+
+    async def asyncTearDown(self):
+        await self.agent.close()
+        await self.server.close()
+        self.workdir.cleanup()
+
+    async def test_first_page_is_yielded_before_the_next_one_arrives(self):
+        ranking = TopKeywords(2, self.agent.calculate_opportunity_score)
+        keywords = self.agent.iter_keywords(['игры', 'игры онлайн'], volume_min=500, difficulty_max=60,
+                                            ranking=ranking, seeds_per_request=1)
+
+        first = await asyncio.wait_for(keywords.__anext__(), 5)
+        self.assertEqual(first.keyword, 'игры купить')
+        self.assertFalse(self.second_page_allowed.is_set())
+
+        self.second_page_allowed.set()
+        rest = [keyword async for keyword in keywords]
+
+        # Provider order is kept; filtered rows and the case-variant duplicate are dropped
+        streamed = [first] + rest
+        self.assertEqual([kw.keyword for kw in streamed], ['игры купить', 'игры онлайн купить', 'игры онлайн 2025'])
+        self.assertEqual(self.requested, [['игры'], ['игры онлайн']])
+        best = sorted(streamed, key=self.agent.calculate_opportunity_score, reverse=True)[:2]
+        self.assertEqual(ranking.ranked(), best)
+
+    async def test_closing_the_stream_cancels_pending_fetches(self):
+        keywords = self.agent.iter_keywords(['игры', 'игры онлайн'], volume_min=0, difficulty_max=100,
+                                            seeds_per_request=1)
+        await asyncio.wait_for(keywords.__anext__(), 5)
+        for _ in range(500):
+            if len(self.requested) == 2:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(len(self.requested), 2)
+
+        # The second page is still held by the server; closing must not wait for it
+        await asyncio.wait_for(keywords.aclose(), 5)
+        self.assertFalse(self.second_page_allowed.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
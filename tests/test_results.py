@@ -0,0 +1,118 @@
+import json
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from seo_agent.keywords import AnalysisResultsWriter, KeywordData, KeywordTableRef
+from seo_agent.util import atomic_write
+
+from .helpers import make_analyst
+
+KEYWORDS = [
+    KeywordData('телеграм игры', 12000, 20, 1.5, 'commercial', {'12': 1.4}, 0.9, ['telegram igry'], 3, 'high'),
+    KeywordData('тапалки', 8000, 35, 0.0, 'informational', {}, 1.0, [], None, 'medium'),
+    KeywordData('TON игры', 5000, 50, 2.25, 'transactional', {}, 0.8, ['ton igry', 'тон игры'], 41, 'low')
+]
+
+
+class AtomicWriteTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.workdir.name)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_concurrent_writers_in_one_process_do_not_collide(self):
+        path = self.output_dir / 'results.json'
+        # Every writer has its temporary file open before any of them renames
+        barrier = threading.Barrier(4)
+
+        def save(n: int):
+            def write(tmp_path: Path):
+                tmp_path.write_text(str(n))
+                barrier.wait(timeout=5)
+            atomic_write(path, write)
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(save, range(4)))
+
+        self.assertIn(path.read_text(), {'0', '1', '2', '3'})
+        self.assertEqual([p.name for p in self.output_dir.iterdir()], ['results.json'])
+
+    def test_failed_write_leaves_the_target_alone(self):
+        path = self.output_dir / 'results.json'
+        path.write_text('previous')
+
+        def write(tmp_path: Path):
+            tmp_path.write_text('partial')
+            raise OSError('disk full')
+
+        with self.assertRaises(OSError):
+            atomic_write(path, write)
+        self.assertEqual(path.read_text(), 'previous')
+        self.assertEqual([p.name for p in self.output_dir.iterdir()], ['results.json'])
+
+
+class ResultsWriterTests(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.workdir.name)
+
+    async def asyncTearDown(self):
+        self.workdir.cleanup()
+
+    def results(self):
+        return {
+            'timestamp': '2026-10-18T12:00:00',
+            'new_keywords': KEYWORDS,
+            'gap_analysis': {'keyword_gaps': KEYWORDS[1:], 'failed_competitors': {'rival.ru': 'TimeoutError: '}},
+            'technical_audit': {'overall_score': 87, 'errors': []}
+        }
+
+    async def test_every_table_format_round_trips(self):
+        for table_format in AnalysisResultsWriter.table_formats:
+            with self.subTest(table_format=table_format):
+                agent = make_analyst(self.output_dir, results={'table_format': table_format})
+                path = await agent.save_analysis_results(self.results(), f"results_{table_format}.json")
+                loaded = agent.load_analysis_results(path)
+
+                self.assertIsInstance(loaded['new_keywords'], KeywordTableRef)
+                self.assertEqual(len(loaded['new_keywords']), 3)
+                self.assertEqual(loaded['new_keywords'].to_keywords(), KEYWORDS)
+                self.assertEqual(list(loaded['gap_analysis']['keyword_gaps']), KEYWORDS[1:])
+                self.assertEqual(loaded['gap_analysis']['failed_competitors'], {'rival.ru': 'TimeoutError: '})
+                self.assertEqual(loaded['technical_audit'], {'overall_score': 87, 'errors': []})
+                self.assertEqual(loaded['timestamp'], '2026-10-18T12:00:00')
+
+    async def test_arrow_tables_are_memory_mapped(self):
+        agent = make_analyst(self.output_dir, results={'table_format': 'arrow'})
+        loaded = agent.load_analysis_results(await agent.save_analysis_results(self.results()))
+
+        table = loaded['new_keywords'].arrow()
+        self.assertEqual(table.column('keyword').to_pylist(), [kw.keyword for kw in KEYWORDS])
+        self.assertTrue(all(buffer is None or not buffer.is_mutable
+                            for column in table.columns for chunk in column.chunks for buffer in chunk.buffers()))
+
+    async def test_a_new_save_replaces_the_previous_tables(self):
+        agent = make_analyst(self.output_dir, results={'table_format': 'json'})
+        first = json.loads(Path(await agent.save_analysis_results(self.results())).read_text())['tables']
+        second = json.loads(Path(await agent.save_analysis_results(self.results())).read_text())['tables']
+
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+        written = {path.name for path in self.output_dir.iterdir() if path.name.endswith('.columns.json')}
+        self.assertEqual(written, set(second))
+
+    async def test_single_blob_results_still_load(self):
+        path = self.output_dir / 'legacy.json'
+        path.write_text(json.dumps({'new_keywords': [{'keyword': 'игры'}]}), encoding='utf-8')
+        self.assertEqual(AnalysisResultsWriter.load(path), {'new_keywords': [{'keyword': 'игры'}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
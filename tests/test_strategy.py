@@ -0,0 +1,83 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from .helpers import make_analyst
+
+STRATEGY = """# Стратегия ключевых слов
+
+Intro paragraph | with a pipe that is not a table
+| Not | a table | without a separator |
+
+### Telegram игры
+| Запрос | Сложность | Частотность | Интент |
+|:-------|----------:|:-----------:|--------|
+| телеграм игры | Low | 12k | commercial |
+| игры в телеграм | 35 | 8000 | informational |
+|  | 10 | 500 | commercial |
+
+### TON Keywords
+| Keyword | Estimated Search Volume | Difficulty |
+| --- | --- | --- |
+| TON игры | High | 150 |
+| тапалки | Medium | Medium |
+Paragraph that closes the table
+| stray | 1 | 2 |
+
+### Competitors
+| Domain | Traffic |
+|---|---|
+| rival.ru | 10000 |
+"""
+
+
+class StrategyParserTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.agent = make_analyst(Path(self.workdir.name))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_tables_are_read_by_header_position(self):
+        strategy = self.agent.parse_strategy_markdown(STRATEGY)
+
+        rows = [(kw.keyword, kw.volume, kw.difficulty, kw.intent) for kw in strategy['keywords']]
+        self.assertEqual(rows, [
+            ('телеграм игры', 12000, 20, 'commercial'),
+            ('игры в телеграм', 8000, 35, 'informational'),
+            ('TON игры', 50000, 100, 'informational'),
+            ('тапалки', 15000, 50, 'informational')
+        ])
+        self.assertEqual(strategy['total_keywords'], 4)
+
+    def test_rows_are_grouped_under_cluster_headings(self):
+        clusters = self.agent.parse_strategy_markdown(STRATEGY)['clusters']
+
+        self.assertEqual(list(clusters), ['Telegram игры', 'TON Keywords'])
+        self.assertEqual([kw.keyword for kw in clusters['Telegram игры']], ['телеграм игры', 'игры в телеграм'])
+        self.assertEqual([kw.keyword for kw in clusters['TON Keywords']], ['TON игры', 'тапалки'])
+
+    def test_a_file_handle_parses_like_the_whole_text(self):
+        path = Path(self.workdir.name) / 'strategy.md'
+        path.write_text(STRATEGY, encoding='utf-8')
+
+        with open(path, 'r', encoding='utf-8') as f:
+            streamed = self.agent.parse_strategy_markdown(f)
+        whole = self.agent.parse_strategy_markdown(STRATEGY)
+        self.assertEqual(streamed['keywords'], whole['keywords'])
+        self.assertEqual(self.agent.parse_strategy_markdown(io.StringIO(STRATEGY))['keywords'], whole['keywords'])
+
+    def test_cell_values(self):
+        self.assertEqual(self.agent.parse_volume('Высокий'), 50000)
+        self.assertEqual(self.agent.parse_volume('~3k'), 3000)
+        self.assertEqual(self.agent.parse_volume('n/a'), 1000)
+        self.assertEqual(self.agent.parse_difficulty('низкий'), 20)
+        self.assertEqual(self.agent.parse_difficulty('?'), 50)
+        self.assertEqual(self.agent.split_table_row('| a || c |'), ['a', '', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
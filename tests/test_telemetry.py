@@ -0,0 +1,138 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import test_utils, web
+
+from seo_agent.telemetry import NULL_SPAN, Instrumentation
+
+from .helpers import make_analyst
+
+
+class InstrumentationTests(unittest.IsolatedAsyncioTestCase):
+
+    def test_disabled_instrumentation_records_nothing(self):
+        instrumentation = Instrumentation()
+        with instrumentation.span('research_keywords') as span:
+            instrumentation.count('seo_keywords_in_total', 5, stage='research_keywords')
+            instrumentation.observe('seo_stage_duration_seconds', 1.0, stage='research_keywords')
+
+        self.assertIs(span, NULL_SPAN)
+        self.assertEqual(instrumentation.to_prometheus(), '\n')
+        otlp = instrumentation.to_otlp()
+        self.assertEqual(otlp['resourceMetrics'][0]['scopeMetrics'][0]['metrics'], [])
+        self.assertEqual(otlp['resourceSpans'][0]['scopeSpans'][0]['spans'], [])
+
+    def test_prometheus_text_has_cumulative_buckets(self):
+        instrumentation = Instrumentation(enabled=True)
+        instrumentation.count('seo_keywords_in_total', 3, stage='research_keywords')
+        instrumentation.count('seo_keywords_in_total', 2, stage='research_keywords')
+        instrumentation.count('seo_project_file_loads_total', file='стратегия "v2".md')
+        for value in (0.003, 0.2, 500):
+            instrumentation.observe('seo_stage_duration_seconds', value, stage='audit', status='ok')
+        instrumentation.add_collector(lambda: [('seo_cache_entries', 'gauge', {'cache': 'http'}, 7)])
+
+        lines = instrumentation.to_prometheus().splitlines()
+        self.assertIn('# HELP seo_keywords_in_total Keywords received by a stage', lines)
+        self.assertIn('# TYPE seo_keywords_in_total counter', lines)
+        self.assertIn('seo_keywords_in_total{stage="research_keywords"} 5', lines)
+        self.assertIn('seo_project_file_loads_total{file="стратегия \\"v2\\".md"} 1', lines)
+        self.assertIn('# TYPE seo_cache_entries gauge', lines)
+        self.assertIn('seo_cache_entries{cache="http"} 7', lines)
+
+        self.assertIn('# TYPE seo_stage_duration_seconds histogram', lines)
+        self.assertIn('seo_stage_duration_seconds_bucket{le="0.001",stage="audit",status="ok"} 0', lines)
+        self.assertIn('seo_stage_duration_seconds_bucket{le="0.005",stage="audit",status="ok"} 1', lines)
+        self.assertIn('seo_stage_duration_seconds_bucket{le="0.25",stage="audit",status="ok"} 2', lines)
+        self.assertIn('seo_stage_duration_seconds_bucket{le="120.0",stage="audit",status="ok"} 2', lines)
+        self.assertIn('seo_stage_duration_seconds_bucket{le="+Inf",stage="audit",status="ok"} 3', lines)
+        self.assertIn('seo_stage_duration_seconds_count{stage="audit",status="ok"} 3', lines)
+
+    async def test_otlp_spans_nest_across_tasks(self):
+        instrumentation = Instrumentation(enabled=True)
+
+        async def provider_call():
+            with instrumentation.span('ahrefs.matching_terms', metric='seo_provider_request_duration_seconds',
+                                      labels={'provider': 'ahrefs'}, seeds=2):
+                await asyncio.sleep(0)
+
+        with self.assertRaises(RuntimeError):
+            with instrumentation.span('research_keywords'):
+                await asyncio.gather(asyncio.create_task(provider_call()), provider_call())
+                raise RuntimeError('no keywords')
+
+        otlp = instrumentation.to_otlp()
+        spans = {span['spanId']: span for span in otlp['resourceSpans'][0]['scopeSpans'][0]['spans']}
+        root = next(span for span in spans.values() if span['name'] == 'research_keywords')
+        children = [span for span in spans.values() if span['name'] == 'ahrefs.matching_terms']
+
+        self.assertEqual(len(children), 2)
+        for child in children:
+            self.assertEqual((child['traceId'], child['parentSpanId'], child['kind']),
+                             (root['traceId'], root['spanId'], 3))
+            self.assertIn({'key': 'seeds', 'value': {'intValue': '2'}}, child['attributes'])
+        self.assertNotIn('parentSpanId', root)
+        self.assertEqual(root['status'], {'code': 2})
+        self.assertIn({'key': 'error.type', 'value': {'stringValue': 'RuntimeError'}}, root['attributes'])
+
+        scope_metrics = otlp['resourceMetrics'][0]['scopeMetrics'][0]
+        self.assertEqual(scope_metrics['scope'], {'name': 'seo_agent'})
+        metrics = {metric['name']: metric for metric in scope_metrics['metrics']}
+        points = metrics['seo_stage_duration_seconds']['histogram']['dataPoints']
+        self.assertEqual(len(points), 1)
+        self.assertEqual(len(points[0]['bucketCounts']), len(points[0]['explicitBounds']) + 1)
+        self.assertIn({'key': 'status', 'value': {'stringValue': 'error'}}, points[0]['attributes'])
+        self.assertEqual(metrics['seo_provider_request_duration_seconds']['unit'], 's')
+
+    def test_only_the_newest_spans_are_kept(self):
+        instrumentation = Instrumentation(enabled=True, max_spans=2)
+        for name in ('first', 'second', 'third'):
+            with instrumentation.span(name):
+                pass
+        self.assertEqual([span.name for span in instrumentation.spans], ['second', 'third'])
+
+    def test_export_writes_either_format(self):
+        instrumentation = Instrumentation(enabled=True)
+        instrumentation.count('seo_keywords_out_total', 4, stage='research_keywords')
+
+        with tempfile.TemporaryDirectory() as workdir:
+            prometheus, otlp = Path(workdir) / 'metrics' / 'seo.prom', Path(workdir) / 'seo.json'
+            instrumentation.export(prometheus)
+            instrumentation.export(otlp, 'otlp')
+            with self.assertRaises(ValueError):
+                instrumentation.export(Path(workdir) / 'seo.txt', 'statsd')
+
+            self.assertIn('seo_keywords_out_total{stage="research_keywords"} 4', prometheus.read_text())
+            metrics = json.loads(otlp.read_text())['resourceMetrics'][0]['scopeMetrics'][0]['metrics']
+            self.assertEqual(metrics[0]['sum']['dataPoints'][0]['asDouble'], 4.0)
+            self.assertTrue(metrics[0]['sum']['isMonotonic'])
+
+    async def test_analyst_stages_are_timed_and_counted(self):
+        async def matching_terms(request: web.Request) -> web.Response:
+            rows = [{'keyword': 'телеграм игры онлайн', 'volume': 5000, 'difficulty': 20},
+                    {'keyword': 'телеграм игры бесплатно', 'volume': 100, 'difficulty': 20}]
+            return web.json_response({'keywords': rows, 'total': len(rows)})
+
+        app = web.Application()
+        app.router.add_get('/v3/keywords-explorer/matching-terms', matching_terms)
+        async with test_utils.TestServer(app) as server:
+            with tempfile.TemporaryDirectory() as workdir:
+                agent = make_analyst(Path(workdir), instrumentation={'enabled': True}, ahrefs_api_key='test-key',
+                                     ahrefs_base_url=str(server.make_url('/v3')))
+                agent.current_strategy = {'keywords': []}
+                async with agent:
+                    keywords = await agent.research_keywords(['телеграм игры'])
+
+        self.assertEqual([kw.keyword for kw in keywords], ['телеграм игры онлайн'])
+        names = [span.name for span in agent.instrumentation.spans]
+        self.assertIn('research_keywords', names)
+        self.assertGreater(len(names), 1)
+        samples = {(name, tuple(sorted(labels.items()))): value
+                   for name, _, labels, value in agent.instrumentation.collect()}
+        self.assertEqual(samples[('seo_keywords_in_total', (('stage', 'research_keywords'),))], 2)
+        self.assertEqual(samples[('seo_keywords_out_total', (('stage', 'research_keywords'),))], 1)
+
+if __name__ == '__main__':
+    unittest.main()